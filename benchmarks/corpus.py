@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Deterministic generator of synthetic schema corpora for the benchmarks.
+
+The generated corpus looks like a real schema collection: a folder of small
+element schemas, referenced through ``$ref`` by the record schemas of another
+folder. Record schemas mix wide ``properties`` objects, deeply nested ones,
+big ``enum`` lists, long descriptions referencing other properties through
+``:ref:`` and long ``required`` lists. Half of the record schemas are written
+as JSON, the others as YAML. The same arguments always generate the same
+files.
+
+Usage:
+    python benchmarks/corpus.py path/to/corpus [--records 50] [--seed 0]
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import argparse
+import io
+import json
+import os
+import random
+
+import yaml
+
+ELEMENTS_FOLDER = 'elements'
+RECORDS_FOLDER = 'records'
+
+_TYPES = ['string', 'integer', 'number', 'boolean']
+_WORDS = ('the of record schema identifier value source author title date '
+          'collection reference number field external system name list '
+          'control publication experiment institution').split()
+
+
+class CorpusGenerator(object):
+    """Generator of the schemas of a synthetic corpus.
+
+    Every schema is generated from its own pseudo-random generator, seeded
+    with the corpus seed and the schema name, so that changing the number of
+    schemas does not change the content of the others.
+    """
+
+    def __init__(self, seed=0, width=12, depth=5, enum_size=200,
+                 elements=20, refs=8, description_words=60):
+        """
+        Constructor.
+
+        Args:
+            seed(int): the seed of the corpus.
+            width(int): the number of properties of the wide objects.
+            depth(int): the nesting depth of the deep objects.
+            enum_size(int): the number of values of the big enums.
+            elements(int): the number of element schemas.
+            refs(int): the number of ``$ref`` of every record schema.
+            description_words(int): the number of words of the long
+                descriptions.
+        """
+        self.seed = seed
+        self.width = width
+        self.depth = depth
+        self.enum_size = enum_size
+        self.elements = elements
+        self.refs = refs
+        self.description_words = description_words
+
+    def _random(self, name):
+        return random.Random('{}:{}'.format(self.seed, name))
+
+    def _description(self, rand, targets):
+        words = [rand.choice(_WORDS) for _ in range(self.description_words)]
+        for target in rand.sample(targets, min(3, len(targets))):
+            words.insert(rand.randrange(len(words) + 1),
+                         'see :ref:`{}`'.format(target))
+        return ' '.join(words).capitalize() + '.'
+
+    def _leaf(self, rand, name):
+        leaf = {'type': rand.choice(_TYPES), 'title': name.capitalize()}
+        if leaf['type'] == 'string' and rand.random() < 0.3:
+            leaf['format'] = rand.choice(['date', 'uri', 'email'])
+        if leaf['type'] == 'integer':
+            leaf['minimum'] = rand.randrange(100)
+        return leaf
+
+    def _wide(self, rand, prefix):
+        names = ['{}_{}'.format(prefix, index) for index in range(self.width)]
+        properties = {}
+        for name in names:
+            properties[name] = self._leaf(rand, name)
+            properties[name]['description'] = self._description(rand, names)
+        return {
+            'type': 'object',
+            'properties': properties,
+            'required': names,
+        }
+
+    def _deep(self, rand, prefix, depth):
+        if depth == 0:
+            return self._leaf(rand, prefix)
+        name = '{}_{}'.format(prefix, depth)
+        return {
+            'type': 'object',
+            'description': 'Nested level {}.'.format(depth),
+            'properties': {
+                name: self._deep(rand, prefix, depth - 1),
+                name + '_list': {
+                    'type': 'array',
+                    'items': self._leaf(rand, name + '_item'),
+                },
+            },
+            'required': [name],
+        }
+
+    def _enum(self, rand):
+        return {
+            'type': 'string',
+            'enum': sorted(set('{}-{}'.format(rand.choice(_WORDS), index)
+                               for index in range(self.enum_size))),
+        }
+
+    def element(self, index):
+        """
+        Return the element schema number ``index``.
+        """
+        rand = self._random('element{}'.format(index))
+        schema = self._wide(rand, 'element{}'.format(index))
+        schema['title'] = 'Element {}'.format(index)
+        schema['$schema'] = 'http://json-schema.org/schema#'
+        schema['additionalProperties'] = False
+        return schema
+
+    def record(self, index):
+        """
+        Return the record schema number ``index``.
+        """
+        rand = self._random('record{}'.format(index))
+        names = ['wide', 'deep', 'kind', 'items'] + [
+            'ref_{}'.format(ref) for ref in range(self.refs)]
+
+        properties = {
+            'wide': self._wide(rand, 'wide'),
+            'deep': self._deep(rand, 'deep', self.depth),
+            'kind': self._enum(rand),
+            'items': {
+                'type': 'array',
+                'uniqueItems': True,
+                'items': {
+                    'anyOf': [self._wide(rand, 'any'), self._enum(rand)],
+                },
+            },
+        }
+        for ref in range(self.refs):
+            element = 'element{}.json'.format(rand.randrange(self.elements))
+            properties['ref_{}'.format(ref)] = {
+                '$ref': '../{}/{}'.format(ELEMENTS_FOLDER, element),
+                'description': self._description(rand, names),
+            }
+
+        return {
+            '$schema': 'http://json-schema.org/schema#',
+            'title': 'Record {}'.format(index),
+            'description': self._description(rand, names),
+            'type': 'object',
+            'additionalProperties': False,
+            'properties': properties,
+            'required': names,
+        }
+
+    def write(self, output_path, records):
+        """
+        Write the corpus in ``output_path``.
+
+        Args:
+            output_path(string): the folder where schemas are written.
+            records(int): the number of record schemas.
+
+        Returns:
+            list<string>: the paths of the written schemas.
+        """
+        schemas = []
+        for index in range(self.elements):
+            schemas.append((os.path.join(ELEMENTS_FOLDER,
+                                         'element{}.yml'.format(index)),
+                            self.element(index)))
+        for index in range(records):
+            extension = '.json' if index % 2 else '.yml'
+            name = 'record{}{}'.format(index, extension)
+            schemas.append((os.path.join(RECORDS_FOLDER, name),
+                            self.record(index)))
+
+        paths = []
+        for name, schema in schemas:
+            path = os.path.join(output_path, name)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with io.open(path, 'w', encoding='utf-8') as schema_file:
+                schema_file.write(_dumps(schema, path))
+            paths.append(path)
+        return paths
+
+
+def _dumps(schema, path):
+    if path.endswith('.json'):
+        return json.dumps(schema, indent=4, sort_keys=True)
+    return yaml.safe_dump(schema, default_flow_style=False,
+                          allow_unicode=True)
+
+
+def main(arguments=None):
+    cli_parser = argparse.ArgumentParser(description=__doc__)
+    cli_parser.add_argument('output', help='The folder of the corpus.')
+    cli_parser.add_argument('--records', type=int, default=50)
+    cli_parser.add_argument('--elements', type=int, default=20)
+    cli_parser.add_argument('--seed', type=int, default=0)
+    cli_parser.add_argument('--width', type=int, default=12)
+    cli_parser.add_argument('--depth', type=int, default=5)
+    cli_parser.add_argument('--enum-size', type=int, default=200)
+    cli_parser.add_argument('--refs', type=int, default=8)
+    args = cli_parser.parse_args(arguments)
+
+    generator = CorpusGenerator(args.seed, args.width, args.depth,
+                                args.enum_size, args.elements, args.refs)
+    paths = generator.write(args.output, args.records)
+    print('{} schemas written in {}'.format(len(paths), args.output))
+
+
+if __name__ == '__main__':
+    main()
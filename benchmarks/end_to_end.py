@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+End-to-end benchmark of ``jsonschema2rst``.
+
+It times ``run_parser`` on a whole schema corpus and, separately, each stage
+of the conversion: loading the schemas, building their trees with
+``TreeNode.dict2tree``, rendering them with ``_traverse_bfs`` (which applies
+``restify`` to every node) and creating the indexes. For every stage it
+reports the best time over some repetitions, the files and tree nodes
+processed per second and the peak memory allocated, measured by a separate
+traced run so that tracing does not slow down the timed ones.
+
+The corpus is either an existing folder or a synthetic one, generated by
+``benchmarks/corpus.py``. Results can be saved as JSON to compare runs.
+
+Usage, with ``jsonschema2rst`` installed or in the ``PYTHONPATH``:
+    python benchmarks/end_to_end.py --generate 50 --save results.json
+    python benchmarks/end_to_end.py path/to/schemas
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+from jsonschema2rst.indexer import create_master_index, index, write_index_file
+from jsonschema2rst.loaders import load_schema
+from jsonschema2rst.manifest import get_version
+from jsonschema2rst.parser import _node2rst, _traverse_bfs
+from jsonschema2rst.parser_runner import run_parser
+from jsonschema2rst.rst_writer import JSON_EXTENSION, YML_EXTENSION
+from jsonschema2rst.tree_node import TreeNode
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusGenerator  # noqa: E402 isort:skip
+
+EXCLUDED_KEY = 'uniqueItems,additionalProperties,$schema'
+
+
+def schema_files(path):
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith((YML_EXTENSION, JSON_EXTENSION)):
+                yield os.path.join(root, name)
+
+
+def count_nodes(tree):
+    count = 0
+    nodes = [tree]
+    while nodes:
+        node = nodes.pop()
+        count += 1
+        nodes.extend(node.children)
+    return count
+
+
+def load_all(paths):
+    schemas = []
+    for path in paths:
+        with open(path) as schema_file:
+            schemas.append((os.path.basename(path), load_schema(schema_file)))
+    return schemas
+
+
+def build_all(schemas):
+    return [TreeNode.dict2tree(schema, TreeNode(name), EXCLUDED_KEY)
+            for name, schema in schemas]
+
+
+def render_all(trees):
+    return [_traverse_bfs(tree, _node2rst) for tree in trees]
+
+
+def index_all(input_path, output_path):
+    for root, dirs, files in os.walk(input_path):
+        output_folder = os.path.join(output_path,
+                                     os.path.relpath(root, input_path))
+        if not os.path.isdir(output_folder):
+            os.makedirs(output_folder)
+        write_index_file(output_folder, index(root))
+    create_master_index(output_path)
+
+
+@contextlib.contextmanager
+def quiet():
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        yield
+    finally:
+        sys.stdout = stdout
+
+
+class Stage(object):
+    """A timed stage of the conversion."""
+
+    def __init__(self, name, setup, func):
+        """
+        Args:
+            name(string): the stage name.
+            setup(callable): returns the arguments of ``func``. It is called
+                before every run, and it is neither timed nor traced.
+            func(callable): runs the stage.
+        """
+        self.name = name
+        self.setup = setup
+        self.func = func
+
+    def time(self, repeat):
+        best = None
+        for _ in range(repeat):
+            args = self.setup()
+            start = timeit.default_timer()
+            self.func(*args)
+            elapsed = timeit.default_timer() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def peak_memory(self):
+        args = self.setup()
+        tracemalloc.start()
+        try:
+            self.func(*args)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def run(corpus_path, repeat):
+    paths = list(schema_files(corpus_path))
+    schemas = load_all(paths)
+    nodes = sum(count_nodes(tree) for tree in build_all(schemas))
+    work_path = tempfile.mkdtemp(prefix='jsonschema2rst-bench-')
+
+    def output_folder():
+        output_path = os.path.join(work_path, 'out')
+        if os.path.exists(output_path):
+            shutil.rmtree(output_path)
+        return (output_path,)
+
+    stages = [
+        Stage('load', lambda: (paths,), load_all),
+        Stage('dict2tree', lambda: (schemas,), build_all),
+        Stage('render', lambda: (build_all(schemas),), render_all),
+        Stage('index', lambda: (corpus_path,) + output_folder(), index_all),
+        Stage('run_parser', lambda: (corpus_path,) + output_folder(),
+              lambda src, out: run_parser(src, out, EXCLUDED_KEY)),
+    ]
+
+    results = {
+        'version': get_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'corpus': {
+            'path': os.path.abspath(corpus_path),
+            'files': len(paths),
+            'bytes': sum(os.path.getsize(path) for path in paths),
+            'nodes': nodes,
+        },
+        'stages': {},
+    }
+
+    try:
+        with quiet():
+            for stage in stages:
+                seconds = stage.time(repeat)
+                results['stages'][stage.name] = {
+                    'seconds': seconds,
+                    'files_per_second': len(paths) / seconds,
+                    'nodes_per_second': nodes / seconds,
+                    'peak_memory': stage.peak_memory(),
+                }
+    finally:
+        shutil.rmtree(work_path)
+
+    return results
+
+
+def print_results(results):
+    corpus = results['corpus']
+    print('{} files, {} bytes, {} nodes'.format(
+        corpus['files'], corpus['bytes'], corpus['nodes']))
+    print('{:<12} {:>10} {:>12} {:>14} {:>12}'.format(
+        'stage', 'seconds', 'files/s', 'nodes/s', 'peak MB'))
+    for name in ['load', 'dict2tree', 'render', 'index', 'run_parser']:
+        stage = results['stages'][name]
+        print('{:<12} {:>10.4f} {:>12.1f} {:>14.0f} {:>12.1f}'.format(
+            name, stage['seconds'], stage['files_per_second'],
+            stage['nodes_per_second'], stage['peak_memory'] / 1024.0 ** 2))
+
+
+def main(arguments=None):
+    cli_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    cli_parser.add_argument('corpus', nargs='?',
+                            help='The folder of the schemas. Not needed with '
+                                 '--generate.')
+    cli_parser.add_argument('--generate', type=int, metavar='RECORDS',
+                            help='Benchmark a synthetic corpus with this '
+                                 'number of record schemas.')
+    cli_parser.add_argument('--seed', type=int, default=0,
+                            help='The seed of the synthetic corpus.')
+    cli_parser.add_argument('--repeat', type=int, default=3,
+                            help='Number of timed runs for each stage.')
+    cli_parser.add_argument('--save', metavar='FILE',
+                            help='Save the results as JSON in this file.')
+    args = cli_parser.parse_args(arguments)
+
+    if (args.corpus is None) == (args.generate is None):
+        cli_parser.error('give either a corpus folder or --generate')
+
+    corpus_path = args.corpus
+    if args.generate is not None:
+        corpus_path = tempfile.mkdtemp(prefix='jsonschema2rst-corpus-')
+        CorpusGenerator(args.seed).write(corpus_path, args.generate)
+
+    try:
+        results = run(corpus_path, args.repeat)
+    finally:
+        if args.generate is not None:
+            shutil.rmtree(corpus_path)
+
+    if args.generate is not None:
+        results['corpus'].update(path=None, records=args.generate,
+                                 seed=args.seed)
+
+    print_results(results)
+
+    if args.save:
+        with io.open(args.save, 'w', encoding='utf-8') as results_file:
+            results_file.write(json.dumps(results, indent=2,
+                                          sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
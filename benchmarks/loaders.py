@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Loading benchmark for schema files.
+
+It reads all the given schemas with every loader available in
+``jsonschema2rst.loaders`` and reports, for each of them, the best time over
+some repetitions, checking that all loaders give the same content as
+``yaml.full_load``. The ``json`` loader is only timed on the ``.json`` files
+which are valid json.
+
+Usage, with ``jsonschema2rst`` installed or in the ``PYTHONPATH``:
+    python benchmarks/loaders.py path/to/schemas [more/schemas.yml ...]
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import argparse
+import io
+import json
+import os
+import timeit
+
+import yaml
+
+from jsonschema2rst.loaders import (FULL_LOADER, JSON_LOADER, LOADERS,
+                                    SafeLoader, load_schema)
+from jsonschema2rst.rst_writer import JSON_EXTENSION, YML_EXTENSION
+
+
+def schema_files(paths):
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith((YML_EXTENSION, JSON_EXTENSION)):
+                    yield os.path.join(root, name)
+
+
+def load_all(contents, loader):
+    results = []
+    for name, content in contents:
+        schema_file = io.StringIO(content)
+        schema_file.name = name
+        results.append(load_schema(schema_file, loader))
+    return results
+
+
+def _is_json(content):
+    try:
+        json.loads(content)
+    except ValueError:
+        return False
+    return True
+
+
+def main(arguments=None):
+    cli_parser = argparse.ArgumentParser(description=__doc__)
+    cli_parser.add_argument('schemas', nargs='+',
+                            help='Schema files or folders containing them.')
+    cli_parser.add_argument('--repeat', type=int, default=5,
+                            help='Number of timed runs for each loader.')
+    args = cli_parser.parse_args(arguments)
+
+    contents = []
+    for path in schema_files(args.schemas):
+        with io.open(path, encoding='utf-8') as schema_file:
+            contents.append((path, schema_file.read()))
+
+    json_contents = [content for content in contents
+                     if content[0].endswith(JSON_EXTENSION) and
+                     _is_json(content[1])]
+
+    print('libyaml safe loader: {}'.format(
+        'yes' if SafeLoader is not yaml.SafeLoader else 'no'))
+    print('{} files, {} json files'.format(len(contents), len(json_contents)))
+
+    reference = load_all(contents, FULL_LOADER)
+    json_reference = load_all(json_contents, FULL_LOADER)
+
+    for loader in LOADERS:
+        loader_contents = contents
+        expected = reference
+        if loader == JSON_LOADER:
+            loader_contents = json_contents
+            expected = json_reference
+        if not loader_contents:
+            continue
+
+        same = load_all(loader_contents, loader) == expected
+        best = min(timeit.repeat(
+            lambda: load_all(loader_contents, loader),
+            number=1, repeat=args.repeat))
+
+        print('{:<6} {:>10.4f}s {:>8} {}'.format(
+            loader, best,
+            'all' if loader != JSON_LOADER else 'json',
+            'same content' if same else 'DIFFERENT CONTENT'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Micro-benchmarks of the helpers called once or more per tree node while
+rendering, with a regression gate.
+
+Timings are divided by the one of a fixed pure Python calibration loop, so
+that a baseline recorded on a machine can be compared with runs on another
+one. ``run`` prints, and optionally saves, the timings of every helper;
+``compare`` runs the benchmarks again and fails if any helper got slower
+than its baseline by more than the given threshold. The default threshold
+only catches gross regressions, as timings of calls this short vary a lot on
+a busy machine; lower it when benchmarking on a quiet one.
+
+Usage, with ``jsonschema2rst`` installed or in the ``PYTHONPATH``:
+    python benchmarks/micro.py run [--save benchmarks/micro_baseline.json]
+    python benchmarks/micro.py compare [--threshold 0.2]
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import timeit
+
+from jsonschema2rst.json_pointer_util import get_json_pointer, split_key_val
+from jsonschema2rst.rst_utils import (container, kv_field, literal, make_title,
+                                      section_link)
+from jsonschema2rst.tree_node import TreeNode
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'micro_baseline.json')
+
+DEFAULT_THRESHOLD = 0.5
+
+SCHEMA = {
+    'title': 'Record',
+    'properties': {
+        'authors': {
+            'type': 'array',
+            'items': {
+                'properties': {
+                    'affiliations': {
+                        'type': 'array',
+                        'items': {
+                            'properties': {
+                                'value': {'type': 'string'},
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+def _calibration():
+    total = 0
+    for index in range(100):
+        total += index * index
+    return total
+
+
+def cases():
+    """
+    Return the ``(name, func, args)`` benchmarked calls, with arguments
+    similar to the ones met while rendering.
+    """
+    tree = TreeNode.dict2tree(SCHEMA, TreeNode('record.json'))
+    node = tree
+    while node.children:
+        node = node.children[-1]
+
+    return [
+        ('rst_utils.literal', literal, ('string, null, integer',)),
+        ('rst_utils.kv_field', kv_field, ('type', 'string')),
+        ('rst_utils.make_title', make_title, ('affiliations', 3)),
+        ('rst_utils.container', container,
+         ('**type** : ``string``', 'schema-type')),
+        ('rst_utils.section_link', section_link, (node,)),
+        ('json_pointer_util.split_key_val', split_key_val,
+         ('description: A long description of the record, see :ref:`ids`',)),
+        ('json_pointer_util.get_json_pointer', get_json_pointer, (node,)),
+    ]
+
+
+def _best(func, args, number, repeat):
+    """
+    Return the best time per call of ``func`` and of the calibration loop,
+    timed alternately so that both see the same machine load.
+    """
+    timer = timeit.Timer(lambda: func(*args))
+    calibration_timer = timeit.Timer(_calibration)
+    best = calibration = None
+    for _ in range(repeat):
+        calibration = min(calibration_timer.timeit(number) / number,
+                          calibration or float('inf'))
+        best = min(timer.timeit(number) / number, best or float('inf'))
+    return best, calibration
+
+
+def run(number=2000, repeat=50):
+    """
+    Time every benchmarked call.
+
+    Returns:
+        dict: the nanoseconds per call of every helper, and their ratio to
+            the time of the calibration loop.
+    """
+    functions = {}
+    for name, func, args in cases():
+        seconds, calibration = _best(func, args, number, repeat)
+        functions[name] = {
+            'ns_per_call': seconds * 1e9,
+            'relative': seconds / calibration,
+        }
+    return {
+        'python': platform.python_version(),
+        'functions': functions,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two ``run`` results.
+
+    Returns:
+        list: the ``(name, ratio)`` of the helpers whose relative timing
+            grew by more than ``threshold`` (e.g. ``0.25`` for 25%), where
+            ``ratio`` is the current relative timing over the baseline one.
+    """
+    regressions = []
+    for name, result in sorted(current['functions'].items()):
+        base = baseline['functions'].get(name)
+        if base is None:
+            continue
+        ratio = result['relative'] / base['relative']
+        if ratio > 1 + threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    print('{:<36} {:>10} {:>10} {:>8}'.format(
+        'function', 'ns/call', 'relative', 'change'))
+    for name, result in sorted(results['functions'].items()):
+        change = ''
+        if baseline is not None and name in baseline['functions']:
+            change = '{:+.0%}'.format(
+                result['relative'] /
+                baseline['functions'][name]['relative'] - 1)
+        print('{:<36} {:>10.1f} {:>10.3f} {:>8}'.format(
+            name, result['ns_per_call'], result['relative'], change))
+
+
+def main(arguments=None):
+    cli_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    cli_parser.add_argument('command', choices=['run', 'compare'])
+    cli_parser.add_argument('--number', type=int, default=2000,
+                            help='Calls per timed run.')
+    cli_parser.add_argument('--repeat', type=int, default=50,
+                            help='Timed runs, the best one is kept.')
+    cli_parser.add_argument('--save', metavar='FILE',
+                            help='run: save the results as JSON in this '
+                                 'file.')
+    cli_parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                            help='compare: the baseline results file.')
+    cli_parser.add_argument('--threshold', type=float,
+                            default=DEFAULT_THRESHOLD,
+                            help='compare: the allowed slowdown, e.g. 0.2 '
+                                 'for 20%%.')
+    args = cli_parser.parse_args(arguments)
+
+    results = run(args.number, args.repeat)
+
+    if args.command == 'run':
+        print_results(results)
+        if args.save:
+            with io.open(args.save, 'w', encoding='utf-8') as results_file:
+                results_file.write(json.dumps(results, indent=2,
+                                              sort_keys=True) + '\n')
+        return 0
+
+    with io.open(args.baseline, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+
+    print_results(results, baseline)
+    regressions = compare(baseline, results, args.threshold)
+    for name, ratio in regressions:
+        print('{} is {:.0%} slower than the baseline'.format(name, ratio - 1))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
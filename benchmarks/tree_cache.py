@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Benchmark of the on-disk tree cache.
+
+For all the given schemas it reports the best time, over some repetitions,
+to build their trees from the files with the former ``yaml.full_load`` and
+with the default loader, and to load them back from their intermediate
+representation, along with the size of the schemas and of their
+intermediate representation.
+
+Usage, with ``jsonschema2rst`` installed or in the ``PYTHONPATH``:
+    python benchmarks/tree_cache.py path/to/schemas [more/schemas.yml ...]
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import argparse
+import io
+import os
+import timeit
+
+from jsonschema2rst.loaders import AUTO_LOADER, FULL_LOADER
+from jsonschema2rst.parser import schema2tree
+from jsonschema2rst.rst_writer import JSON_EXTENSION, YML_EXTENSION
+from jsonschema2rst.tree_cache import dump_tree, load_tree
+
+
+def schema_files(paths):
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith((YML_EXTENSION, JSON_EXTENSION)):
+                    yield os.path.join(root, name)
+
+
+def build_all(contents, excluded_key, loader):
+    trees = []
+    for name, content in contents:
+        schema_file = io.StringIO(content)
+        schema_file.name = name
+        trees.append(schema2tree(schema_file, excluded_key, loader))
+    return trees
+
+
+def load_all(irs):
+    return [load_tree(ir) for ir in irs]
+
+
+def main(arguments=None):
+    cli_parser = argparse.ArgumentParser(description=__doc__)
+    cli_parser.add_argument('schemas', nargs='+',
+                            help='Schema files or folders containing them.')
+    cli_parser.add_argument('--excluded-key',
+                            default='uniqueItems,additionalProperties,$schema')
+    cli_parser.add_argument('--repeat', type=int, default=5,
+                            help='Number of timed runs for each method.')
+    args = cli_parser.parse_args(arguments)
+
+    contents = []
+    for path in schema_files(args.schemas):
+        with io.open(path, encoding='utf-8') as schema_file:
+            contents.append((path, schema_file.read()))
+
+    irs = [dump_tree(tree)
+           for tree in build_all(contents, args.excluded_key, AUTO_LOADER)]
+
+    print('{} files, {} bytes of schemas, {} bytes of IR'.format(
+        len(contents),
+        sum(len(content.encode('utf-8')) for _, content in contents),
+        sum(len(ir) for ir in irs)))
+
+    timings = [
+        ('full_load + build',
+         lambda: build_all(contents, args.excluded_key, FULL_LOADER)),
+        ('auto loader + build',
+         lambda: build_all(contents, args.excluded_key, AUTO_LOADER)),
+        ('IR load', lambda: load_all(irs)),
+    ]
+
+    results = []
+    for label, func in timings:
+        results.append((label, min(timeit.repeat(func, number=1,
+                                                 repeat=args.repeat))))
+
+    ir_time = results[-1][1]
+    for label, best in results:
+        print('{:<20} {:>10.4f}s {:>8.1f}x'.format(label, best,
+                                                   best / ir_time))
+
+
+if __name__ == '__main__':
+    main()
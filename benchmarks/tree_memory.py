@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Memory benchmark for ``TreeNode`` trees.
+
+It builds the trees of all the given schemas, as a process checking links
+across a whole corpus would do, and reports the bytes allocated per node by
+the current slotted and interned ``TreeNode``, and by the same trees made of
+nodes laid out as before, i.e. with a per-instance dictionary and their own
+copy of every value.
+
+Usage, with ``jsonschema2rst`` installed or in the ``PYTHONPATH``:
+    python benchmarks/tree_memory.py path/to/schemas [more/schemas.yml ...]
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import argparse
+import os
+import tracemalloc
+
+import yaml
+
+from jsonschema2rst.rst_writer import JSON_EXTENSION, YML_EXTENSION
+from jsonschema2rst.tree_node import TreeNode
+
+
+class LegacyTreeNode(object):
+    """Node with the layout ``TreeNode`` had before using slots."""
+
+    def __init__(self, val='', parent=None):
+        self.value = val
+        self.children = []
+        self.parent = parent
+        self.id = self.value
+
+        if parent is not None:
+            parent.children.append(self)
+            self.lvl = parent.lvl + 1
+        else:
+            self.lvl = 0
+
+
+def _copy(value):
+    # a distinct string object, as the ones created by the YAML loader
+    return (value + ' ')[:-1]
+
+
+def to_legacy(tree):
+    legacy_root = LegacyTreeNode(_copy(tree.value))
+    nodes = [(tree, legacy_root)]
+    while nodes:
+        node, legacy = nodes.pop()
+        for child in node.children:
+            nodes.append((child, LegacyTreeNode(_copy(child.value), legacy)))
+    return legacy_root
+
+
+def count_nodes(tree):
+    count = 0
+    nodes = [tree]
+    while nodes:
+        node = nodes.pop()
+        count += 1
+        nodes.extend(node.children)
+    return count
+
+
+def schema_files(paths):
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith((YML_EXTENSION, JSON_EXTENSION)):
+                    yield os.path.join(root, name)
+
+
+def traced(func, *args):
+    """
+    Call ``func`` returning its result and the bytes it allocated that are
+    still alive.
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func(*args)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return result, size
+
+
+def build_trees(schemas, excluded_key):
+    return [TreeNode.dict2tree(schema, TreeNode(name), excluded_key)
+            for name, schema in schemas]
+
+
+def main(arguments=None):
+    cli_parser = argparse.ArgumentParser(description=__doc__)
+    cli_parser.add_argument('schemas', nargs='+',
+                            help='Schema files or folders containing them.')
+    cli_parser.add_argument('--excluded-key',
+                            default='uniqueItems,additionalProperties,$schema')
+    args = cli_parser.parse_args(arguments)
+
+    schemas = []
+    for path in schema_files(args.schemas):
+        with open(path) as schema_file:
+            schemas.append((os.path.basename(path),
+                            yaml.full_load(schema_file)))
+
+    trees, size = traced(build_trees, schemas, args.excluded_key)
+    legacy_trees, legacy_size = traced(
+        lambda: [to_legacy(tree) for tree in trees])
+
+    nodes = sum(count_nodes(tree) for tree in trees)
+
+    print('schemas: {}, nodes: {}'.format(len(schemas), nodes))
+    print('before: {:8.1f} bytes/node'.format(legacy_size / nodes))
+    print('after:  {:8.1f} bytes/node'.format(size / nodes))
+
+
+if __name__ == '__main__':
+    main()
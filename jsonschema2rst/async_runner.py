@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+"""
+This module runs the conversion of a schemas folder on an ``asyncio`` event
+loop, so that reading the schemas and writing their documentation, which
+can be slow on network file systems, overlaps with their conversion.
+
+It needs Python 3.5 or later.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from jsonschema2rst.context import ALL_LABELS
+from jsonschema2rst.conversion_run import (ConversionResult, anchor_pointers,
+                                           check_run_options, finish_run,
+                                           page_outputs, plan_run, task_tree)
+from jsonschema2rst.dependencies import schema_refs
+from jsonschema2rst.file_writer import write_if_changed
+from jsonschema2rst.loaders import AUTO_LOADER
+from jsonschema2rst.manifest import file_hash
+from jsonschema2rst.parser import tree2rst_pages
+from jsonschema2rst.profiler import StageTimer
+from jsonschema2rst.tree_cache import DEFAULT_CACHE_SIZE
+
+# the maximum number of file reads and writes in flight at the same time
+DEFAULT_MAX_IO = 16
+
+
+async def run_parser_async(
+    input_path,
+    output_path,
+    excluded_key="uniqueItems,additionalProperties,$schema",
+    yaml_only=False,
+    jobs=1,
+    force=False,
+    loader=AUTO_LOADER,
+    cache_path=None,
+    cache_size=DEFAULT_CACHE_SIZE,
+    profile=None,
+    profile_slowest=0,
+    threads=False,
+    hierarchical_index=False,
+    index_fanout=None,
+    split_threshold=None,
+    labels=ALL_LABELS,
+    anchor_length=None,
+    max_io=DEFAULT_MAX_IO,
+):
+    """
+    Coroutine doing what ``run_parser`` does, but reading the schemas and
+    writing their documentation in a pool of ``max_io`` threads while the
+    schemas already read are converted by an executor. The generated files
+    are the same as the ones of ``run_parser``, and the schemas are reported
+    in the order they are found, whatever the order they complete in.
+
+    Args:
+        max_io(int): the maximum number of file reads and writes in flight
+            at the same time.
+
+        jobs(int): number of worker processes converting the schemas. With
+            ``1`` (default) they are converted by a single thread, with ``0``
+            or less one worker per CPU is used.
+
+        The other arguments are the ones of ``run_parser``. Memory tracing
+        is not available.
+
+    Raises:
+        OSError: if ``output_path``is not accessible (Permission denied)
+
+        ValueError: if ``index_fanout``, ``labels``, ``anchor_length`` or
+            ``max_io`` are not valid, or if two labels of a schema have the
+            same short anchor.
+    """
+    if not os.path.exists(input_path):
+        raise IOError('Wrong path: {}. Program will exit'.format(input_path))
+
+    check_run_options(index_fanout, labels, anchor_length)
+    if max_io < 1:
+        raise ValueError('The maximum number of file reads and writes in '
+                         'flight must be at least 1, not {}.'.format(max_io))
+
+    if jobs is not None and jobs <= 0:
+        jobs = multiprocessing.cpu_count()
+    workers = jobs or 1
+
+    loop = asyncio.get_event_loop()
+    io_executor = ThreadPoolExecutor(max_io)
+    if threads or workers == 1:
+        cpu_executor = ThreadPoolExecutor(workers)
+    else:
+        cpu_executor = ProcessPoolExecutor(workers)
+
+    io_slots = asyncio.Semaphore(max_io)
+
+    def hash_files(file_names):
+        # called by plan_run, which must not run in io_executor: it waits
+        # for the hashes computed there
+        return asyncio.run_coroutine_threadsafe(_hash_files(
+            file_names, loop, io_executor, io_slots), loop).result()
+
+    try:
+        plan = await loop.run_in_executor(None, partial(
+            plan_run, input_path, output_path, excluded_key=excluded_key,
+            yaml_only=yaml_only, jobs=jobs, force=force, loader=loader,
+            cache_path=cache_path, cache_size=cache_size, profile=profile,
+            threads=threads, hierarchical_index=hierarchical_index,
+            index_fanout=index_fanout, split_threshold=split_threshold,
+            labels=labels, anchor_length=anchor_length,
+            hash_files=hash_files))
+
+        # bounds the schemas held in memory between reading and writing
+        task_slots = asyncio.Semaphore(max_io + workers)
+        futures = [asyncio.ensure_future(_convert_task(
+            task, loop, io_executor, cpu_executor, io_slots, task_slots))
+            for task in plan.tasks]
+        try:
+            results = await asyncio.gather(*futures)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        await loop.run_in_executor(io_executor, partial(
+            finish_run, plan, results, profile=profile,
+            profile_slowest=profile_slowest))
+    finally:
+        cpu_executor.shutdown()
+        io_executor.shutdown()
+
+
+def run_async(input_path, output_path, **kwargs):
+    """
+    Run ``run_parser_async`` to completion in a new event loop. The
+    arguments are the ones of ``run_parser_async``.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(
+            run_parser_async(input_path, output_path, **kwargs))
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+async def _hash_files(file_names, loop, io_executor, io_slots):
+    """
+    Return the hashes of the content of ``file_names``, reading up to
+    ``io_slots`` files at the same time.
+    """
+    async def hash_file(file_name):
+        async with io_slots:
+            return await loop.run_in_executor(io_executor, file_hash,
+                                              file_name)
+
+    return await asyncio.gather(*[hash_file(file_name)
+                                  for file_name in file_names])
+
+
+async def _convert_task(task, loop, io_executor, cpu_executor, io_slots,
+                        task_slots):
+    """
+    Read, convert and write the schema of a ``ConversionTask``, returning
+    its ``ConversionResult``.
+    """
+    async with task_slots:
+        async with io_slots:
+            read_timer = StageTimer()
+            content = await loop.run_in_executor(io_executor, _read,
+                                                 task.file_name)
+            read_timer.lap('read')
+
+        pages, output_hash, refs, anchors, render_stages = \
+            await loop.run_in_executor(cpu_executor, _render, task, content)
+
+        changed = 0
+        write_timer = StageTimer()
+        for output, data in pages:
+            async with io_slots:
+                write_timer.lap('wait')
+                changed += await loop.run_in_executor(
+                    io_executor, write_if_changed, output, data)
+                write_timer.lap('write')
+
+    stages = read_timer.stages
+    stages.update(render_stages)
+    stages['write'] = write_timer.stages['write']
+    return ConversionResult(task.file_name, output_hash, refs, stages, None,
+                            None, changed,
+                            [os.path.basename(output)
+                             for output, _ in pages[1:]], anchors)
+
+
+def _read(file_name):
+    with open(file_name, 'rb') as schema:
+        return schema.read()
+
+
+def _render(task, content):
+    """
+    Convert the ``content`` of the schema of ``task``, returning the output
+    file and the encoded RST text of every page, the main one first, the
+    hash of the main page, the references of the schema, the pointers of its
+    short anchors, if any, and the time spent in every stage.
+    """
+    timer = StageTimer()
+    tree = task_tree(task, timer.lap, content)
+    refs = schema_refs(tree)
+    timer.lap('refs')
+
+    anchors = {}
+    pages = [(output, ''.join(chunks).encode('utf-8'))
+             for output, chunks in page_outputs(
+                 task.output,
+                 tree2rst_pages(tree, task.context, task.labels, anchors))]
+    output_hash = hashlib.sha1(pages[0][1]).hexdigest()
+    timer.lap('render')
+
+    return pages, output_hash, refs, \
+        anchor_pointers(task.context, anchors), timer.stages
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+This module defines the context of a conversion: the settings and caches
+every step of the conversion of a schema reads, instead of module globals,
+so that conversions can run concurrently in the same process.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from jsonschema2rst.loaders import AUTO_LOADER
+
+SORTING_ORDER = [
+    "title",
+    "description",
+    "type",
+    "format",
+    "minimum",
+    "maximum",
+    "pattern",
+    "required"
+]
+
+# the section labels emitted: all of them, or only the ones referenced by
+# some page of the converted schemas
+ALL_LABELS = 'all'
+REFERENCED_LABELS = 'referenced'
+LABELS = (ALL_LABELS, REFERENCED_LABELS)
+
+
+class ConversionContext(object):
+    """Settings and caches of one or more conversions.
+
+    A context is not modified by the conversions using it, hence the same
+    context can be shared by conversions running in different threads or
+    sent to other processes.
+    """
+
+    def __init__(self, excluded_key='', sorting_order=SORTING_ORDER,
+                 loader=AUTO_LOADER, cache=None, split_threshold=None,
+                 labels=ALL_LABELS, anchor_length=None):
+        """
+        Constructor.
+
+        Args:
+            excluded_key(string): csv containing schema's keywords to ignore
+
+            sorting_order(list<string>): the keywords rendered first, in
+                this order, among the children of a node.
+
+            loader(string): the loader used to read the schemas, one of
+                ``loaders.LOADERS``.
+
+            cache(``TreeCache``): the on-disk cache of the built trees, if
+                any.
+
+            split_threshold(int): the number of nodes above which the
+                sub-tree of a top-level property is rendered in its own
+                page. If None, every schema is rendered in a single page.
+
+            labels(string): the section labels emitted, one of ``LABELS``.
+                With ``REFERENCED_LABELS`` the labels to emit are chosen
+                by the caller, see ``parser.tree2rst_pages``.
+
+            anchor_length(int): if given, labels and references use the
+                short anchors of the JSON pointers, as returned by
+                ``json_pointer_util.short_anchor`` with this length, instead
+                of the pointers themselves.
+        """
+        self.excluded_keys = frozenset(key.strip()
+                                       for key in excluded_key.split(','))
+        self.sorting_order = tuple(sorting_order)
+        self.loader = loader
+        self.cache = cache
+        self.split_threshold = split_threshold
+        self.labels = labels
+        self.anchor_length = anchor_length
+
+    def output_options(self):
+        """
+        Return the settings, other than the excluded keys, changing the
+        generated pages, to tell whether pages generated with another context
+        are still up to date. Settings with their default value are left
+        out.
+
+        Returns:
+            dict: the settings, by name.
+        """
+        options = {}
+        if self.sorting_order != tuple(SORTING_ORDER):
+            options['sorting_order'] = list(self.sorting_order)
+        if self.split_threshold is not None:
+            options['split_threshold'] = self.split_threshold
+        if self.labels != ALL_LABELS:
+            options['labels'] = self.labels
+        if self.anchor_length is not None:
+            options['anchor_length'] = self.anchor_length
+        return options
@@ -0,0 +1,727 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+This module defines the steps of a run converting a schemas folder, shared
+by ``parser_runner`` and ``async_runner``: scanning the input folder into a
+``RunPlan``, converting its ``ConversionTask`` objects and recording their
+``ConversionResult`` in the manifest, along with the indexes.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import copy
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
+
+from jsonschema2rst.context import (ALL_LABELS, LABELS, REFERENCED_LABELS,
+                                    ConversionContext)
+from jsonschema2rst.dependencies import dependents, resolve_refs, schema_refs
+from jsonschema2rst.file_writer import ComparingWriter, write_if_changed
+from jsonschema2rst.indexer import (folder_index_pages, master_index_pages,
+                                    write_index_pages)
+from jsonschema2rst.json_pointer_util import short_anchor
+from jsonschema2rst.loaders import AUTO_LOADER, load_schema, loads_schema
+from jsonschema2rst.manifest import Manifest, file_hash
+from jsonschema2rst.memory import (MemoryBudgetExceeded, MemoryTracer,
+                                   format_peaks)
+from jsonschema2rst.parser import (content2tree, referenced_pointers,
+                                   tree2rst_pages)
+from jsonschema2rst.profiler import (ConversionProfile, StageTimer,
+                                     profile_call, stats_file_name)
+from jsonschema2rst.rst_writer import (JSON_EXTENSION, RST_EXTENSION,
+                                       YML_EXTENSION, change_extension)
+from jsonschema2rst.tree_cache import DEFAULT_CACHE_SIZE, TreeCache
+
+# the map from the JSON pointers to the short anchors, in the output folder
+ANCHORS_FILE_NAME = 'jsonschema2rst-anchors.json'
+
+# the bounds of the number of hex digits of a short anchor
+_MIN_ANCHOR_LENGTH = 4
+_MAX_ANCHOR_LENGTH = 40
+
+# the conversion of a schema, as handed to the workers; ``labels`` is the
+# set of the section labels to emit, or None to emit all of them
+ConversionTask = namedtuple('ConversionTask', [
+    'file_name', 'output', 'context', 'cache_key', 'profile', 'trace_memory',
+    'memory_budget', 'labels'])
+
+# ``output_hash`` is None if the conversion was stopped because of ``error``
+# ``changed`` counts the output files written, ``pages`` lists the file
+# names of the extra pages of a split schema and ``anchors`` the JSON
+# pointers of the labels emitted as short anchors, or is None
+ConversionResult = namedtuple('ConversionResult', [
+    'file_name', 'output_hash', 'refs', 'stages', 'memory', 'error',
+    'changed', 'pages', 'anchors'])
+
+# a run, once the input folder has been scanned: ``pending`` maps the input
+# file of every task to its manifest names and hash, ``folders`` lists the
+# sub folders having an index and ``folder_indexes`` maps every one of them
+# to the sub folders listed in its index. When only the referenced labels
+# are emitted, ``links`` maps every input file name to the targets its pages
+# reference and ``labels`` to the digest of the labels emitted in them,
+# otherwise both are None
+RunPlan = namedtuple('RunPlan', [
+    'output_path', 'manifest', 'previous_manifest', 'cache', 'tasks',
+    'pending', 'up_to_date', 'timer', 'conversion_profile', 'folders',
+    'folder_indexes', 'hierarchical_index', 'index_fanout', 'links',
+    'labels', 'anchor_length'])
+
+
+def check_run_options(index_fanout, labels, anchor_length):
+    """
+    Check the options of a run, as for ``run_parser``.
+
+    Raises:
+        ValueError: if ``index_fanout`` is lower than 2, if ``labels`` is
+            unknown or if ``anchor_length`` is out of its bounds.
+    """
+    _check_index_fanout(index_fanout)
+    _check_labels(labels)
+    _check_anchor_length(anchor_length)
+
+
+def _check_index_fanout(index_fanout):
+    if index_fanout is not None and index_fanout < 2:
+        raise ValueError('The index fan-out must be at least 2, not '
+                         '{}.'.format(index_fanout))
+
+
+def _check_labels(labels):
+    if labels not in LABELS:
+        raise ValueError('Unknown labels {}, expected one of {}.'.format(
+            labels, ', '.join(LABELS)))
+
+
+def _check_anchor_length(anchor_length):
+    if anchor_length is not None and not \
+            _MIN_ANCHOR_LENGTH <= anchor_length <= _MAX_ANCHOR_LENGTH:
+        raise ValueError('The anchor length must be between {} and {}, not '
+                         '{}.'.format(_MIN_ANCHOR_LENGTH, _MAX_ANCHOR_LENGTH,
+                                      anchor_length))
+
+
+def plan_run(
+    input_path,
+    output_path,
+    excluded_key="uniqueItems,additionalProperties,$schema",
+    yaml_only=False,
+    jobs=1,
+    force=False,
+    loader=AUTO_LOADER,
+    cache_path=None,
+    cache_size=DEFAULT_CACHE_SIZE,
+    profile=None,
+    trace_memory=False,
+    memory_budget=None,
+    threads=False,
+    hierarchical_index=False,
+    index_fanout=None,
+    split_threshold=None,
+    labels=ALL_LABELS,
+    anchor_length=None,
+    hash_files=None,
+):
+    """
+    Scan ``input_path``, creating the output folders, and return the
+    ``RunPlan`` of the schemas to convert. The arguments are the ones of
+    ``run_parser``, and are better given by name: ``jobs`` and ``threads``
+    are used to collect the references of the schemas, when only the
+    referenced labels are emitted.
+
+    Args:
+        hash_files(function): given the list of the schema files, returns
+            the list of the hashes of their content. By default, the files
+            are hashed one after the other.
+    """
+    timer = StageTimer()
+    conversion_profile = None
+    if profile is not None:
+        conversion_profile = ConversionProfile()
+
+    output_path = os.path.abspath(output_path)
+    input_files = os.walk(input_path)
+
+    context = ConversionContext(excluded_key, loader=loader,
+                                split_threshold=split_threshold,
+                                labels=labels, anchor_length=anchor_length)
+    options = context.output_options()
+
+    previous_manifest = Manifest.load(output_path, excluded_key,
+                                      options=options)
+    manifest = Manifest(output_path, excluded_key, previous_manifest.version,
+                        os.path.abspath(input_path), options)
+
+    cache = None
+    if cache_path is not None:
+        cache = TreeCache(cache_path, cache_size, manifest.version)
+    context.cache = cache
+
+    processed_files = set()
+    schemas = []
+    folders = []
+    folder_indexes = {}
+
+    for input_file in input_files:
+        root, dirs, files = input_file
+
+        # create, if not exists, the sub folder where rst file will be written
+        output_folder = _get_output_folder(output_path, input_path, root)
+        if not os.path.exists(output_folder):
+            os.makedirs(output_folder)
+
+        # every sub-folder has an index, written at the end with the master
+        # index of the output folder
+        rel_path = os.path.relpath(root, input_path)
+        if rel_path != os.curdir:
+            folder_indexes[rel_path] = list(dirs) if hierarchical_index \
+                else []
+            folders.append(rel_path)
+
+        for name in files:
+
+            if (
+                name.endswith(YML_EXTENSION) or
+                (not yaml_only and name.endswith(JSON_EXTENSION))
+            ):
+
+                # check if a file with same name has been already parsed
+                abs_name = change_extension(name, '')
+                if abs_name in processed_files:
+                    continue
+
+                file_name = os.path.join(root, name)
+                output = os.path.join(output_folder, _get_rst_name(name))
+                processed_files.add(abs_name)
+
+                schemas.append((
+                    file_name,
+                    output,
+                    os.path.relpath(file_name, input_path),
+                    os.path.relpath(output, output_path),
+                ))
+
+    if hash_files is None:
+        hash_files = _hash_files
+    hashes = hash_files([schema[0] for schema in schemas])
+    schemas = [(file_name, output, input_name, input_hash, output_name)
+               for (file_name, output, input_name, output_name), input_hash
+               in zip(schemas, hashes)]
+
+    changed = set()
+    for file_name, output, input_name, input_hash, output_name in schemas:
+        if force or not previous_manifest.is_up_to_date(
+                input_name, input_hash, output_name):
+            changed.add(input_name)
+
+    # schemas referencing a changed or deleted schema are converted again
+    current = set(schema[2] for schema in schemas)
+    deleted = set(previous_manifest.entries) - current
+    to_convert = changed | dependents(previous_manifest.entries,
+                                      changed | deleted)
+
+    links = None
+    label_sets = {}
+    label_digests = None
+    if labels == REFERENCED_LABELS:
+        # schemas whose labels are referenced differently are converted again
+        links = _schema_links(schemas, previous_manifest, context,
+                              excluded_key, jobs, threads)
+        label_sets = _schema_labels(schemas, links)
+        label_digests = {}
+        for input_name, label_set in label_sets.items():
+            label_digests[input_name] = _labels_digest(label_set)
+            entry = previous_manifest.entries.get(input_name)
+            if entry is not None and \
+                    entry.get('labels') != label_digests[input_name]:
+                to_convert.add(input_name)
+
+    tasks = []
+    pending = {}
+    up_to_date = 0
+
+    for file_name, output, input_name, input_hash, output_name in schemas:
+        if input_name in to_convert:
+            tasks.append(ConversionTask(
+                file_name, output, context,
+                _cache_key(cache, file_name, input_hash, excluded_key),
+                conversion_profile is not None, trace_memory, memory_budget,
+                label_sets.get(input_name)))
+            pending[file_name] = (input_name, input_hash, output_name)
+        else:
+            manifest.copy_entry(previous_manifest, input_name)
+            up_to_date += 1
+
+    timer.lap('scan')
+
+    return RunPlan(output_path, manifest, previous_manifest, cache, tasks,
+                   pending, up_to_date, timer, conversion_profile, folders,
+                   folder_indexes, hierarchical_index, index_fanout, links,
+                   label_digests, anchor_length)
+
+
+def _hash_files(file_names):
+    return [file_hash(file_name) for file_name in file_names]
+
+
+def _cache_key(cache, file_name, input_hash, excluded_key):
+    if cache is None:
+        return None
+    return cache.key(os.path.basename(file_name), input_hash, excluded_key)
+
+
+def _schema_links(schemas, previous_manifest, context, excluded_key, jobs,
+                  threads):
+    """
+    Return the targets referenced by the pages of every schema in
+    ``schemas``, by input file name: the ones recorded in the previous
+    manifest for the schemas which did not change, and the ones found
+    rendering the others, as they are handed to ``jobs`` workers.
+    """
+    links = {}
+    input_names = {}
+    tasks = []
+
+    for file_name, output, input_name, input_hash, output_name in schemas:
+        entry = previous_manifest.entries.get(input_name)
+        if entry is not None and entry['input_hash'] == input_hash and \
+                'links' in entry:
+            links[input_name] = entry['links']
+            continue
+        input_names[file_name] = input_name
+        tasks.append(ConversionTask(
+            file_name, output, context,
+            _cache_key(context.cache, file_name, input_hash, excluded_key),
+            False, False, None, None))
+
+    for file_name, targets in _map_tasks(_collect_links, tasks, jobs,
+                                         threads):
+        links[input_names[file_name]] = targets
+    return links
+
+
+def _schema_labels(schemas, links):
+    """
+    Return the section labels to emit in the pages of every schema in
+    ``schemas``, by input file name: the targets in ``links`` pointing in
+    the schema.
+    """
+    referenced = {}
+    for targets in links.values():
+        for target in targets:
+            document, separator, _ = target.partition('#')
+            if separator:
+                referenced.setdefault(document, set()).add(target)
+
+    label_sets = {}
+    for file_name, output, input_name, input_hash, output_name in schemas:
+        document = os.path.basename(change_extension(file_name,
+                                                     JSON_EXTENSION))
+        label_sets[input_name] = frozenset(referenced.get(document, ()))
+    return label_sets
+
+
+def _labels_digest(labels):
+    digest = hashlib.sha1()
+    for label in sorted(labels):
+        digest.update(label.encode('utf-8') + b'\n')
+    return digest.hexdigest()
+
+
+def finish_run(plan, results, trace_memory=False, profile=None,
+               profile_slowest=0):
+    """
+    Record every ``ConversionResult`` of ``results`` in the manifest of
+    ``plan``, printing its outcome, then write the indexes of the converted
+    schemas, remove the outputs of the deleted ones and save the manifest.
+    The other arguments are the ones of ``run_parser``.
+    """
+    output_path = plan.output_path
+    manifest = plan.manifest
+    conversion_profile = plan.conversion_profile
+    index_fanout = plan.index_fanout
+
+    skipped = 0
+    changed_files = 0
+
+    for result in results:
+        input_name, input_hash, output_name = \
+            plan.pending[result.file_name]
+        name = change_extension(os.path.basename(result.file_name), '')
+
+        if conversion_profile is not None:
+            conversion_profile.add_file(input_name, result.stages,
+                                        result.memory)
+
+        if result.output_hash is None:
+            print(name.ljust(40) + 'SKIPPED: ' + result.error)
+            skipped += 1
+            changed_files += result.changed
+            continue
+
+        changed_files += result.changed
+        output_folder = os.path.dirname(output_name)
+        manifest.add(input_name, input_hash, output_name, result.output_hash,
+                     resolve_refs(result.refs, input_name),
+                     [os.path.join(output_folder, page)
+                      for page in result.pages],
+                     plan.links[input_name]
+                     if plan.links is not None else None,
+                     plan.labels[input_name]
+                     if plan.labels is not None else None,
+                     result.anchors)
+
+        if trace_memory:
+            print(name.ljust(40) + 'OK  ' + format_peaks(result.memory))
+        else:
+            print(name.ljust(40) + 'OK')
+
+    plan.timer.lap('convert')
+
+    if plan.up_to_date:
+        print('{} schemas up to date.'.format(plan.up_to_date))
+
+    if skipped:
+        print('{} schemas skipped.'.format(skipped))
+
+    if plan.cache is not None:
+        plan.cache.evict()
+
+    # the indexes list the schemas converted, by folder: the extra pages of
+    # split schemas are listed by their schema
+    outputs = manifest.outputs()
+    folder_schemas = {}
+    for input_name in manifest.entries:
+        folder_schemas.setdefault(os.path.dirname(input_name), []).append(
+            os.path.basename(input_name))
+
+    manifest.indexes = []
+    for folder, sub_folders in sorted(plan.folder_indexes.items()):
+        pages = folder_index_pages(os.path.basename(folder),
+                                   folder_schemas.get(folder, ()),
+                                   sub_folders, index_fanout)
+        changed_files += write_index_pages(os.path.join(output_path, folder),
+                                           pages)
+        manifest.indexes.extend(os.path.join(folder, file_name)
+                                for file_name, _ in pages)
+
+    folders = plan.folders
+    if plan.hierarchical_index:
+        folders = [folder for folder in folders
+                   if not os.path.dirname(folder)]
+    pages = master_index_pages(folder_schemas.get('', ()), folders,
+                               index_fanout)
+    manifest.indexes.extend(file_name for file_name, _ in pages)
+
+    # remove outputs whose schema has been deleted, and index pages not
+    # written anymore
+    previous_manifest = plan.previous_manifest
+    removed = (previous_manifest.outputs() - outputs) | \
+        (previous_manifest.stale_outputs - outputs) | \
+        (set(previous_manifest.indexes) - set(manifest.indexes) - outputs)
+    for output_name in removed:
+        output = os.path.join(output_path, output_name)
+        if os.path.exists(output):
+            os.remove(output)
+            changed_files += 1
+
+    manifest.save()
+    plan.timer.lap('manifest')
+
+    changed_files += write_anchors(output_path,
+                                   anchors_map(manifest, plan.anchor_length))
+    changed_files += write_index_pages(output_path, pages)
+    plan.timer.lap('index')
+    print('{} files changed.'.format(changed_files))
+    print('Index created.\n')
+
+    if conversion_profile is not None:
+        conversion_profile.run_stages = plan.timer.stages
+        _profile_slowest(conversion_profile, plan.tasks, plan.pending,
+                         profile, profile_slowest)
+        conversion_profile.save(profile)
+        print(conversion_profile.summary())
+        print('Profile report written to {}.\n'.format(profile))
+
+
+def anchors_map(manifest, anchor_length):
+    """
+    Return the map from the JSON pointers of the labels of all the schemas in
+    ``manifest`` to their short anchors, or None if labels are not shortened.
+    """
+    if anchor_length is None:
+        return None
+
+    anchors = {}
+    for entry in manifest.entries.values():
+        for pointer in entry.get('anchors', ()):
+            anchors[pointer] = short_anchor(pointer, anchor_length)
+    return anchors
+
+
+def write_anchors(output_path, anchors):
+    """
+    Write the ``anchors`` map, as returned by ``anchors_map``, in
+    ``output_path``, or remove it if it is None. Return the number of files
+    changed.
+    """
+    path = os.path.join(output_path, ANCHORS_FILE_NAME)
+    if anchors is None:
+        if os.path.exists(path):
+            os.remove(path)
+            return 1
+        return 0
+
+    return write_if_changed(path, json.dumps(
+        anchors, indent=1, sort_keys=True).encode('utf-8'))
+
+
+def _profile_slowest(conversion_profile, tasks, pending, profile, count):
+    """
+    Convert again the ``count`` slowest schemas under ``cProfile``, writing
+    their output in a temporary folder which is then removed, and save the
+    statistics next to the ``profile`` report. The trees are built again
+    rather than read from the cache, which the first conversion filled.
+    """
+    stats_folder = os.path.dirname(os.path.abspath(profile))
+    input_tasks = dict((pending[task.file_name][0], task) for task in tasks)
+
+    # outputs are replaced atomically, hence they can not be os.devnull
+    output_folder = tempfile.mkdtemp(prefix='jsonschema2rst-profile-')
+    try:
+        for input_name in conversion_profile.slowest(count):
+            task = input_tasks[input_name]
+            context = copy.copy(task.context)
+            context.cache = None
+            stats_path = os.path.join(stats_folder,
+                                      stats_file_name(input_name))
+            output = os.path.join(output_folder,
+                                  os.path.basename(task.output))
+            profile_call(stats_path, _convert_file,
+                         task._replace(output=output, context=context,
+                                       cache_key=None))
+            conversion_profile.add_profile(input_name, stats_path)
+    finally:
+        shutil.rmtree(output_folder)
+
+
+def convert_files(tasks, jobs, threads=False):
+    """
+    Convert every ``ConversionTask``, yielding the ``ConversionResult`` of
+    each schema as soon as it is written.
+
+    When more than one job is requested the tasks are handed to a process
+    pool, or a thread pool if ``threads`` is set, largest input first, so
+    that a single huge schema does not end up being converted last. Every
+    task writes its own output file, thus the completion order has no effect
+    on the generated content.
+    """
+    return _map_tasks(_convert_file, tasks, jobs, threads)
+
+
+def _map_tasks(func, tasks, jobs, threads=False):
+    """
+    Apply ``func`` to every ``ConversionTask``, yielding the results as
+    soon as they are ready, as described in ``convert_files``.
+    """
+    if jobs is not None and jobs <= 0:
+        jobs = multiprocessing.cpu_count()
+
+    if jobs is None or jobs == 1 or len(tasks) < 2:
+        for task in tasks:
+            yield func(task)
+        return
+
+    tasks = sorted(tasks, key=lambda task: os.path.getsize(task.file_name),
+                   reverse=True)
+    workers = min(jobs, len(tasks))
+    pool = ThreadPool(workers) if threads else multiprocessing.Pool(workers)
+    try:
+        for result in pool.imap_unordered(func, tasks):
+            yield result
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def _convert_file(task):
+    """
+    Convert the schema of ``task``, returning a ``ConversionResult``. When
+    the conversion exceeds the memory budget of the task, its output and
+    every page written for it are removed and the result has no output hash.
+    """
+    timer = StageTimer()
+    tracer = None
+    if task.trace_memory or task.memory_budget is not None:
+        tracer = MemoryTracer(task.memory_budget)
+        tracer.start()
+
+    written = []
+    try:
+        output_hash, refs, changed, pages, anchors = _convert(
+            task, timer, tracer, written)
+    except MemoryBudgetExceeded as error:
+        changed = 0
+        for output in set(written + [task.output]):
+            if os.path.exists(output):
+                os.remove(output)
+                changed += 1
+        return ConversionResult(task.file_name, None, [], timer.stages,
+                                tracer.peaks, str(error), changed, [], None)
+    finally:
+        if tracer is not None:
+            tracer.stop()
+
+    return ConversionResult(task.file_name, output_hash, refs, timer.stages,
+                            tracer.peaks if tracer is not None else None,
+                            None, changed, pages, anchors)
+
+
+def _convert(task, timer, tracer, written):
+    """
+    Convert the schema of ``task`` as described in ``_convert_file``,
+    appending every page written to ``written``.
+    """
+    def end_stage(stage):
+        timer.lap(stage)
+        if tracer is not None:
+            tracer.end_stage(stage)
+
+    tree = task_tree(task, end_stage)
+    refs = schema_refs(tree)
+    end_stage('refs')
+    digest = hashlib.sha1()
+    changed = 0
+    pages = []
+    anchors = {}
+
+    # the main page comes first, its hash is the one of the output
+    for output, chunks in page_outputs(
+            task.output,
+            tree2rst_pages(tree, task.context, task.labels, anchors)):
+        with ComparingWriter(output) as rst_out:
+            for chunk in chunks:
+                chunk = chunk.encode('utf-8')
+                if output == task.output:
+                    digest.update(chunk)
+                if tracer is not None:
+                    tracer.check('render')
+                if task.profile:  # tell rendering and writing apart
+                    timer.lap('render')
+                    rst_out.write(chunk)
+                    timer.lap('write')
+                else:
+                    rst_out.write(chunk)
+        written.append(output)
+        changed += rst_out.changed
+        if output != task.output:
+            pages.append(os.path.basename(output))
+    if tracer is not None:
+        tracer.end_stage('render')
+    timer.lap('write' if task.profile else 'render')
+
+    return digest.hexdigest(), refs, changed, pages, anchor_pointers(
+        task.context, anchors)
+
+
+def anchor_pointers(context, anchors):
+    # the pointers of the labels emitted as short anchors, if any
+    if context.anchor_length is None:
+        return None
+    return sorted(anchors.values())
+
+
+def task_tree(task, end_stage, content=None):
+    """
+    Return the tree of the schema of ``task``, from the cache of its context
+    if there, calling ``end_stage`` at the end of every stage. The schema is
+    loaded from ``content``, the bytes of its file, if given, otherwise from
+    its file.
+    """
+    tree = None
+    cache = task.context.cache
+    if cache is not None:
+        tree = cache.get(task.cache_key)
+        end_stage('cache')
+
+    if tree is None:
+        if content is None:
+            with open(task.file_name) as schema:
+                schema_content = load_schema(schema, task.context.loader)
+        else:
+            schema_content = loads_schema(content, task.file_name,
+                                          task.context.loader)
+        end_stage('load')
+
+        tree = content2tree(schema_content, task.file_name, None,
+                            task.context)
+        end_stage('build')
+
+        # store it before rendering, which modifies the tree
+        if cache is not None:
+            cache.put(task.cache_key, tree)
+            end_stage('cache')
+
+    return tree
+
+
+def _collect_links(task):
+    """
+    Return the input file of ``task`` with the sorted targets referenced by
+    the pages of its schema, which are not written.
+    """
+    tree = task_tree(task, lambda stage: None)
+    return task.file_name, sorted(referenced_pointers(tree, task.context))
+
+
+def page_outputs(output, pages):
+    """
+    Yield the output file of every page returned by ``tree2rst_pages`` for
+    the schema documented in ``output``, with the fragments of its content.
+    """
+    output_folder = os.path.dirname(output)
+    for index, (name, chunks) in enumerate(pages):
+        if index:
+            yield os.path.join(output_folder, name + RST_EXTENSION), chunks
+        else:
+            yield output, chunks
+
+
+def _get_rst_name(name):
+    return change_extension(name, RST_EXTENSION)
+
+
+def _get_output_folder(out_dir, input_root, current_path):
+    path_diff = os.path.relpath(current_path, input_root)
+    return os.path.join(out_dir, path_diff)
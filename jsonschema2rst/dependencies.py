@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+This module records which schemas point at which others through ``$ref``,
+so that a change in a referenced schema can be propagated to its dependents.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+
+from jsonschema2rst.json_pointer_util import split_key_val
+from jsonschema2rst.rst_writer import change_extension
+
+_REF_KEY = '$ref'
+
+
+def schema_refs(tree):
+    """
+    Return the values of all ``$ref`` nodes in the given tree, in the order
+    they appear in it.
+
+    Args:
+        tree(``TreeNode``): the tree representing a schema.
+
+    Returns:
+        list<string>: the referenced values, e.g. ``elements/title.json``
+    """
+    refs = []
+    nodes = [tree]
+    while nodes:
+        node = nodes.pop()
+        if node.value.startswith(_REF_KEY + ': '):
+            refs.append(split_key_val(node.value)[1])
+        nodes.extend(reversed(node.children))
+    return refs
+
+
+def resolve_ref(ref, input_name):
+    """
+    Resolve a ``$ref`` value to the schema it points at. The reference is
+    relative to the folder of the referencing schema. Since schemas are
+    usually referenced by their ``.json`` name while their source is written
+    in ``.yml``, the result has no extension.
+
+    Example:
+        resolve_ref('elements/title.json', 'records/hep.yml')
+            -->     'records/elements/title'
+
+    Args:
+        ref(string): the ``$ref`` value.
+
+        input_name(string): the referencing schema, relative to the input
+            folder.
+
+    Returns:
+        string: the referenced schema without extension, relative to the
+            input folder, or None if ``ref`` points inside the same schema
+            or to an absolute URL.
+    """
+    path = ref.split('#')[0]
+    if not path or '://' in path:
+        return None
+
+    path = os.path.join(os.path.dirname(input_name), path)
+    return change_extension(os.path.normpath(path), '')
+
+
+def resolve_refs(refs, input_name):
+    """
+    Resolve every value in ``refs`` with ``resolve_ref``.
+
+    Returns:
+        list<string>: the sorted referenced schemas, without duplicates.
+    """
+    resolved = set(resolve_ref(ref, input_name) for ref in refs)
+    resolved.discard(None)
+    return sorted(resolved)
+
+
+def dependents(entries, input_names):
+    """
+    Return the schemas directly referencing any of ``input_names``.
+
+    Args:
+        entries(dict): the manifest entries, mapping every converted schema
+            to a dict whose ``refs`` field lists the schemas it references.
+
+        input_names(iterable<string>): the schemas, relative to the input
+            folder, whose dependents are searched.
+
+    Returns:
+        set<string>: the names of the dependent schemas.
+    """
+    targets = set(change_extension(name, '') for name in input_names)
+    return set(name for name, entry in entries.items()
+               if targets.intersection(entry.get('refs', ())))
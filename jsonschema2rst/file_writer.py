@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+"""
+This module writes the generated files only when their content changes, so
+that the files which are the same as in the previous run keep their
+modification time and tools like Sphinx do not read them again.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import threading
+
+from jsonschema2rst.manifest import replace_file
+
+_BLOCK_SIZE = 64 * 1024
+
+
+def write_if_changed(path, data):
+    """
+    Write ``data`` in ``path``, unless the file already holds it.
+
+    Args:
+        path(string): the file to write.
+        data(bytes): its new content.
+
+    Returns:
+        bool: whether the file was written.
+    """
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as current:
+                if current.read() == data:
+                    return False
+    except (IOError, OSError):
+        pass
+
+    tmp_path = _tmp_path(path)
+    try:
+        with open(tmp_path, 'wb') as out:
+            out.write(data)
+        replace_file(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+class ComparingWriter(object):
+    """Binary file writer leaving the file untouched if its content does not
+    change.
+
+    The chunks written are compared with the current content of the file as
+    they come, so the new content is never held in memory. On the first
+    difference the common prefix is copied to a temporary file, where the
+    following chunks are written, and the file is replaced by it when the
+    writer is closed. ``changed`` tells whether the file was written.
+
+    When used as a context manager, an exception discards the new content and
+    leaves the file as it was.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.changed = False
+        self._offset = 0
+        self._out = None
+        self._tmp_path = _tmp_path(path)
+        try:
+            self._current = open(path, 'rb')
+        except (IOError, OSError):
+            self._current = None
+            self._diverge()
+
+    def write(self, data):
+        if self._out is None:
+            if self._current.read(len(data)) == data:
+                self._offset += len(data)
+                return
+            self._diverge()
+        self._out.write(data)
+
+    def close(self):
+        """
+        Close the writer, replacing the file if its content changed.
+        """
+        if self._out is None and self._current.read(1):
+            self._diverge()  # the new content is a prefix of the current one
+
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+            replace_file(self._tmp_path, self.path)
+
+    def discard(self):
+        """
+        Close the writer leaving the file as it was.
+        """
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def _diverge(self):
+        self.changed = True
+        self._out = open(self._tmp_path, 'wb')
+        if self._current is None:
+            return
+
+        self._current.seek(0)
+        remaining = self._offset
+        while remaining:
+            block = self._current.read(min(remaining, _BLOCK_SIZE))
+            if not block:
+                break
+            self._out.write(block)
+            remaining -= len(block)
+        self._current.close()
+        self._current = None
+
+
+def _tmp_path(path):
+    return '{}.{}.{}.tmp'.format(path, os.getpid(),
+                                 threading.current_thread().ident)
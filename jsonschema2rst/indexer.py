@@ -32,12 +32,15 @@ from __future__ import (absolute_import, division, print_function,
 
 import os
 
+from jsonschema2rst.file_writer import write_if_changed
 from jsonschema2rst.rst_utils import NL2, TAB, make_title
-from jsonschema2rst.rst_writer import (JSON_EXTENSION, NL, YML_EXTENSION,
-                                       change_extension)
+from jsonschema2rst.rst_writer import (JSON_EXTENSION, NL, RST_EXTENSION,
+                                       YML_EXTENSION, change_extension)
 
 INDEX_FILE_NAME = 'index.rst'
 
+INDEX_NAME = change_extension(INDEX_FILE_NAME, '')
+
 
 INDEX_HEADER = '''
 .. toctree::
@@ -59,21 +62,164 @@ def index(input_path):
     Returns:
          string: the index page content.
     """
-    content = make_title(os.path.basename(input_path), 0)
-    content += INDEX_HEADER
+    return folder_index(os.path.basename(input_path), os.listdir(input_path))
+
+
+def folder_index(title, file_names, folders=()):
+    """
+    Create the content of an index page, listing the schemas among the given
+    file names. Schemas with the same name and a different extension are
+    listed once.
+
+    Args:
+        title(string): the title of the page, usually the folder name.
+        file_names(iterable<string>): the names of the files in the folder.
+        folders(iterable<string>): the names of the sub folders whose index
+            is listed after the schemas, for a hierarchical index.
+
+    Returns:
+         string: the index page content.
+    """
+    return folder_index_pages(title, file_names, folders)[0][1]
+
+
+def folder_index_pages(title, file_names, folders=(), fanout=None):
+    """
+    Create the index pages of a folder, as ``folder_index`` does, splitting
+    them if they list more than ``fanout`` entries.
+
+    An index with too many entries lists numbered sub-indexes instead, e.g.
+    ``index-1.rst``, ``index-2.rst``, each listing up to ``fanout`` of the
+    entries, in turn split if needed.
+
+    Args:
+        title, file_names, folders: as for ``folder_index``.
+        fanout(int): the maximum number of entries of a page. If None, all
+            the entries are listed by ``index.rst``.
+
+    Returns:
+        list<(string, string)>: the file name and the content of every page,
+            ``index.rst`` first.
+    """
+    entries = _schema_names(file_names)
+    entries.extend(os.path.join(folder, INDEX_NAME)
+                   for folder in sorted(folders) if folder != "__pycache__")
+    return _index_pages(title, entries, fanout, _folder_page)
+
+
+def master_index(file_names, folders):
+    """
+    Create the content of the main index, listing the pages in the root of
+    the output folder, then the index of every sub folder, each folder
+    followed by its own sub folders. Hidden files, such as the conversion
+    manifest, are not listed.
+
+    Args:
+        file_names(iterable<string>): the names of the pages in the root of
+            the output folder.
+        folders(iterable<string>): the paths of the sub folders having an
+            index page, relative to the output folder. For a hierarchical
+            index, only the direct sub folders are given.
+
+    Returns:
+         string: the main index content.
+    """
+    return master_index_pages(file_names, folders)[0][1]
+
+
+def master_index_pages(file_names, folders, fanout=None):
+    """
+    Create the main index pages, as ``master_index`` does, splitting them as
+    ``folder_index_pages`` does if they list more than ``fanout`` entries.
+
+    Returns:
+        list<(string, string)>: the file name and the content of every page,
+            ``index.rst`` first.
+    """
+    entries = [os.path.join(os.curdir, change_extension(name, ''))
+               for name in sorted(file_names)
+               if not name.startswith('.') and name != INDEX_FILE_NAME]
+
+    for folder in sorted(folders, key=lambda folder: folder.split(os.sep)):
+        if "__pycache__" not in folder and folder != os.curdir:
+            entries.append(os.path.join(folder, INDEX_NAME))
+
+    return _index_pages(MASTER_INDEX_TITLE, entries, fanout, _master_page)
+
+
+def write_index_pages(out_path, pages):
+    """
+    Write the index pages created by ``folder_index_pages`` or
+    ``master_index_pages`` in the given path, as ``write_index_file`` does.
+
+    Returns:
+        int: the number of pages written.
+    """
+    return sum(write_if_changed(os.path.join(out_path, file_name),
+                                content.encode('utf-8'))
+               for file_name, content in pages)
+
 
-    processed_files = []
+def _schema_names(file_names):
+    names = []
+    processed_files = set()
 
-    for file_name in sorted(os.listdir(input_path)):
+    for file_name in sorted(file_names):
         if file_name.endswith(YML_EXTENSION) or \
                 file_name.endswith(JSON_EXTENSION):
             # remove the extension
             abs_name = change_extension(file_name, '')
             if abs_name not in processed_files:
-                content += NL + TAB + change_extension(file_name, '')
-                processed_files.append(abs_name)
+                names.append(abs_name)
+                processed_files.add(abs_name)
+
+    return names
+
+
+def _folder_page(title, entries):
+    return ''.join([make_title(title, 0), INDEX_HEADER] +
+                   [NL + TAB + entry for entry in entries])
+
+
+def _master_page(title, entries):
+    return ''.join([make_title(title, 0), INDEX_HEADER, NL] +
+                   [TAB + entry + NL2 for entry in entries])
+
 
-    return content
+def _index_pages(title, entries, fanout, make_page):
+    pages = []
+    for name, page_entries in _paginate(entries, fanout, INDEX_NAME):
+        if name == INDEX_NAME:
+            content = make_page(title, page_entries)
+        else:
+            number = name[len(INDEX_NAME) + 1:].replace('-', '.')
+            content = _folder_page('{} ({})'.format(title, number),
+                                   page_entries)
+        pages.append((name + RST_EXTENSION, content))
+    return pages
+
+
+def _paginate(entries, fanout, name):
+    """
+    Split ``entries`` in pages of at most ``fanout`` entries, returning the
+    name and the entries of every page, the one called ``name`` first. A page
+    with too many entries lists the names of its sub pages instead, which are
+    as few as possible, so that the pages make a balanced tree.
+    """
+    if fanout is None or len(entries) <= fanout:
+        return [(name, entries)]
+
+    size = fanout
+    while len(entries) > size * fanout:
+        size *= fanout
+
+    sub_pages = []
+    pages = [(name, sub_pages)]
+    for number, start in enumerate(range(0, len(entries), size), 1):
+        sub_page = '{}-{}'.format(name, number)
+        sub_pages.append(sub_page)
+        pages.extend(_paginate(entries[start:start + size], fanout, sub_page))
+    return pages
 
 
 def create_master_index(root_path):
@@ -81,44 +227,44 @@ def create_master_index(root_path):
     Create the main index containing inner indexes. It searches for every
     ``index.rst`` in all sub folders and add it to its toctree. The list of
     all indexes files found is written in a new
-    ``index.rst``
+    ``index.rst``. Hidden files, such as the conversion manifest, are not
+    listed.
+
+    Use ``master_index`` to create it without searching the output folder.
 
     Args:
         root_path(string): the starting path from which recursively searches
             indexes.
-    """
-    content = make_title(MASTER_INDEX_TITLE, 0)
-    content += INDEX_HEADER + NL
 
-    files = os.walk(root_path)
-
-    for input_file in files:
-        root, dirs, files = input_file
+    Returns:
+        bool: whether the master index was written, as for
+            ``write_index_file``.
+    """
+    root_files = []
+    folders = []
 
+    for root, dirs, files in os.walk(root_path):
         rel_path = os.path.relpath(root, root_path)
+        if rel_path == os.curdir:
+            root_files = files
+        elif INDEX_FILE_NAME in files:
+            folders.append(rel_path)
 
-        files.sort()
-
-        for name in files:
-            if "__pycache__" in rel_path:
-                continue
-
-            if (rel_path == ".") ^ (name == INDEX_FILE_NAME):
-                content += TAB \
-                        + os.path.join(rel_path, change_extension(name, '')) \
-                        + NL2
-
-    write_index_file(root_path, content)
+    return write_index_file(root_path, master_index(root_files, folders))
 
 
 def write_index_file(out_path, content):
     """
     Create a new file called ``INDEX_FILE_NAME`` in the given path, and writes
-    the ``content`` in it.
+    the ``content`` in it. An index already holding ``content`` is left
+    untouched.
 
     Args:
         out_path(string): the path were the index file will be created
         content(string): the file content to write down.
+
+    Returns:
+        bool: whether the index file was written.
     """
-    with open(os.path.join(out_path, INDEX_FILE_NAME), 'w') as index_page:
-        index_page.write(content)
+    return write_if_changed(os.path.join(out_path, INDEX_FILE_NAME),
+                            content.encode('utf-8'))
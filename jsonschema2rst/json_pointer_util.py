@@ -31,8 +31,14 @@ restructured-text strings.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import hashlib
+import os
+
 _REFS = ['$ref', ':ref:']
 
+# the number of hex digits of the hash in a short anchor, by default
+DEFAULT_ANCHOR_LENGTH = 8
+
 
 def get_json_pointer(node):
     """
@@ -46,15 +52,8 @@ def get_json_pointer(node):
         string: the value consists of the node's ancestors values, the
             nodes'value itself and its ID
     """
-    ancestors = node.ancestors()
-    if ancestors:
-        root = ancestors.pop(0)
-        ancestors_path = ''
-
-        if ancestors:
-            ancestors_path = '/' + '/'.join([n.id for n in ancestors])
-
-        return '{}#{}/{}'.format(root.value, ancestors_path, node.id)
+    if node.parent is not None:
+        return node.root().value + '#' + node.pointer_path()
     return '{}#/'.format(node.id)
 
 
@@ -77,13 +76,14 @@ def ref2json_pointer(value):
     Raises:
         ValueError if a node containing a non-ref value is provided.
     """
+    key, ref = split_key_val(value)
+
     # check if `$ref` or `:ref:` are in the string
-    if split_key_val(value)[0] not in _REFS:
+    if key not in _REFS:
         raise ValueError('Expected input containing a :ref: or $ref value. '
                          'Instead, got {}'.format(value))
 
-    value = split_key_val(value)[1]
-    value = value.split('/')[-1]
+    value = ref.split('/')[-1]
     return ':ref:`{}#/`'.format(value)
 
 
@@ -120,6 +120,31 @@ def resolver(node, required_item=False, key=None):
         return ':ref:`{}`'.format(search_by)
 
 
+def short_anchor(pointer, length=DEFAULT_ANCHOR_LENGTH):
+    """
+    Return a short label standing for a JSON pointer: the name of the
+    pointed schema, without extension, followed by the first ``length`` hex
+    digits of the hash of the whole pointer. It depends on the pointer alone,
+    so it is the same in every page referencing it and in every run.
+
+    Example:
+
+        record.json#/properties/titles      -->     record-8bd2ad2b
+
+    Args:
+        pointer(string): the JSON pointer, e.g. as returned by
+            ``get_json_pointer``.
+
+        length(int): the number of hex digits of the hash.
+
+    Returns:
+        string: the short anchor of ``pointer``.
+    """
+    document = pointer.split('#', 1)[0]
+    digest = hashlib.sha1(pointer.encode('utf-8')).hexdigest()
+    return '{}-{}'.format(os.path.splitext(document)[0], digest[:length])
+
+
 def split_key_val(custom_string, separator=": "):
     """
     Return a (key, value) tuple by splitting the string in the first occurrence
@@ -132,8 +157,8 @@ def split_key_val(custom_string, separator=": "):
     Returns:
         a (key, value) tuple
     """
-    key = custom_string.split(separator)[0]
     start_index = custom_string.index(separator)
+    key = custom_string[:start_index]
 
     # substring starting after ': ' (blank space included)
     val = custom_string[start_index + 2:]
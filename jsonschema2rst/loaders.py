@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+This module loads json and yaml schema files into python objects, using the
+fastest loader available for each of them.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import json
+import re
+
+import yaml
+
+from jsonschema2rst.rst_writer import JSON_EXTENSION
+
+AUTO_LOADER = 'auto'
+FULL_LOADER = 'full'
+SAFE_LOADER = 'safe'
+JSON_LOADER = 'json'
+
+LOADERS = [AUTO_LOADER, FULL_LOADER, SAFE_LOADER, JSON_LOADER]
+
+# libyaml bindings are optional in PyYAML
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# floats as resolved by the YAML 1.1 loaders, e.g. ``1e3`` is not a float
+_YAML_FLOAT = re.compile(r'''^(?:[-+]?(?:[0-9][0-9_]*)\.[0-9_]*
+                             (?:[eE][-+][0-9]+)?
+                             |\.[0-9][0-9_]*(?:[eE][-+][0-9]+)?)$''', re.X)
+
+
+def load_schema(schema_file, loader=AUTO_LOADER):
+    """
+    Load a json or yaml schema file.
+
+    All loaders give the same result for a schema: YAML anchors, keys order
+    and scalars types are the ones of ``yaml.full_load``, so that json numbers
+    which are not YAML 1.1 floats (e.g. ``1e3``) are kept as strings.
+
+    Args:
+        schema_file(file): a json or yaml schema file descriptor.
+
+        loader(string): one of ``LOADERS``:
+
+            * ``auto``: the standard ``json`` module for ``.json`` files,
+              falling back to yaml if they are not valid json or are too
+              deeply nested for it, and the libyaml based safe loader, if
+              available, for all other files.
+            * ``full``: ``yaml.full_load``, the pure python full loader.
+            * ``safe``: the libyaml based safe loader, if available, or the
+              pure python one.
+            * ``json``: the standard ``json`` module.
+
+    Returns:
+        the schema content, usually a ``dict``.
+
+    Raises:
+        ValueError: if ``loader`` is unknown, or if the ``json`` loader is
+            used on a file that is not valid json.
+    """
+    if loader == AUTO_LOADER:
+        if getattr(schema_file, 'name', '').endswith(JSON_EXTENSION):
+            content = schema_file.read()
+            try:
+                return _json_loads(content)
+            except (ValueError, RuntimeError):
+                # RuntimeError covers RecursionError, raised by the json
+                # module on deeply nested documents
+                return yaml.load(content, Loader=SafeLoader)
+        loader = SAFE_LOADER
+
+    if loader == FULL_LOADER:
+        return yaml.full_load(schema_file)
+
+    if loader == SAFE_LOADER:
+        return yaml.load(schema_file, Loader=SafeLoader)
+
+    if loader == JSON_LOADER:
+        return _json_loads(schema_file.read())
+
+    raise ValueError('Unknown loader {}. Expected one of: {}'.format(
+        loader, ', '.join(LOADERS)))
+
+
+def loads_schema(content, name='', loader=AUTO_LOADER):
+    """
+    Load a json or yaml schema from a string, as ``load_schema`` would load
+    it from a file.
+
+    Args:
+        content(string): the schema text. Bytes are decoded as UTF-8.
+
+        name(string): the schema file name, which tells json schemas apart
+            with the ``auto`` loader.
+
+        loader(string): one of ``LOADERS``.
+
+    Returns:
+        the schema content, usually a ``dict``.
+    """
+    if isinstance(content, bytes):
+        content = content.decode('utf-8')
+    schema_file = io.StringIO(content)
+    schema_file.name = name
+    return load_schema(schema_file, loader)
+
+
+def _json_loads(content):
+    return json.loads(content, parse_float=_yaml_float,
+                      parse_constant=_yaml_constant)
+
+
+def _yaml_float(value):
+    if _YAML_FLOAT.match(value):
+        return float(value.replace('_', ''))
+    return value
+
+
+def _yaml_constant(value):
+    # NaN and Infinity are plain strings in YAML
+    return value
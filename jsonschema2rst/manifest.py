@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+This module keeps track of the schemas converted in a previous run, in order
+to convert again only the ones that changed.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import hashlib
+import io
+import json
+import os
+
+MANIFEST_FILE_NAME = '.jsonschema2rst-manifest.json'
+
+_UNKNOWN_VERSION = 'unknown'
+
+
+def get_version():
+    """
+    Return the installed ``jsonschema2rst`` version, used to invalidate the
+    manifest when the tool itself changes.
+
+    Returns:
+        string: the package version, or ``'unknown'`` if the package is not
+            installed.
+    """
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:
+        import pkg_resources
+        try:
+            return pkg_resources.get_distribution('jsonschema2rst').version
+        except pkg_resources.DistributionNotFound:
+            return _UNKNOWN_VERSION
+
+    try:
+        return version('jsonschema2rst')
+    except PackageNotFoundError:
+        return _UNKNOWN_VERSION
+
+
+def file_hash(path):
+    """
+    Return the hex digest of the content of the file at ``path``.
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as content:
+        for chunk in iter(lambda: content.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def excluded_key_set(excluded_key):
+    """
+    Return the keywords of ``excluded_key``, sorted and without duplicates,
+    so that two lists of excluded keywords can be compared.
+
+    Args:
+        excluded_key(string): csv containing schema's keywords to ignore
+
+    Returns:
+        list<string>: the excluded keywords.
+    """
+    return sorted(set(key.strip() for key in excluded_key.split(',')))
+
+
+class Manifest(object):
+    """Record of the schemas converted into an output folder.
+
+    Every entry maps an input file, relative to the input folder, to the hash
+    of its content, the generated output file, relative to the output folder,
+    the hash of the output content and the schemas it references through
+    ``$ref``, which make up the dependency graph, and the extra pages of the
+    schema, if it was split. When only the referenced section labels are
+    emitted, an entry also lists the targets referenced by the schema pages
+    and the digest of the labels emitted in them, and with short anchors the
+    JSON pointers of the labels emitted. The whole manifest is
+    bound to the tool version, to the set of excluded keys and to the other
+    options changing the output: when one of them changes, none of the
+    entries is considered up to date anymore.
+
+    The manifest also lists the index pages written, relative to the output
+    folder, so that the ones not written anymore can be removed.
+    """
+
+    def __init__(self, output_path, excluded_key, version=None,
+                 input_path=None, options=None):
+        """
+        Constructor.
+
+        Create a new empty manifest for the given output folder.
+
+        Args:
+            output_path(string): the folder where restructured-text files are
+                written and where the manifest is stored.
+
+            excluded_key(string): csv containing schema's keywords to ignore
+
+            version(string): the tool version. If not provided, the installed
+                one is used.
+
+            input_path(string): the folder containing the converted schemas.
+
+            options(dict): the other options the schemas were converted
+                with, as returned by ``ConversionContext.output_options``.
+        """
+        self.output_path = output_path
+        self.excluded_key = excluded_key_set(excluded_key or '')
+        self.version = version if version is not None else get_version()
+        self.options = dict(options or {})
+        self.input_path = input_path
+        self.entries = {}
+        self.indexes = []
+        # the outputs of a loaded manifest whose entries were discarded
+        self.stale_outputs = set()
+
+    @classmethod
+    def load(cls, output_path, excluded_key, version=None, options=None):
+        """
+        Load the manifest stored in ``output_path``. If there is no manifest,
+        it can not be read, or it was written by a different tool version or
+        with different excluded keys or options, an empty manifest is
+        returned.
+
+        Args:
+            output_path(string): the folder containing the manifest.
+
+            excluded_key(string): csv containing schema's keywords to ignore.
+                If None, the manifest is loaded whatever the tool version and
+                the excluded keys it was written with.
+
+            version(string): the tool version. If not provided, the installed
+                one is used.
+
+            options(dict): the other options changing the output.
+
+        Returns:
+            ``Manifest``: the loaded manifest.
+        """
+        manifest = cls(output_path, excluded_key, version, options=options)
+
+        try:
+            with io.open(manifest.path, encoding='utf-8') as manifest_file:
+                content = json.load(manifest_file)
+        except (IOError, OSError, ValueError):
+            return manifest
+
+        manifest.input_path = content.get('input_path')
+        manifest.indexes = content.get('indexes', [])
+
+        if excluded_key is None:
+            manifest.version = content.get('version')
+            manifest.excluded_key = content.get('excluded_key')
+            manifest.options = content.get('options', {})
+            manifest.entries = content.get('files', {})
+
+        elif content.get('version') == manifest.version and \
+                content.get('excluded_key') == manifest.excluded_key and \
+                content.get('options', {}) == manifest.options:
+            manifest.entries = content.get('files', {})
+
+        else:
+            manifest.stale_outputs = _outputs(content.get('files', {}))
+
+        return manifest
+
+    @property
+    def path(self):
+        return os.path.join(self.output_path, MANIFEST_FILE_NAME)
+
+    def add(self, input_name, input_hash, output_name, output_hash,
+            refs=(), pages=(), links=None, labels=None, anchors=None):
+        """
+        Record that ``input_name`` has been converted to ``output_name``.
+
+        Args:
+            input_name(string): the input file, relative to the input folder.
+            input_hash(string): the hash of the input file content.
+            output_name(string): the output file, relative to the output
+                folder.
+            output_hash(string): the hash of the output file content.
+            refs(list<string>): the schemas referenced by ``input_name``, as
+                returned by ``dependencies.resolve_refs``.
+            pages(list<string>): the extra pages of a split schema, relative
+                to the output folder.
+            links(list<string>): the targets referenced by the pages of
+                ``input_name``, if known.
+            labels(string): the digest of the section labels emitted in the
+                pages of ``input_name``, if not all of them are.
+            anchors(list<string>): the JSON pointers of the section labels
+                emitted in the pages of ``input_name`` as short anchors, if
+                they are.
+        """
+        entry = {
+            'input_hash': input_hash,
+            'output': output_name,
+            'output_hash': output_hash,
+            'refs': list(refs),
+        }
+        if pages:
+            entry['pages'] = list(pages)
+        if links is not None:
+            entry['links'] = sorted(links)
+        if labels is not None:
+            entry['labels'] = labels
+        if anchors is not None:
+            entry['anchors'] = sorted(anchors)
+        self.entries[input_name] = entry
+
+    def copy_entry(self, other, input_name):
+        """
+        Copy the entry of ``input_name`` from the ``other`` manifest.
+        """
+        self.entries[input_name] = other.entries[input_name]
+
+    def is_up_to_date(self, input_name, input_hash, output_name):
+        """
+        Check whether ``input_name`` needs to be converted again.
+
+        Args:
+            input_name(string): the input file, relative to the input folder.
+            input_hash(string): the hash of the current input file content.
+            output_name(string): the expected output file, relative to the
+                output folder.
+
+        Returns:
+            bool: True if the input file did not change since it was converted
+                and its output file is still the one that was generated, with
+                its extra pages, else False.
+        """
+        entry = self.entries.get(input_name)
+
+        if entry is None or entry['input_hash'] != input_hash or \
+                entry['output'] != output_name:
+            return False
+
+        output = os.path.join(self.output_path, output_name)
+        if not os.path.exists(output):
+            return False
+
+        for page in entry.get('pages', ()):
+            if not os.path.exists(os.path.join(self.output_path, page)):
+                return False
+
+        return file_hash(output) == entry['output_hash']
+
+    def outputs(self):
+        """
+        Return the set of output files, relative to the output folder,
+        recorded in the manifest, extra pages included.
+        """
+        return _outputs(self.entries)
+
+    def save(self):
+        """
+        Write the manifest in its output folder.
+        """
+        content = {
+            'version': self.version,
+            'excluded_key': self.excluded_key,
+            'input_path': self.input_path,
+            'options': self.options,
+            'files': self.entries,
+            'indexes': sorted(self.indexes),
+        }
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as manifest_file:
+            manifest_file.write(
+                json.dumps(content, indent=1, sort_keys=True).encode('utf-8'))
+        replace_file(tmp_path, self.path)
+
+
+def _outputs(entries):
+    outputs = set()
+    for entry in entries.values():
+        outputs.add(entry['output'])
+        outputs.update(entry.get('pages', ()))
+    return outputs
+
+
+def replace_file(src, dst):
+    """
+    Atomically move the file ``src`` to ``dst``, overwriting it.
+    """
+    try:
+        os.replace(src, dst)
+    except AttributeError:  # Python 2
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+This module traces the memory allocated while converting a schema, in order
+to report its peak and to stop the conversion of a schema which needs more
+memory than allowed.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import OrderedDict
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+MB = 1024 * 1024
+
+
+def check_tracing_supported():
+    """
+    Raises:
+        RuntimeError: if memory tracing is not supported, i.e. on Python 2.
+    """
+    if tracemalloc is None:
+        raise RuntimeError('Memory tracing needs Python 3.4 or later')
+
+
+class MemoryBudgetExceeded(Exception):
+    """The conversion of a schema needs more memory than allowed."""
+
+    def __init__(self, stage, size, budget):
+        super(MemoryBudgetExceeded, self).__init__(
+            'memory budget exceeded while in {}: {:.1f} MB > {:.1f} MB'.format(
+                stage, size / MB, budget / MB))
+        self.stage = stage
+        self.size = size
+        self.budget = budget
+
+
+class MemoryTracer(object):
+    """Trace the memory allocated by the stages of a conversion.
+
+    The memory allocated when the tracer starts is not accounted for. On
+    Python 3.9 or later the peak of every stage is measured on its own,
+    before that it is the peak since the tracer started. Note that tracing
+    slows down allocations, and hence the conversion.
+    """
+
+    def __init__(self, budget=None):
+        """
+        Constructor.
+
+        Args:
+            budget(int): the maximum number of bytes the traced stages can
+                allocate, if any.
+
+        Raises:
+            RuntimeError: if memory tracing is not supported, i.e. on
+                Python 2.
+        """
+        check_tracing_supported()
+
+        self.budget = budget
+        self.peaks = OrderedDict()
+        self._baseline = 0
+        self._started = False
+
+    def start(self):
+        """
+        Start tracing, if not already done.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        self._reset_peak()
+
+    def stop(self):
+        """
+        Stop tracing, if it was started by this tracer.
+        """
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def _reset_peak(self):
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+    def check(self, stage):
+        """
+        Check that the memory currently allocated does not exceed the budget.
+
+        Raises:
+            MemoryBudgetExceeded: if the budget is exceeded.
+        """
+        if self.budget is None:
+            return
+        size = tracemalloc.get_traced_memory()[0] - self._baseline
+        if size > self.budget:
+            raise MemoryBudgetExceeded(stage, size, self.budget)
+
+    def end_stage(self, stage):
+        """
+        Record the peak of ``stage``, which just ended, and check it against
+        the budget.
+
+        Raises:
+            MemoryBudgetExceeded: if the budget is exceeded.
+        """
+        peak = max(tracemalloc.get_traced_memory()[1] - self._baseline, 0)
+        self.peaks[stage] = max(self.peaks.get(stage, 0), peak)
+        self._reset_peak()
+
+        if self.budget is not None and peak > self.budget:
+            raise MemoryBudgetExceeded(stage, peak, self.budget)
+
+    def peak(self):
+        """
+        Return the highest peak among the traced stages, in bytes.
+        """
+        return max(self.peaks.values()) if self.peaks else 0
+
+
+def format_peaks(peaks):
+    """
+    Return a short description of the stage ``peaks``, in MB.
+    """
+    return 'peak {:.1f} MB ({})'.format(
+        max(peaks.values()) / MB if peaks else 0.0,
+        ', '.join('{} {:.1f}'.format(stage, size / MB)
+                  for stage, size in peaks.items()))
@@ -30,27 +30,37 @@ content to document it.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import multiprocessing
 import os
+import re
+from functools import partial
+from multiprocessing.pool import ThreadPool
 
-import yaml
-
-from jsonschema2rst.rst_utils import NL, RST_DIRECTIVES
+from jsonschema2rst.context import SORTING_ORDER, ConversionContext
+from jsonschema2rst.indexer import INDEX_HEADER
+from jsonschema2rst.json_pointer_util import short_anchor
+from jsonschema2rst.loaders import AUTO_LOADER, load_schema, loads_schema
+from jsonschema2rst.rst_utils import NL, RST_DIRECTIVES, TAB
 from jsonschema2rst.rst_writer import JSON_EXTENSION, change_extension, restify
 from jsonschema2rst.tree_node import TreeNode
 
-SORTING_ORDER = [
-    "title",
-    "description",
-    "type",
-    "format",
-    "minimum",
-    "maximum",
-    "pattern",
-    "required"
-]
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+# characters not allowed in the names of the pages of split properties
+_PAGE_NAME_UNSAFE = re.compile(r'[^\w-]+', re.UNICODE)
+
+# the target of a reference, either :ref:`target` or :ref:`text <target>`
+_REF_TARGET = re.compile(r':ref:`(?:[^`<]*<)?([^`<>]+)>?`')
 
+# section labels and reference targets which are JSON pointers
+_POINTER_LABEL = re.compile(r'^\.\. _([^\n]*#[^\n]*):$', re.MULTILINE)
+_POINTER_REF = re.compile(r'(:ref:`(?:[^`<]*<)?)([^`<>]*#[^`<>]*)(>?`)')
 
-def schema2rst(schema_file, excluded_key):
+
+def schema2rst(schema_file, excluded_key, loader=AUTO_LOADER, context=None):
     """
     Parse a json/yaml schema file into RST text.
 
@@ -63,23 +73,416 @@ def schema2rst(schema_file, excluded_key):
 
         excluded_key(string): csv containing schema's keywords to ignore
 
+        loader(string): the loader used to read ``schema_file``, one of
+            ``loaders.LOADERS``.
+
+        context(``ConversionContext``): the conversion context. If given,
+            its excluded keys and loader are used instead of
+            ``excluded_key`` and ``loader``.
+
     Returns:
         string: a restructured-text string representing ``schema_file``
     """
-    tree = TreeNode(os.path.basename(
-        change_extension(schema_file.name, JSON_EXTENSION)))
+    context = _get_context(excluded_key, loader, context)
+    return tree2rst(schema2tree(schema_file, excluded_key, context=context),
+                    context)
+
+
+def schema2rst_to(stream, schema_file, excluded_key, loader=AUTO_LOADER,
+                  context=None):
+    """
+    Parse a json/yaml schema file into RST text, writing it to ``stream``
+    piece by piece while the schema is traversed, instead of building the
+    whole document in memory.
+
+    Example:
+        with open("schema.json") as schema, open("schema.rst", "w") as rst:
+            schema2rst_to(rst, schema, "$schema")
+
+    Args:
+        stream(file): a text file object where RST text is written.
+
+        schema_file(file): a json or yaml schema file descriptor.
+
+        excluded_key(string): csv containing schema's keywords to ignore
+
+        loader(string): the loader used to read ``schema_file``, one of
+            ``loaders.LOADERS``.
+
+        context(``ConversionContext``): the conversion context. If given,
+            its excluded keys and loader are used instead of
+            ``excluded_key`` and ``loader``.
+    """
+    context = _get_context(excluded_key, loader, context)
+    tree = schema2tree(schema_file, excluded_key, context=context)
+    for chunk in tree2rst_chunks(tree, context):
+        stream.write(chunk)
+
+
+def schema2tree(schema_file, excluded_key, loader=AUTO_LOADER, context=None):
+    """
+    Parse a json/yaml schema file into a ``TreeNode``, whose root is named
+    after the schema file.
+
+    Args:
+        schema_file(file): a json or yaml schema file descriptor.
+
+        excluded_key(string): csv containing schema's keywords to ignore
+
+        loader(string): the loader used to read ``schema_file``, one of
+            ``loaders.LOADERS``.
+
+        context(``ConversionContext``): the conversion context. If given,
+            its excluded keys and loader are used instead of
+            ``excluded_key`` and ``loader``.
+
+    Returns:
+        ``TreeNode``: the tree representing ``schema_file``
+    """
+    context = _get_context(excluded_key, loader, context)
+    return content2tree(load_schema(schema_file, context.loader),
+                        schema_file.name, excluded_key, context)
+
+
+def content2tree(content, name, excluded_key, context=None):
+    """
+    Build the ``TreeNode`` of an already loaded schema, whose root is named
+    after the schema file.
+
+    Args:
+        content(dict): the schema content.
+
+        name(string): the schema file name.
+
+        excluded_key(string): csv containing schema's keywords to ignore
+
+        context(``ConversionContext``): the conversion context. If given,
+            its excluded keys are used instead of ``excluded_key``.
+
+    Returns:
+        ``TreeNode``: the tree representing ``content``
+    """
+    tree = TreeNode(os.path.basename(change_extension(name, JSON_EXTENSION)))
+
+    TreeNode.dict2tree(content, tree, excluded_key, context)
+    return tree
+
+
+def _get_context(excluded_key, loader, context):
+    if context is None:
+        context = ConversionContext(excluded_key or '', loader=loader)
+    return context
+
+
+def schemas2rst(schemas, excluded_key, loader=AUTO_LOADER, jobs=1,
+                chunksize=1, threads=False, context=None):
+    """
+    Convert schemas held in memory, without reading or writing any file.
+
+    Results are yielded lazily, in the order of ``schemas``: each schema is
+    converted only when its result, or one of the following ones, is
+    requested.
+
+    Args:
+        schemas(iterable): ``(name, schema)`` pairs, where ``name`` is the
+            schema file name, e.g. ``hep.yml``, and ``schema`` is either the
+            schema content as a mapping, or its json or yaml text.
+
+        excluded_key(string): csv containing schema's keywords to ignore
 
-    rst = RST_DIRECTIVES
-    TreeNode.dict2tree(yaml.full_load(schema_file), tree, excluded_key)
-    rst += _traverse_bfs(tree, _node2rst)
-    return rst
+        loader(string): the loader used to read the schema texts, one of
+            ``loaders.LOADERS``.
 
+        jobs(int): number of workers converting the schemas. With ``1``
+            (default) schemas are converted in the current thread, with
+            ``0`` or less one worker per CPU is used. Note that a pool
+            reads ``schemas`` ahead of the results.
 
-def _node2rst(node):
-    return NL + restify(node) + NL
+        chunksize(int): number of schemas handed at once to a worker.
+
+        threads(bool): use a pool of threads, instead of processes. The
+            schemas are then neither pickled nor copied, but, unless Python
+            is a free-threaded build, the conversions do not run in
+            parallel.
+
+        context(``ConversionContext``): the conversion context. If given,
+            its excluded keys and loader are used instead of
+            ``excluded_key`` and ``loader``.
+
+    Yields:
+        tuple: the ``(name, rst)`` pair of every schema, where ``rst`` is its
+            restructured-text string.
+    """
+    context = _get_context(excluded_key, loader, context)
+    tasks = ((name, schema, context) for name, schema in schemas)
+
+    if jobs is not None and jobs <= 0:
+        jobs = multiprocessing.cpu_count()
+
+    if jobs is None or jobs == 1:
+        for task in tasks:
+            yield _convert_schema(task)
+        return
+
+    pool = ThreadPool(jobs) if threads else multiprocessing.Pool(jobs)
+    try:
+        for result in pool.imap(_convert_schema, tasks, chunksize):
+            yield result
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def _convert_schema(task):
+    name, schema, context = task
+    if not isinstance(schema, Mapping):
+        schema = loads_schema(schema, name, context.loader)
+    return name, tree2rst(content2tree(schema, name, None, context), context)
+
+
+def tree2rst(tree, context=None):
+    """
+    Render a tree built by ``schema2tree`` into RST text. Note that the tree
+    is modified while it is rendered, so it can be rendered only once.
+
+    Args:
+        tree(``TreeNode``): the tree representing a schema.
+
+        context(``ConversionContext``): the conversion context, whose
+            sorting order is used, if given.
+
+    Returns:
+        string: a restructured-text string representing ``tree``
+    """
+    return ''.join(tree2rst_chunks(tree, context))
 
 
-def _traverse_bfs(node, traverse_func):
+def tree2rst_chunks(tree, context=None, labels=None, anchors=None):
+    """
+    Render a tree built by ``schema2tree`` into RST text, lazily yielding the
+    RST fragment of every node as soon as it is visited.
+
+    Args:
+        tree(``TreeNode``): the tree representing a schema.
+
+        context(``ConversionContext``): the conversion context, whose
+            sorting order and anchor length are used, if given.
+
+        labels(set<string>): the JSON pointers of the sections whose label
+            is emitted. If None (default), the label of every section is.
+
+        anchors(dict): when the context has an ``anchor_length``, it is
+            filled with the JSON pointer of every label emitted, by short
+            anchor.
+
+    Returns:
+        generator<string>: the fragments of the restructured-text string
+            representing ``tree``
+
+    Raises:
+        ValueError: if two labels of ``tree`` have the same short anchor.
+    """
+    return _anchored(_tree_chunks(tree, context, labels), context, anchors)
+
+
+def _tree_chunks(tree, context, labels):
+    sorting_order = SORTING_ORDER
+    if context is not None:
+        sorting_order = context.sorting_order
+
+    yield RST_DIRECTIVES
+    for chunk in _iter_bfs(tree, _get_node2rst(labels), sorting_order):
+        yield chunk
+
+
+def tree2rst_pages(tree, context=None, labels=None, anchors=None):
+    """
+    Render a tree built by ``schema2tree`` into one or more RST pages. When
+    the ``split_threshold`` of ``context`` is set, every top-level property
+    whose sub-tree has more nodes than it is rendered in its own page, and
+    the main page ends with a toctree listing those pages. Section labels
+    are the same as in a single page, so references keep resolving across
+    the pages.
+
+    Args:
+        tree(``TreeNode``): the tree representing a schema.
+
+        context(``ConversionContext``): the conversion context.
+
+        labels(set<string>): the JSON pointers of the sections whose label
+            is emitted. If None (default), the label of every section is.
+
+        anchors(dict): when the context has an ``anchor_length``, it is
+            filled with the JSON pointer of every label emitted, by short
+            anchor.
+
+    Returns:
+        list<(string, generator<string>)>: the name of every page, without
+            extension and relative to the folder of the main page, with the
+            lazily rendered fragments of its content. The main page, named
+            after the schema, comes first, and the pages must be rendered in
+            this order.
+
+    Raises:
+        ValueError: while rendering, if two labels of ``tree`` have the same
+            short anchor.
+    """
+    if anchors is None:
+        anchors = {}
+    return [(name, _anchored(chunks, context, anchors))
+            for name, chunks in _tree_pages(tree, context, labels)]
+
+
+def _tree_pages(tree, context, labels):
+    main_name = change_extension(tree.value, '')
+    split = []
+    if context is not None and context.split_threshold is not None:
+        split = split_properties(tree, context.split_threshold)
+
+    if not split:
+        return [(main_name, _tree_chunks(tree, context, labels))]
+
+    sorting_order = context.sorting_order
+    node2rst = _get_node2rst(labels)
+    names = _split_page_names(main_name, split)
+    skipped = set(id(node) for node in split)
+
+    def main_page():
+        yield RST_DIRECTIVES
+        for chunk in _iter_bfs(tree, node2rst, sorting_order, skipped):
+            yield chunk
+        yield INDEX_HEADER + NL + ''.join(TAB + name + NL for name in names)
+
+    def property_page(node):
+        yield RST_DIRECTIVES
+        for chunk in _iter_bfs(node, node2rst, sorting_order):
+            yield chunk
+
+    return [(main_name, main_page())] + \
+        [(name, property_page(node)) for name, node in zip(names, split)]
+
+
+def referenced_pointers(tree, context=None):
+    """
+    Return the targets of all the references in the pages of ``tree``: the
+    JSON pointers of the properties lists, ``$ref`` values and ``required``
+    items, and the references in the descriptions, as rewritten when
+    rendering. The tree is rendered to find them, hence it can not be
+    rendered again.
+
+    Args:
+        tree(``TreeNode``): the tree representing a schema.
+
+        context(``ConversionContext``): the conversion context.
+
+    Returns:
+        set<string>: the referenced targets.
+    """
+    targets = set()
+    for _, chunks in _tree_pages(tree, context, None):
+        for chunk in chunks:
+            if ':ref:' in chunk:
+                targets.update(_REF_TARGET.findall(chunk))
+    return targets
+
+
+def split_properties(tree, threshold):
+    """
+    Return the top-level properties of ``tree`` whose sub-tree has more than
+    ``threshold`` nodes, in the order they are rendered. Note that rendering
+    modifies the tree, so the sizes are only meaningful before it.
+
+    Args:
+        tree(``TreeNode``): the tree representing a schema.
+        threshold(int): the maximum number of nodes of a property rendered
+            in the main page.
+
+    Returns:
+        list<``TreeNode``>: the nodes of the properties to split.
+    """
+    split = []
+    for child in tree.children:
+        if child.value == 'properties':
+            split.extend(node for node in _sort_nodes(list(child.children),
+                                                      child.value)
+                         if _count_nodes(node) > threshold)
+    return split
+
+
+def _count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def _split_page_names(main_name, nodes):
+    names = []
+    used = set()
+    for node in nodes:
+        name = '{}.{}'.format(main_name,
+                              _PAGE_NAME_UNSAFE.sub('_', node.value))
+        unique_name = name
+        suffix = 1
+        while unique_name in used:
+            suffix += 1
+            unique_name = '{}_{}'.format(name, suffix)
+        used.add(unique_name)
+        names.append(unique_name)
+    return names
+
+
+def _anchored(chunks, context, anchors):
+    if context is None or context.anchor_length is None:
+        return chunks
+    if anchors is None:
+        anchors = {}
+    return _shorten_anchors(chunks, context.anchor_length, anchors)
+
+
+def _shorten_anchors(chunks, length, anchors):
+    """
+    Replace the JSON pointers of the labels and references in ``chunks``
+    with their short anchors, recording in ``anchors`` the pointer of every
+    label, by anchor, to check that no two labels get the same one.
+    """
+    def label(match):
+        pointer = match.group(1)
+        anchor = short_anchor(pointer, length)
+        if anchors.setdefault(anchor, pointer) != pointer:
+            raise ValueError(
+                'The labels {} and {} have the same short anchor {}, use '
+                'longer anchors.'.format(anchors[anchor], pointer, anchor))
+        return '.. _{}:'.format(anchor)
+
+    def reference(match):
+        return match.group(1) + short_anchor(match.group(2), length) + \
+            match.group(3)
+
+    for chunk in chunks:
+        if '#' in chunk:
+            chunk = _POINTER_REF.sub(reference,
+                                     _POINTER_LABEL.sub(label, chunk))
+        yield chunk
+
+
+def _node2rst(node, labels=None):
+    return NL + restify(node, labels) + NL
+
+
+def _get_node2rst(labels):
+    if labels is None:
+        return _node2rst
+    return partial(_node2rst, labels=labels)
+
+
+def _traverse_bfs(node, traverse_func, sorting_order=SORTING_ORDER):
     """
     Traverse the tree rooted in ``node`` using the Breadth-first search (BFS)
     approach, applying to each node the ``traverse_func``  function.
@@ -89,30 +492,57 @@ def _traverse_bfs(node, traverse_func):
 
         traverse_func(function): the function to apply to each node in the tree
 
+        sorting_order(list<string>): the order of the nodes, as for
+            ``_sort_nodes``.
+
     Returns:
-        The addition/concatenation of ``traverse_func`` results.
+        The concatenation of ``traverse_func`` results.
+    """
+    return ''.join(_iter_bfs(node, traverse_func, sorting_order))
+
+
+def _iter_bfs(node, traverse_func, sorting_order=SORTING_ORDER, skipped=()):
+    """
+    Lazily yield ``traverse_func`` results for every node in the tree rooted
+    in ``node``, in the same order as ``_traverse_bfs``: every node is
+    followed by the sub-trees of its leaf children and then by the ones of
+    its inner children, each group sorted by ``_sort_nodes``.
+
+    The tree is walked with an explicit stack, so its depth is not bound by
+    the interpreter recursion limit. Note that ``traverse_func`` is applied
+    to a node before its children are looked at, since it may change them.
+    The sub-trees of the nodes whose ``id`` is in ``skipped`` are left out.
     """
-    result = traverse_func(node)
-    leaves = [child for child in node.children if child.is_leaf()]
-    inners = [child for child in node.children if not child.is_leaf()]
+    stack = [node]
 
-    leaves = _sort_nodes(leaves, node.value)
-    inners = _sort_nodes(inners, node.value)
+    while stack:
+        node = stack.pop()
+        if skipped and id(node) in skipped:
+            continue
+        yield traverse_func(node)
 
-    for leaf in leaves:
-        result += _traverse_bfs(leaf, traverse_func)
+        if not node.children:
+            continue
 
-    for inner in inners:
-        result += _traverse_bfs(inner, traverse_func)
+        leaves = []
+        inners = []
+        for child in node.children:
+            if child.children:
+                inners.append(child)
+            else:
+                leaves.append(child)
 
-    return result
+        children = _sort_nodes(leaves, node.value, sorting_order) + \
+            _sort_nodes(inners, node.value, sorting_order)
+        children.reverse()
+        stack.extend(children)
 
 
-def _sort_nodes(leaves, parent_val=''):
+def _sort_nodes(leaves, parent_val='', sorting_order=SORTING_ORDER):
     """
-    Return a list of nodes ordered in according to the ``SORTING_ORDER``
+    Return a list of nodes ordered in according to the ``sorting_order``
     elements' index, if ``parent_val`` is not `properties`. Elements with a
-    value not listed in ``SORTING_ORDER`` are appendend in a lexicographic
+    value not listed in ``sorting_order`` are appendend in a lexicographic
     order to the list.
 
     Example:
@@ -127,13 +557,15 @@ def _sort_nodes(leaves, parent_val=''):
     Args:
         leaves(list<``TreeNode``>): the list of nodes to sort
         parent_val(string): the parent node's value
+        sorting_order(list<string>): the keywords coming first, by default
+            ``SORTING_ORDER``.
 
     Returns:
-        the given list sorted in according to ``SORTING_ORDER``
+        the given list sorted in according to ``sorting_order``
     """
     priority = []
     if parent_val != 'properties':
-        for key in SORTING_ORDER:
+        for key in sorting_order:
             for leaf in leaves:
                 if key in leaf.value:
                     priority.append(leaf)
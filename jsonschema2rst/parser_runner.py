@@ -34,10 +34,17 @@ import argparse
 import os
 import sys
 
-from jsonschema2rst.indexer import create_master_index, index, write_index_file
-from jsonschema2rst.parser import schema2rst
-from jsonschema2rst.rst_writer import (JSON_EXTENSION, RST_EXTENSION,
-                                       YML_EXTENSION, change_extension)
+from jsonschema2rst.context import ALL_LABELS, LABELS
+from jsonschema2rst.conversion_run import (ANCHORS_FILE_NAME,
+                                           check_run_options, convert_files,
+                                           finish_run, plan_run)
+from jsonschema2rst.dependencies import dependents
+from jsonschema2rst.json_pointer_util import DEFAULT_ANCHOR_LENGTH
+from jsonschema2rst.loaders import AUTO_LOADER, LOADERS
+from jsonschema2rst.manifest import Manifest
+from jsonschema2rst.memory import MB, check_tracing_supported
+from jsonschema2rst.rst_writer import change_extension
+from jsonschema2rst.tree_cache import DEFAULT_CACHE_SIZE
 
 
 def run_parser(
@@ -45,6 +52,21 @@ def run_parser(
     output_path,
     excluded_key="uniqueItems,additionalProperties,$schema",
     yaml_only=False,
+    jobs=1,
+    force=False,
+    loader=AUTO_LOADER,
+    cache_path=None,
+    cache_size=DEFAULT_CACHE_SIZE,
+    profile=None,
+    profile_slowest=0,
+    trace_memory=False,
+    memory_budget=None,
+    threads=False,
+    hierarchical_index=False,
+    index_fanout=None,
+    split_threshold=None,
+    labels=ALL_LABELS,
+    anchor_length=None,
 ):
     """
     This function copies the needed resources into the ``output_path``,
@@ -55,72 +77,179 @@ def run_parser(
         input_path(string): the folder where yaml schemas are located.
 
         output_path(string): the folder where all resources and
-            restructured-text generated files will be placed. Note that,
-            if the folder already exists, it is deleted, otherwise a new one
-            is created.
+            restructured-text generated files will be placed. It is created
+            if it does not exist. Otherwise only the outputs of the changed
+            schemas are written again, and the outputs of the deleted schemas
+            are removed, according to the manifest of the previous run.
 
         excluded_key(string): csv containing schema's keywords to ignore
 
+        jobs(int): number of worker processes used to convert the schemas.
+            With ``1`` (default) files are converted in the current process,
+            with ``0`` or less one worker per CPU is used.
+
+        force(bool): convert every schema, even if the manifest stored in
+            ``output_path`` reports that its output is up to date.
+
+        loader(string): the loader used to read the schemas, one of
+            ``loaders.LOADERS``. By default JSON files are read with the
+            ``json`` module and YAML files with the fastest safe YAML loader
+            available.
+
+        cache_path(string): the folder where the trees built from the
+            schemas are cached, so that the schemas which did not change are
+            not parsed again. If None (default), no cache is used.
+
+        cache_size(int): the maximum size of the cache, in bytes. The least
+            recently used trees are removed when it grows larger.
+
+        profile(string): if given, time every stage of the run and of the
+            conversion of every schema, and write a JSON report in this file.
+
+        profile_slowest(int): the number of slowest schemas converted again
+            under ``cProfile`` when profiling. Their statistics are saved in
+            ``pstats`` files next to the report.
+
+        trace_memory(bool): trace the memory allocated while loading,
+            building and rendering every schema, and print its peaks. Note
+            that tracing slows down the conversion.
+
+        memory_budget(int): the maximum number of bytes the conversion of a
+            schema can allocate. The conversion of a schema exceeding it is
+            stopped, its output removed and the schema reported as skipped.
+            It implies tracing the memory, which needs Python 3.
+
+        threads(bool): convert the schemas with a pool of ``jobs`` threads
+            sharing the same conversion context, instead of processes. The
+            conversions run in parallel only on free-threaded Python builds.
+
+        hierarchical_index(bool): let the index of every folder list its
+            schemas and the index of its direct sub folders only, instead of
+            listing the index of every folder in the master index.
+
+        index_fanout(int): the maximum number of entries of an index page.
+            Larger indexes are split into numbered sub-indexes, e.g.
+            ``index-1.rst``. If None (default), indexes are not split.
+
+        split_threshold(int): the number of nodes above which a top-level
+            property of a schema is documented in its own page, listed by
+            the schema page. If None (default), schemas are not split.
+
+        labels(string): the section labels emitted, one of
+            ``context.LABELS``: ``'all'`` (default), or ``'referenced'`` to
+            emit only the labels referenced by some page of the converted
+            schemas. The references are collected rendering every changed
+            schema once more before converting it, use a cache to avoid
+            parsing it twice.
+
+        anchor_length(int): if given, labels and references use short
+            anchors, made of the schema name and of this number of hex
+            digits of the hash of the JSON pointers, instead of the pointers
+            themselves. The map from the pointers to their anchors is
+            written in ``ANCHORS_FILE_NAME``, in ``output_path``.
+
     Raises:
         OSError: if ``output_path``is not accessible (Permission denied)
+
+        RuntimeError: if memory tracing is requested on Python 2.
+
+        ValueError: if memory tracing is requested together with threads,
+            as the traced memory is shared by all the threads, if
+            ``index_fanout`` is lower than 2, if ``labels`` is unknown, if
+            ``anchor_length`` is not between 4 and 40, or if two labels of
+            a schema have the same short anchor.
     """
 
     if not os.path.exists(input_path):
         raise IOError('Wrong path: {}. Program will exit'.format(input_path))
 
-    output_path = os.path.abspath(output_path)
-    input_files = os.walk(input_path)
+    check_run_options(index_fanout, labels, anchor_length)
+
+    if trace_memory or memory_budget is not None:
+        if threads:
+            raise ValueError('Memory can not be traced with threads.')
+        check_tracing_supported()
 
-    processed_files = []
+    plan = plan_run(input_path, output_path, excluded_key=excluded_key,
+                    yaml_only=yaml_only, jobs=jobs, force=force,
+                    loader=loader, cache_path=cache_path,
+                    cache_size=cache_size, profile=profile,
+                    trace_memory=trace_memory, memory_budget=memory_budget,
+                    threads=threads, hierarchical_index=hierarchical_index,
+                    index_fanout=index_fanout,
+                    split_threshold=split_threshold, labels=labels,
+                    anchor_length=anchor_length)
+    finish_run(plan, convert_files(plan.tasks, jobs, threads),
+               trace_memory=trace_memory, profile=profile,
+               profile_slowest=profile_slowest)
 
-    for input_file in input_files:
-        root, dirs, files = input_file
 
-        # create, if not exists, the sub folder where rst file will be written
-        output_folder = _get_output_folder(output_path, input_path, root)
-        if not os.path.exists(output_folder):
-            os.makedirs(output_folder)
+def impact(output_path, changed_paths):
+    """
+    Return the schemas whose documentation is affected by a change in
+    ``changed_paths``: the changed schemas themselves and the ones directly
+    referencing them through ``$ref``, according to the dependency graph
+    stored in the manifest of ``output_path`` by the last ``run_parser``.
+
+    Args:
+        output_path(string): the folder where restructured-text files have
+            been written.
 
-        # write it on the FS this sub-folder content's index
-        index_content = index(root)
-        write_index_file(output_folder, index_content)
+        changed_paths(list<string>): the changed schemas. They can be given
+            relative to the current folder or to the schemas folder.
 
-        for name in files:
+    Returns:
+        list<string>: the sorted impacted schemas, relative to the schemas
+            folder.
+    """
+    manifest = Manifest.load(os.path.abspath(output_path), None)
+    changed = set(_get_input_name(manifest.input_path, path)
+                  for path in changed_paths)
+    return sorted(changed | dependents(manifest.entries, changed))
 
-            if (
-                name.endswith(YML_EXTENSION) or
-                (not yaml_only and name.endswith(JSON_EXTENSION))
-            ):
 
-                # check if a file with same name has been already parsed
-                abs_name = change_extension(name, '')
-                if abs_name in processed_files:
-                    continue
+def _get_input_name(input_root, path):
+    abs_path = os.path.abspath(path)
+    if input_root and abs_path.startswith(os.path.join(input_root, '')):
+        return os.path.relpath(abs_path, input_root)
+    return os.path.normpath(path)
 
-                file_name = os.path.join(root, name)
 
-                with open(file_name) as schema:
-                    rst_content = schema2rst(schema, excluded_key)
+def impact_cli(arguments=None):
 
-                    output = os.path.join(output_folder, _get_rst_name(name))
+    cli_parser = argparse.ArgumentParser(
+        prog='jsonschema2rst-impact',
+        description=impact.__doc__,
+    )
 
-                    with open(output, 'wb') as rst_out:
-                        rst_out.write(rst_content.encode('utf-8'))
+    cli_parser.add_argument('rst_output_folder',
+                            help='The folder where RST files have been '
+                                 'written.')
 
-                processed_files.append(abs_name)
-                print(abs_name.ljust(40) + 'OK')
+    cli_parser.add_argument('changed',
+                            nargs='+',
+                            help='The changed schemas.')
 
-    create_master_index(output_path)
-    print('Index created.\n')
+    cli_parser.add_argument('--pages',
+                            action='store_true',
+                            help='Print the impacted RST pages instead of the '
+                                 'impacted schemas.')
 
+    args = cli_parser.parse_args(arguments)
 
-def _get_rst_name(name):
-    return change_extension(name, RST_EXTENSION)
+    impacted = impact(args.rst_output_folder, args.changed)
 
+    if args.pages:
+        entries = Manifest.load(
+            os.path.abspath(args.rst_output_folder), None).entries
+        outputs = dict((change_extension(name, ''), entry['output'])
+                       for name, entry in entries.items())
+        impacted = sorted(set(outputs[change_extension(name, '')]
+                              for name in impacted
+                              if change_extension(name, '') in outputs))
 
-def _get_output_folder(out_dir, input_root, current_path):
-    path_diff = os.path.relpath(current_path, input_root)
-    return os.path.join(out_dir, path_diff)
+    for name in impacted:
+        print(name)
 
 
 def cli(arguments=None):
@@ -143,13 +272,239 @@ def cli(arguments=None):
                                     '$schema'
                             )
 
+    cli_parser.add_argument('--jobs', '-j',
+                            type=int,
+                            help='Number of processes used to convert the '
+                                 'schemas. Use 0 to run one process per CPU. '
+                                 'By default, its value is 1.',
+                            default=1
+                            )
+
+    cli_parser.add_argument('--threads',
+                            action='store_true',
+                            help='Convert the schemas with --jobs threads '
+                                 'instead of processes. They run in parallel '
+                                 'only on free-threaded Python builds.'
+                            )
+
+    cli_parser.add_argument('--async',
+                            dest='asynchronous',
+                            action='store_true',
+                            help='Read and write the files on an asyncio '
+                                 'event loop, overlapping them with the '
+                                 'conversion. Useful on network file '
+                                 'systems. It needs Python 3.5 or later.'
+                            )
+
+    cli_parser.add_argument('--max-io',
+                            type=int,
+                            metavar='N',
+                            help='With --async, the maximum number of file '
+                                 'reads and writes in flight. By default, '
+                                 'its value is 16.',
+                            default=16
+                            )
+
+    cli_parser.add_argument('--hierarchical-index',
+                            action='store_true',
+                            help='Let the index of every folder list its '
+                                 'schemas and the index of its direct sub '
+                                 'folders, instead of listing every folder '
+                                 'in the master index.'
+                            )
+
+    cli_parser.add_argument('--index-fanout',
+                            type=int,
+                            metavar='N',
+                            help='Split the indexes listing more than N '
+                                 'entries into numbered sub-indexes. By '
+                                 'default, indexes are not split.',
+                            default=None
+                            )
+
+    cli_parser.add_argument('--split-threshold',
+                            type=int,
+                            metavar='NODES',
+                            help='Document in its own page every top-level '
+                                 'property of a schema having more than '
+                                 'NODES nodes. By default, schemas are not '
+                                 'split.',
+                            default=None
+                            )
+
+    cli_parser.add_argument('--labels',
+                            choices=LABELS,
+                            help='The section labels to emit: "all" of them, '
+                                 'or only the ones "referenced" by some page '
+                                 'of the converted schemas. By default, its '
+                                 'value is all.',
+                            default=ALL_LABELS
+                            )
+
+    cli_parser.add_argument('--short-anchors',
+                            nargs='?',
+                            type=int,
+                            const=DEFAULT_ANCHOR_LENGTH,
+                            dest='anchor_length',
+                            metavar='DIGITS',
+                            help='Use short labels, made of the schema name '
+                                 'and of DIGITS hex digits of the hash of '
+                                 'the JSON pointer, instead of the pointer '
+                                 'itself, and write the map from the '
+                                 'pointers to the labels in {}. By default, '
+                                 'DIGITS is {}.'.format(
+                                     ANCHORS_FILE_NAME,
+                                     DEFAULT_ANCHOR_LENGTH),
+                            default=None
+                            )
+
+    cli_parser.add_argument('--force',
+                            action='store_true',
+                            help='Convert every schema, even the ones that '
+                                 'did not change since the previous run.'
+                            )
+
+    cli_parser.add_argument('--loader',
+                            choices=LOADERS,
+                            help='The loader used to read the schemas: '
+                                 '"auto" reads JSON files with the json '
+                                 'module and YAML files with the fastest '
+                                 'safe YAML loader available, "full" forces '
+                                 'the pure YAML full loader, "safe" the '
+                                 'safe YAML loader and "json" the json '
+                                 'module. By default, its value is auto.',
+                            default=AUTO_LOADER
+                            )
+
+    cli_parser.add_argument('--cache-dir',
+                            help='The folder where the trees built from the '
+                                 'schemas are cached between runs. By '
+                                 'default, no cache is used.',
+                            default=None
+                            )
+
+    cli_parser.add_argument('--cache-size',
+                            type=int,
+                            help='The maximum size of the cache, in MB. By '
+                                 'default, its value is {}.'.format(
+                                     DEFAULT_CACHE_SIZE // (1024 * 1024)),
+                            default=DEFAULT_CACHE_SIZE // (1024 * 1024)
+                            )
+
+    cli_parser.add_argument('--profile',
+                            nargs='?',
+                            const='jsonschema2rst-profile.json',
+                            metavar='REPORT',
+                            help='Time every stage of the conversion of every '
+                                 'schema, print the slowest ones and write a '
+                                 'JSON report in REPORT. By default, REPORT '
+                                 'is jsonschema2rst-profile.json.',
+                            default=None
+                            )
+
+    cli_parser.add_argument('--profile-slowest',
+                            type=int,
+                            metavar='N',
+                            help='With --profile, convert again the N '
+                                 'slowest schemas under cProfile and save '
+                                 'their pstats files next to the report.',
+                            default=0
+                            )
+
+    cli_parser.add_argument('--trace-memory',
+                            action='store_true',
+                            help='Trace the memory allocated while loading, '
+                                 'building and rendering every schema, and '
+                                 'print its peaks. It slows down the '
+                                 'conversion.'
+                            )
+
+    cli_parser.add_argument('--memory-budget',
+                            type=float,
+                            metavar='MB',
+                            help='Skip the schemas whose conversion allocates '
+                                 'more than this number of MB, instead of '
+                                 'running out of memory.',
+                            default=None
+                            )
+
+    cli_parser.add_argument('--watch',
+                            action='store_true',
+                            help='Keep running, converting again the schemas '
+                                 'as soon as they change.'
+                            )
+
+    cli_parser.add_argument('--watch-interval',
+                            type=float,
+                            metavar='SECONDS',
+                            help='The seconds between two checks for changes '
+                                 'with --watch. By default, its value is '
+                                 '0.5.',
+                            default=0.5
+                            )
+
     args = cli_parser.parse_args(arguments)
 
     src = args.schemas_folder
     out = args.rst_output_folder
     excluded_key = args.excluded_key
 
-    run_parser(src, out, excluded_key)
+    memory_budget = None
+    if args.memory_budget is not None:
+        memory_budget = int(args.memory_budget * MB)
+
+    if args.watch:
+        ignored = [option for option, value in [
+            ('--threads', args.threads), ('--async', args.asynchronous),
+            ('--force', args.force), ('--profile', args.profile),
+            ('--profile-slowest', args.profile_slowest),
+            ('--trace-memory', args.trace_memory),
+            ('--memory-budget', memory_budget is not None)] if value]
+        if ignored:
+            cli_parser.error('--watch can not be used with {}'.format(
+                ', '.join(ignored)))
+        # imported here, as the watcher runs ``run_parser`` itself
+        from jsonschema2rst.watcher import Watcher
+        Watcher(src, out, excluded_key, interval=args.watch_interval,
+                jobs=args.jobs, loader=args.loader, cache_path=args.cache_dir,
+                cache_size=args.cache_size * 1024 * 1024,
+                hierarchical_index=args.hierarchical_index,
+                index_fanout=args.index_fanout,
+                split_threshold=args.split_threshold,
+                labels=args.labels, anchor_length=args.anchor_length).run()
+        return
+
+    if args.asynchronous:
+        if sys.version_info < (3, 5):
+            cli_parser.error('--async needs Python 3.5 or later')
+        if args.trace_memory or memory_budget is not None:
+            cli_parser.error('--async can not trace the memory')
+        if args.max_io < 1:
+            cli_parser.error('--max-io must be at least 1')
+        # imported here, as it needs Python 3.5
+        from jsonschema2rst.async_runner import run_async
+        run_async(src, out, excluded_key=excluded_key, jobs=args.jobs,
+                  force=args.force, loader=args.loader,
+                  cache_path=args.cache_dir,
+                  cache_size=args.cache_size * 1024 * 1024,
+                  profile=args.profile, profile_slowest=args.profile_slowest,
+                  threads=args.threads,
+                  hierarchical_index=args.hierarchical_index,
+                  index_fanout=args.index_fanout,
+                  split_threshold=args.split_threshold, labels=args.labels,
+                  anchor_length=args.anchor_length, max_io=args.max_io)
+        return
+
+    run_parser(src, out, excluded_key, jobs=args.jobs, force=args.force,
+               loader=args.loader, cache_path=args.cache_dir,
+               cache_size=args.cache_size * 1024 * 1024,
+               profile=args.profile, profile_slowest=args.profile_slowest,
+               trace_memory=args.trace_memory,
+               memory_budget=memory_budget, threads=args.threads,
+               hierarchical_index=args.hierarchical_index,
+               index_fanout=args.index_fanout,
+               split_threshold=args.split_threshold, labels=args.labels,
+               anchor_length=args.anchor_length)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+This module measures where the conversion time goes: every stage of the
+conversion of every schema is timed, and the slowest schemas can be profiled
+with ``cProfile``.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+from collections import OrderedDict
+from timeit import default_timer
+
+# stages of the conversion of a schema, in the order they run
+FILE_STAGES = ['read', 'cache', 'load', 'build', 'refs', 'render', 'write']
+
+_TOP_FUNCTIONS = 20
+
+
+class StageTimer(object):
+    """Accumulate the time spent in consecutive stages.
+
+    Every call to ``lap`` charges the time elapsed since the previous one, or
+    since the timer creation, to the given stage.
+    """
+
+    def __init__(self):
+        self.stages = OrderedDict()
+        self._last = default_timer()
+
+    def lap(self, stage):
+        """
+        Charge the time elapsed since the previous lap to ``stage``.
+        """
+        now = default_timer()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+
+class ConversionProfile(object):
+    """Timings of a ``run_parser`` run.
+
+    It holds the time of every stage of the run and, for every converted
+    schema, the time of every stage of its conversion, as measured by the
+    process that converted it.
+    """
+
+    def __init__(self):
+        self.run_stages = OrderedDict()
+        self.files = OrderedDict()
+        self.memory = OrderedDict()
+        self.profiles = OrderedDict()
+
+    def add_file(self, input_name, stages, memory=None):
+        """
+        Record the stage timings of the conversion of ``input_name``.
+
+        Args:
+            input_name(string): the schema, relative to the input folder.
+            stages(dict): the seconds spent in every stage.
+            memory(dict): the peak bytes allocated in every stage, if traced.
+        """
+        self.files[input_name] = stages
+        if memory is not None:
+            self.memory[input_name] = memory
+
+    def total(self, input_name):
+        return sum(self.files[input_name].values())
+
+    def slowest(self, count):
+        """
+        Return the ``count`` schemas which took the longest to convert,
+        slowest first.
+        """
+        ranked = sorted(self.files, key=lambda name: (-self.total(name), name))
+        return ranked[:count]
+
+    def add_profile(self, input_name, stats_path):
+        """
+        Record the ``pstats`` file profiling the conversion of
+        ``input_name``.
+        """
+        self.profiles[input_name] = stats_path
+
+    def report(self):
+        """
+        Return the profile as a dictionary which can be serialized to JSON.
+        """
+        stage_totals = OrderedDict()
+        for stage in FILE_STAGES:
+            total = sum(stages.get(stage, 0.0)
+                        for stages in self.files.values())
+            if total:
+                stage_totals[stage] = total
+
+        files = []
+        for name in self.slowest(len(self.files)):
+            entry = OrderedDict([
+                ('file', name),
+                ('total', self.total(name)),
+                ('stages', self.files[name]),
+            ])
+            if name in self.memory:
+                entry['memory'] = self.memory[name]
+            if name in self.profiles:
+                entry['pstats'] = self.profiles[name]
+                entry['top_functions'] = top_functions(self.profiles[name])
+            files.append(entry)
+
+        return OrderedDict([
+            ('run_stages', self.run_stages),
+            ('file_stages', stage_totals),
+            ('files', files),
+        ])
+
+    def save(self, path):
+        """
+        Write the JSON report to ``path``.
+        """
+        with io.open(path, 'w', encoding='utf-8') as report:
+            report.write(json.dumps(self.report(), indent=2) + '\n')
+
+    def summary(self, count=10):
+        """
+        Return a table of the ``count`` slowest schemas, with the time of
+        every stage of their conversion, followed by the run stages.
+        """
+        stages = [stage for stage in FILE_STAGES
+                  if any(stage in times for times in self.files.values())]
+
+        header = ['{:<40}'.format('schema'), '{:>9}'.format('total')]
+        lines = [' '.join(header +
+                          ['{:>9}'.format(stage) for stage in stages])]
+        for name in self.slowest(count):
+            times = self.files[name]
+            lines.append(' '.join(
+                ['{:<40}'.format(name[-40:]),
+                 '{:>9.4f}'.format(self.total(name))] +
+                ['{:>9.4f}'.format(times.get(stage, 0.0))
+                 for stage in stages]))
+
+        lines.append('')
+        lines.append(', '.join('{} {:.4f}s'.format(stage, seconds)
+                               for stage, seconds in self.run_stages.items()))
+        return '\n'.join(lines)
+
+
+def profile_call(stats_path, func, *args):
+    """
+    Call ``func`` under ``cProfile``, saving the collected statistics in
+    ``stats_path``, and return its result.
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args)
+    finally:
+        profiler.dump_stats(stats_path)
+
+
+def stats_file_name(input_name):
+    """
+    Return the name of the ``pstats`` file of the schema ``input_name``.
+    """
+    return re.sub(r'[^\w.-]+', '_', input_name) + '.pstats'
+
+
+def top_functions(stats_path, count=_TOP_FUNCTIONS):
+    """
+    Return the ``count`` functions with the highest cumulative time in the
+    ``pstats`` file ``stats_path``.
+
+    Returns:
+        list<dict>: the function location, calls count, own and cumulative
+            time of every function.
+    """
+    stats = pstats.Stats(stats_path)
+    functions = []
+    for (file_name, line, name), (_, calls, own, cumulative, _) in \
+            stats.stats.items():
+        functions.append(OrderedDict([
+            ('function', '{}:{}({})'.format(os.path.basename(file_name),
+                                            line, name)),
+            ('calls', calls),
+            ('own', own),
+            ('cumulative', cumulative),
+        ]))
+    functions.sort(key=lambda function: -function['cumulative'])
+    return functions[:count]
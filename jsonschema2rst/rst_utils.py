@@ -100,8 +100,16 @@ def bullet(val):
     return '- {}'.format(val)
 
 
-def section_link(node):
-    return(NL + '.. _{}:' + NL2).format(get_json_pointer(node))
+def section_link(node, labels=None):
+    """
+    Return the label of the section of ``node``, named after its JSON
+    pointer, or just a new line if ``labels`` is given and does not contain
+    the pointer.
+    """
+    pointer = get_json_pointer(node)
+    if labels is not None and pointer not in labels:
+        return NL
+    return(NL + '.. _{}:' + NL2).format(pointer)
 
 
 def line(level, value):
@@ -97,7 +97,7 @@ _REF = ':ref:'
 ref_pattern = re.compile(r":ref:`[^#`]*`")
 
 
-def restify(node):
+def restify(node, labels=None):
     """
     Create a restructured-text string from a ``TreeNode`` object's value.
 
@@ -105,6 +105,9 @@ def restify(node):
         node(``TreeNode``): the node whose content is used to create a
             restructured-text string.
 
+        labels(set<string>): the JSON pointers of the sections whose label
+            is emitted. If None, the label of every section is.
+
     Return:
         string: the node's value in restructured-text format. Note that value
             can be wrapped by some RST constructs.
@@ -134,7 +137,7 @@ def restify(node):
                 return _apply_rule(node, SECTION_REPLACEMENT)
 
             # value is a section title
-            return section_link(node) + section_title(node)
+            return section_link(node, labels) + section_title(node)
 
 
 def _file_title(node):
@@ -222,7 +225,7 @@ def get_enums(node):
         string: a rst formatted bullet list
     """
     bullet_list = NL.join([bullet(child.value) for child in node.children])
-    node.children = []      # children will not be processed again
+    node.clear_children()   # children will not be processed again
     return NL + bullet_list
 
 
@@ -244,7 +247,7 @@ def get_required(node):
     required_list = ', '.join([resolver(child, True)
                                for child in node.children])
 
-    node.children = []  # children will not be processed again
+    node.clear_children()  # children will not be processed again
     return required_list
 
 
@@ -301,9 +304,11 @@ def rebase_level(node, amount):
         node(``TreeNode``): the subtree's root to update
         amount(int): the increasing/decreasing value for nodes level.
     """
-    for child in node.children:
+    nodes = list(node.children)
+    while nodes:
+        child = nodes.pop()
         child.lvl += amount
-        rebase_level(child, amount)
+        nodes.extend(child.children)
 
 
 def change_extension(value, new_ext):
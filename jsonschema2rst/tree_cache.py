@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+This module keeps an on-disk cache of the trees built from the schemas, in a
+compact binary intermediate representation, so that a schema whose content
+did not change is not parsed and built again by the following runs.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import hashlib
+import marshal
+import os
+import threading
+from array import array
+
+from jsonschema2rst.manifest import excluded_key_set, get_version, replace_file
+from jsonschema2rst.tree_node import TreeNode, intern_value
+
+# bump it whenever the layout of the intermediate representation changes
+IR_FORMAT = 1
+
+CACHE_EXTENSION = '.ir'
+
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+
+# three unsigned integers per node: value, id and number of children
+_NODE_FIELDS = 3
+_ARRAY_TYPE = 'I' if array('I').itemsize >= 4 else 'L'
+
+
+def dump_tree(tree):
+    """
+    Serialize ``tree`` into its intermediate representation.
+
+    Every distinct string, among node values and ids, is stored once in a
+    table; nodes are stored in pre-order as the position of their value and
+    of their id in the table, followed by their number of children.
+
+    Args:
+        tree(``TreeNode``): the root of the tree to serialize.
+
+    Returns:
+        bytes: the intermediate representation of ``tree``.
+    """
+    strings = []
+    positions = {}
+    fields = array(_ARRAY_TYPE)
+
+    nodes = [tree]
+    while nodes:
+        node = nodes.pop()
+        for string in (node.value, node.id):
+            position = positions.get(string)
+            if position is None:
+                position = positions[string] = len(strings)
+                strings.append(string)
+            fields.append(position)
+        fields.append(len(node.children))
+        nodes.extend(reversed(node.children))
+
+    if hasattr(fields, 'tobytes'):
+        raw_fields = fields.tobytes()
+    else:  # Python 2
+        raw_fields = fields.tostring()
+
+    return marshal.dumps((IR_FORMAT, strings, raw_fields))
+
+
+def load_tree(data):
+    """
+    Rebuild the tree serialized by ``dump_tree``.
+
+    Args:
+        data(bytes): the intermediate representation of a tree.
+
+    Returns:
+        ``TreeNode``: the root of the rebuilt tree.
+
+    Raises:
+        ValueError: if ``data`` is not a valid intermediate representation.
+    """
+    try:
+        ir_format, strings, raw_fields = marshal.loads(data)
+    except (EOFError, TypeError, ValueError):
+        raise ValueError('Invalid intermediate representation')
+
+    if ir_format != IR_FORMAT:
+        raise ValueError('Unsupported intermediate representation format '
+                         '{}'.format(ir_format))
+
+    fields = array(_ARRAY_TYPE)
+    try:
+        if hasattr(fields, 'frombytes'):
+            fields.frombytes(raw_fields)
+        else:  # Python 2
+            fields.fromstring(raw_fields)
+        strings = [intern_value(string) for string in strings]
+    except TypeError:
+        raise ValueError('Invalid intermediate representation')
+
+    # the value and id of every node are indexes in ``strings``
+    if not fields or len(fields) % _NODE_FIELDS or \
+            max(fields[0::_NODE_FIELDS] + fields[1::_NODE_FIELDS]) >= \
+            len(strings):
+        raise ValueError('Invalid intermediate representation')
+    new = TreeNode.__new__
+
+    root = None
+    # nodes still waiting for some of their children, with their number
+    pending = []
+
+    for position in range(0, len(fields), _NODE_FIELDS):
+        node = new(TreeNode)
+        node.value = strings[fields[position]]
+        node._id = strings[fields[position + 1]]
+        node.children = []
+        node._path = None
+        node._index = None
+
+        if pending:
+            parent, missing = pending[-1]
+            parent.children.append(node)
+            node.parent = parent
+            node.lvl = parent.lvl + 1
+            node._root = root
+            if missing == 1:
+                pending.pop()
+            else:
+                pending[-1] = (parent, missing - 1)
+        elif root is None:
+            node.parent = None
+            node.lvl = 0
+            node._root = root = node
+        else:
+            raise ValueError('Invalid intermediate representation')
+
+        children = fields[position + 2]
+        if children:
+            pending.append((node, children))
+
+    if pending:
+        raise ValueError('Invalid intermediate representation')
+
+    return root
+
+
+class TreeCache(object):
+    """On-disk cache of the trees built from the schemas.
+
+    Every tree is stored in its own file of the cache folder, named after a
+    key derived from the schema file name and content, the excluded keys and
+    the tool version, so that a stale entry is never found. The cache size is
+    bounded: when it grows larger, the least recently used entries are
+    removed by ``evict``.
+    """
+
+    def __init__(self, path, max_size=DEFAULT_CACHE_SIZE, version=None):
+        """
+        Constructor.
+
+        Args:
+            path(string): the cache folder, created if it does not exist.
+
+            max_size(int): the maximum size of the cache, in bytes.
+
+            version(string): the tool version. If not provided, the installed
+                one is used.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.version = version if version is not None else get_version()
+
+    def key(self, name, content_hash, excluded_key):
+        """
+        Return the cache key of a schema.
+
+        Args:
+            name(string): the schema file base name, which is the value of
+                the tree root.
+
+            content_hash(string): the hash of the schema file content.
+
+            excluded_key(string): csv containing schema's keywords to ignore
+
+        Returns:
+            string: the key of the schema tree.
+        """
+        digest = hashlib.sha1()
+        for part in [str(IR_FORMAT), self.version, name, content_hash] + \
+                excluded_key_set(excluded_key or ''):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key + CACHE_EXTENSION)
+
+    def get(self, key):
+        """
+        Return the tree stored with ``key``, marking it as recently used, or
+        None if there is no valid entry for it.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'rb') as entry:
+                tree = load_tree(entry.read())
+            os.utime(entry_path, None)
+        except (IOError, OSError, ValueError):
+            return None
+        return tree
+
+    def put(self, key, tree):
+        """
+        Store ``tree`` with ``key``. Failures to write the cache are ignored,
+        as the tree can always be built again.
+        """
+        entry_path = self._entry_path(key)
+        tmp_path = '{}.{}.{}.tmp'.format(entry_path, os.getpid(),
+                                         threading.current_thread().ident)
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            with open(tmp_path, 'wb') as entry:
+                entry.write(dump_tree(tree))
+            replace_file(tmp_path, entry_path)
+        except (IOError, OSError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is not larger
+        than its maximum size.
+
+        Returns:
+            int: the number of removed entries.
+        """
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return 0
+
+        entries = []
+        size = 0
+        for name in names:
+            if not name.endswith(CACHE_EXTENSION):
+                continue
+            entry_path = os.path.join(self.path, name)
+            try:
+                stat = os.stat(entry_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name, stat.st_size))
+            size += stat.st_size
+
+        removed = 0
+        for _, name, entry_size in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                continue
+            size -= entry_size
+            removed += 1
+
+        return removed
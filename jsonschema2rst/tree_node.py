@@ -26,17 +26,25 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import os
+from bisect import bisect_left, bisect_right
 from collections import OrderedDict
-from copy import copy
 
 from six import string_types
 
-_BLACK_LIST = []
+from jsonschema2rst.context import ConversionContext
+
 _ROOT = "Root"
 _NESTED_ELEMENT_FIELD = 'title'
 NESTED_ELEMENT_NAME = 'element'
 _NESTED_LIST_NAME = 'sub_list'
 _PROPERTIES = 'properties'
+_SCALAR_TYPES = string_types + (bool, int, float)
+
+# short values, such as schema keywords and ``<key: val>`` leaves, repeat
+# across every schema: a single copy of each of them is kept in this table
+_INTERNED = {}
+_INTERN_MAX_LENGTH = 80
+_INTERN_MAX_SIZE = 1 << 18
 
 # Python 2-3 compatibility
 try:
@@ -53,9 +61,18 @@ class TreeNode(object):
     level field, which tells the node's height in a hierarchical structure.
     When a parent node is provided, the level is increased by 1, otherwise
     the node is considered a root node, having level 0.
+
+    Nodes have no per-instance dictionary, and short values are interned so
+    that the same keyword or leaf value is shared by all the trees.
+
+    Every node also keeps a reference to the root of its tree and caches its
+    JSON pointer path, computed from the one of its parent, so that it is
+    built only once per node. The root holds an index of the tree values,
+    built on the first search and dropped whenever a node is added.
     """
 
-    _ID = 0
+    __slots__ = ('value', 'children', 'parent', '_id', 'lvl', '_root',
+                 '_path', '_index')
 
     def __init__(self, val='', parent=None):
         """
@@ -70,16 +87,96 @@ class TreeNode(object):
             val (string): the node's value
             parent (``TreeNode``): the node's parent.
         """
-        self.value = unicode(val).strip()
+        self.value = intern_value(unicode(val).strip())
         self.children = []
         self.parent = parent
-        self.id = self.value
+        self._id = self.value
+        self._path = None
+        self._index = None
 
         if parent is not None:
             parent.children.append(self)
             self.lvl = parent.lvl + 1
+            self._root = parent._root
+            self._root._index = None
         else:
             self.lvl = 0
+            self._root = self
+
+    @property
+    def id(self):
+        """
+        The node's identifier, used to build JSON pointers. It is the value
+        the node was created with.
+        """
+        return self._id
+
+    @id.setter
+    def id(self, value):
+        self._id = value
+
+        # cached paths of this node and of its sub-tree are not valid anymore
+        nodes = [self]
+        while nodes:
+            node = nodes.pop()
+            node._path = None
+            nodes.extend(node.children)
+
+    def root(self):
+        """
+        Return the root of the tree this node belongs to.
+
+        Returns:
+            ``TreeNode``: the root node, which is the node itself if it has no
+                parent.
+        """
+        return self._root
+
+    def clear_children(self):
+        """
+        Remove all the children of this node, keeping the index of the tree
+        up to date. Use it instead of assigning an empty list to
+        ``children``.
+        """
+        index = self._root._index
+        if index is not None:
+            index.clear(self)
+        self.children = []
+
+    def _value_index(self):
+        if self._root._index is None:
+            self._root._index = _ValueIndex(self._root)
+        return self._root._index
+
+    def pointer_path(self):
+        """
+        Return the JSON pointer path of this node inside its tree, i.e. the
+        ids of its ancestors, root excluded, and its own id, each one
+        preceded by ``/``. The root path is the empty string.
+
+        The path is computed from the parent's cached one, hence the first
+        call costs at most the length of the uncached part of the path and
+        any later one is constant.
+
+        Returns:
+            string: the node's path, e.g. ``/properties/titles``
+        """
+        if self._path is not None:
+            return self._path
+
+        uncached = []
+        node = self
+        while node._path is None and node.parent is not None:
+            uncached.append(node)
+            node = node.parent
+
+        path = node._path if node._path is not None else ''
+        node._path = path
+        for node in reversed(uncached):
+            path = path + '/' + node._id
+            node._path = path
+
+        return path
 
     def is_leaf(self):
         """
@@ -88,7 +185,7 @@ class TreeNode(object):
         Return:
             bool: True if the node has at least one child, else False
         """
-        return len(self.children) is 0
+        return not self.children
 
     def __str__(self, level=0):
         ret = "\t" * level + repr(self.value) + "\n"
@@ -140,12 +237,7 @@ class TreeNode(object):
         return ancestors
 
     @classmethod
-    def _next_id(cls):
-        cls._ID += 1
-        return cls._ID
-
-    @classmethod
-    def dict2tree(cls, dictionary, root_node, excluded_key=''):
+    def dict2tree(cls, dictionary, root_node, excluded_key='', context=None):
         """
         Given a dictionary, this function recursively creates a full tree data
         structures that maps the given input. The ``root_node`` param is used
@@ -167,6 +259,9 @@ class TreeNode(object):
 
             excluded_key(string): csv containing schema's keywords to ignore
 
+            context(``ConversionContext``): the conversion context, whose
+                excluded keys are used instead of ``excluded_key``.
+
         Returns:
             ``TreeNode``: the built tree that maps the given dictionary
         """
@@ -176,10 +271,11 @@ class TreeNode(object):
         if root_node is None:
             root_node = TreeNode(_ROOT)
 
-        global _BLACK_LIST
-        _BLACK_LIST = [key.strip() for key in excluded_key.split(',')]
+        if context is None:
+            context = ConversionContext(excluded_key)
+
         dictionary = OrderedDict(sorted(dictionary.items()))
-        _build_tree(dictionary, root_node)
+        _build_tree(dictionary, root_node, excluded=context.excluded_keys)
 
         return root_node
 
@@ -205,7 +301,12 @@ class TreeNode(object):
     def search_in_parents_siblings_subtrees(self, value):
         """
         Search a node matching the given `value` in the subtrees nested in
-        this node's siblings.
+        this node's parent's siblings.
+
+        The subtrees are searched breadth-first, from the last sibling to the
+        first one: the match closest to the siblings wins, and among equally
+        close ones the last in the tree does. The search is answered by the
+        index of the tree values, instead of visiting the subtrees.
 
         Args:
             value(string): the research key
@@ -214,21 +315,26 @@ class TreeNode(object):
             ``TreeNode``: the first node matching the given value.
                 If no one is found, None.
         """
-        siblings = copy(self.parent.parent.children) \
-            if (self.parent and self.parent.parent) else []
-
-        if self.parent in siblings:
-            siblings.remove(self.parent)
-
-        while siblings:
-            node = siblings.pop()
-
-            if node.value == value:
-                return node
-
-            siblings = node.children + siblings
-
-        return None
+        if self.parent is None or self.parent.parent is None:
+            return None
+
+        # the sibling excluded from the search is the first one equal to
+        # this node's parent (often, but not always, the parent itself)
+        excluded = None
+        for sibling in self.parent.parent.children:
+            if sibling is self.parent or (
+                    sibling.value == self.parent.value and
+                    sibling == self.parent):
+                excluded = sibling
+                break
+
+        try:
+            return self._value_index().search_subtrees(
+                value, self.parent.parent, excluded)
+        except KeyError:
+            # the subtrees were already detached from the root when the
+            # index was built: search them directly
+            return _search_subtrees(value, self.parent.parent, excluded)
 
     def relative_search(self, required_parent):
         """
@@ -248,30 +354,164 @@ class TreeNode(object):
             return self.get_ancestor(_PROPERTIES)
 
 
-def _build_tree(obj, node=None, parent_obj=None):
+class _ValueIndex(object):
+    """Index of the values of a tree.
 
+    Nodes are numbered in pre-order, so that the sub-tree of a node is the
+    range of numbers going from its own to the one of its last descendant.
+    Every value is mapped, depth by depth, to the pre-order sorted list of
+    the nodes holding it, hence the nodes with a given value in a sub-tree
+    are found by bisection.
+    """
+
+    __slots__ = ('_ranges', '_values', '_cleared')
+
+    def __init__(self, root):
+        ranges = {}
+        values = {}
+        count = 0
+
+        nodes = [(root, 0)]
+        while nodes:
+            node, depth = nodes.pop()
+
+            if depth is None:  # all descendants of node have been numbered
+                start, _, node_depth = ranges[id(node)]
+                ranges[id(node)] = (start, count, node_depth)
+                continue
+
+            ranges[id(node)] = (count, None, depth)
+            depths = values.setdefault(node.value, {})
+            positions, depth_nodes = depths.setdefault(depth, ([], []))
+            positions.append(count)
+            depth_nodes.append(node)
+            count += 1
+
+            nodes.append((node, None))
+            for child in reversed(node.children):
+                nodes.append((child, depth + 1))
+
+        self._ranges = ranges
+        self._values = dict(
+            (value, sorted(depths.items())) for value, depths in values.items()
+        )
+        self._cleared = set()
+
+    def clear(self, node):
+        """
+        Record that the children of ``node`` have been removed, so that its
+        former descendants are not reachable from its ancestors anymore.
+        """
+        self._cleared.add(id(node))
+
+    def _reachable(self, node, ancestor):
+        # True if no node between ``ancestor`` and ``node`` lost its children
+        node = node.parent
+        while node is not None:
+            if id(node) in self._cleared:
+                return False
+            if node is ancestor:
+                return True
+            node = node.parent
+        return True
+
+    def search_subtrees(self, value, node, excluded=None):
+        """
+        Return the node matching ``value`` in the sub-trees of ``node``'s
+        children, ``excluded`` sub-tree apart, that a breadth-first search
+        from the last child to the first one would find first: the least
+        deep one and, among the equally deep ones, the last in pre-order.
+
+        Raises:
+            KeyError: if ``node`` was not part of the tree when the index was
+                built.
+        """
+        start, end, node_depth = self._ranges[id(node)]
+        excluded_start = excluded_end = end
+        if excluded is not None:
+            excluded_start, excluded_end, _ = self._ranges[id(excluded)]
+
+        for depth, (positions, nodes) in self._values.get(value, ()):
+            if depth <= node_depth:
+                continue
+
+            first = bisect_right(positions, start)
+            current = bisect_left(positions, end) - 1
+
+            while current >= first:
+                if excluded_start <= positions[current] < excluded_end:
+                    current = bisect_left(positions, excluded_start) - 1
+                    continue
+
+                candidate = nodes[current]
+                if not self._cleared or self._reachable(candidate, node):
+                    return candidate
+                current -= 1
+
+        return None
+
+
+def _search_subtrees(value, node, excluded=None):
+    # breadth-first search, from the last child to the first one
+    level = [child for child in reversed(node.children)
+             if child is not excluded]
+    while level:
+        next_level = []
+        for child in level:
+            if child.value == value:
+                return child
+            next_level.extend(reversed(child.children))
+        level = next_level
+    return None
+
+
+def _build_tree(obj, node=None, parent_obj=None, excluded=frozenset()):
+    """
+    Build the sub-tree mapping ``obj`` under ``node``.
+
+    Instead of recursing once per nesting level, the visit of every nested
+    list or dictionary is pushed on an explicit stack of pending work, so
+    that deeply nested schemas do not hit the interpreter recursion limit.
+    All the children of a node are still created by the same visit, in the
+    order they have in the schema, hence the resulting tree is the same
+    whatever the order pending visits are processed in.
+
+    Keys in the ``excluded`` set are left out of the tree, with their
+    values.
+    """
+    pending = [(obj, node, parent_obj)]
+
+    while pending:
+        obj, node, parent_obj = pending.pop()
+        _visit(obj, node, parent_obj, pending, excluded)
+
+
+def _visit(obj, node, parent_obj, pending, excluded):
+    """
+    Create the nodes mapping ``obj`` directly under ``node``, appending to
+    ``pending`` the ``(obj, node, parent_obj)`` visits still to be done for
+    their nested lists and dictionaries.
+    """
     if isinstance(obj, list):
 
         for index, item in enumerate(obj):
 
             if isinstance(item, dict):
-                _process_dict_item(item, node, index)
+                _process_dict_item(item, node, pending, excluded, index)
 
             elif isinstance(item, list):
-                _process_list_item(item, node, index)
+                _process_list_item(item, node, pending, excluded, index)
 
             else:  # Create child node, implicitly appended itself to parent
                 TreeNode(unicode(item), node)
 
-    elif isinstance(obj, bool) \
-            or isinstance(obj, int) \
-            or isinstance(obj, float):
+    elif isinstance(obj, (bool, int, float)):
         # this is a leaf node, append this value to its parent's value
-        node.value += ': ' + unicode(obj)
+        node.value = intern_value(node.value + ': ' + unicode(obj))
 
     elif isinstance(obj, string_types):
 
-        if obj in _BLACK_LIST:
+        if obj in excluded:
             return
 
         res = parent_obj.get(obj, None)  # a string can be a dictionary key
@@ -279,12 +519,11 @@ def _build_tree(obj, node=None, parent_obj=None):
         if res is None:  # not a dictionary
 
             if not improve_parent(obj, node):
-                node.value += ': ' + unicode(obj)
+                node.value = intern_value(node.value + ': ' + unicode(obj))
 
         else:  # a dictionary
 
-            if isinstance(res, string_types) or isinstance(res, bool) \
-                    or isinstance(res, int) or isinstance(res, float):
+            if isinstance(res, _SCALAR_TYPES):
 
                 node_value = unicode(obj) + ': ' + unicode(res)
                 # create a leaf node, connected to the parent one
@@ -292,40 +531,70 @@ def _build_tree(obj, node=None, parent_obj=None):
 
             else:
                 child = TreeNode(obj, node)
-                _build_tree(res, child, obj)
+                pending.append((res, child, obj))
 
     else:
         for prop in obj:
+            value = obj[prop]
 
-            if isinstance(obj[prop], list):
+            if isinstance(value, list):
                 child = TreeNode(prop, node)
-                _build_tree(obj[prop], child, prop)
+                pending.append((value, child, prop))
 
-            elif isinstance(obj[prop], dict):
+            elif isinstance(value, dict):
                 child = TreeNode(prop, node)
-                _build_tree(obj[prop], child)
+                pending.append((value, child, None))
+
+            elif isinstance(value, _SCALAR_TYPES) and \
+                    isinstance(prop, string_types) and \
+                    prop not in excluded:
+                # shortcut for the most common <key, val> leaf
+                TreeNode(prop + ': ' + unicode(value), node)
 
             else:
-                _build_tree(prop, node, obj)
+                _visit(prop, node, obj, pending, excluded)
 
 
-def _process_list_item(item, parent, intermediate_value=NESTED_ELEMENT_NAME):
+def _process_list_item(item, parent, pending, excluded,
+                       intermediate_value=NESTED_ELEMENT_NAME):
     # create an intermediate node and append to it all children nodes
     intermediate = TreeNode(intermediate_value, parent)
     for sub_item in item:
-        _build_tree(sub_item, intermediate, item)
+        _visit(sub_item, intermediate, item, pending, excluded)
 
 
-def _process_dict_item(item, parent, intermediate_value=NESTED_ELEMENT_NAME):
+def _process_dict_item(item, parent, pending, excluded,
+                       intermediate_value=NESTED_ELEMENT_NAME):
     # create an intermediate node and append all key children nodes to it
     intermediate = TreeNode(intermediate_value, parent)
     for key in item.keys():
 
-        if key in _BLACK_LIST:
+        if key in excluded:
             continue
 
         child = TreeNode(key, intermediate)
-        _build_tree(item[key], child, item)
+        _visit(item[key], child, item, pending, excluded)
+
+
+def intern_value(value):
+    """
+    Return the shared copy of ``value``, if it is short enough to be interned.
+
+    Args:
+        value(string): the value to intern.
+
+    Returns:
+        string: a string equal to ``value``.
+    """
+    if len(value) > _INTERN_MAX_LENGTH:
+        return value
+
+    interned = _INTERNED.get(value)
+    if interned is None:
+        if len(_INTERNED) >= _INTERN_MAX_SIZE:
+            return value
+        interned = _INTERNED.setdefault(value, value)
+    return interned
 
 
 def improve_parent(obj, node):
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+This module keeps the documentation of a schemas folder up to date while the
+schemas are edited, converting again only the schemas that change.
+"""
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from timeit import default_timer
+
+from jsonschema2rst.context import (ALL_LABELS, REFERENCED_LABELS,
+                                    ConversionContext)
+from jsonschema2rst.conversion_run import (anchor_pointers, anchors_map,
+                                           write_anchors)
+from jsonschema2rst.dependencies import dependents, resolve_refs, schema_refs
+from jsonschema2rst.file_writer import write_if_changed
+from jsonschema2rst.json_pointer_util import short_anchor
+from jsonschema2rst.loaders import AUTO_LOADER
+from jsonschema2rst.manifest import Manifest, file_hash
+from jsonschema2rst.parser import schema2tree, tree2rst_pages
+from jsonschema2rst.parser_runner import run_parser
+from jsonschema2rst.rst_writer import (JSON_EXTENSION, RST_EXTENSION,
+                                       YML_EXTENSION, change_extension)
+from jsonschema2rst.tree_cache import DEFAULT_CACHE_SIZE
+
+DEFAULT_INTERVAL = 0.5
+
+# number of rendered pages kept in memory
+_RENDERED_CACHE_SIZE = 512
+
+
+class Watcher(object):
+    """Poll a schemas folder and convert the schemas as soon as they change.
+
+    The folder is polled, rather than relying on file system notifications
+    which are not available everywhere: a change is detected when the
+    modification time or the size of a schema changes.
+
+    When schemas are only modified, the modified schemas and the ones
+    referencing them are converted in process, and nothing else is
+    written. When schemas are added or removed, which changes the indexes
+    and the schemas having the same name, ``run_parser`` is run again: it
+    converts the changed schemas and updates the indexes. So it is when only
+    the referenced labels are emitted, as a schema change can change the
+    labels of other schemas. With short anchors, the map of the anchors is
+    kept in memory and updated with the anchors of the converted schemas.
+
+    Rendering a schema depends on the schema alone, and modifies its tree,
+    hence the rendered pages are kept in memory by schema name and content:
+    converting again a schema that did not change, such as a dependent, or
+    that got back to a previous content, such as after an undo, costs a
+    lookup.
+    """
+
+    def __init__(self, input_path, output_path,
+                 excluded_key="uniqueItems,additionalProperties,$schema",
+                 yaml_only=False, interval=DEFAULT_INTERVAL, jobs=1,
+                 loader=AUTO_LOADER, cache_path=None,
+                 cache_size=DEFAULT_CACHE_SIZE, hierarchical_index=False,
+                 index_fanout=None, split_threshold=None,
+                 labels=ALL_LABELS, anchor_length=None):
+        """
+        Constructor.
+
+        Args:
+            input_path(string): the folder where yaml schemas are located.
+
+            output_path(string): the folder where restructured-text files
+                are written.
+
+            excluded_key(string): csv containing schema's keywords to ignore
+
+            yaml_only(bool): convert only the yaml schemas.
+
+            interval(float): the seconds between two polls.
+
+            jobs, loader, cache_path, cache_size, hierarchical_index,
+            index_fanout, split_threshold, labels, anchor_length: as for
+            ``run_parser``.
+        """
+        self.input_path = input_path
+        self.output_path = os.path.abspath(output_path)
+        self.excluded_key = excluded_key
+        self.yaml_only = yaml_only
+        self.interval = interval
+        self.jobs = jobs
+        self.loader = loader
+        self.cache_path = cache_path
+        self.cache_size = cache_size
+        self.hierarchical_index = hierarchical_index
+        self.index_fanout = index_fanout
+        self.context = ConversionContext(excluded_key, loader=loader,
+                                         split_threshold=split_threshold,
+                                         labels=labels,
+                                         anchor_length=anchor_length)
+
+        self.manifest = None
+        # the map of the short anchors, if any, as written by ``build``
+        self._anchors = None
+        # True when the last ``build`` raised, e.g. on an invalid schema
+        self._build_failed = False
+        self._snapshot = {}
+        self._rendered = OrderedDict()
+
+    def snapshot(self):
+        """
+        Return the modification time and the size of every schema, by name
+        relative to the input folder.
+        """
+        extensions = (YML_EXTENSION,) if self.yaml_only else \
+            (YML_EXTENSION, JSON_EXTENSION)
+
+        snapshot = {}
+        for root, dirs, files in os.walk(self.input_path):
+            for name in files:
+                if name.endswith(extensions):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:  # removed in the meantime
+                        continue
+                    snapshot[os.path.relpath(path, self.input_path)] = (
+                        stat.st_mtime, stat.st_size)
+        return snapshot
+
+    def build(self):
+        """
+        Convert all the schemas that changed since the last conversion and
+        update the indexes, with ``run_parser``.
+        """
+        snapshot = self.snapshot()
+        self._build_failed = False
+        try:
+            run_parser(self.input_path, self.output_path, self.excluded_key,
+                       self.yaml_only, jobs=self.jobs, loader=self.loader,
+                       cache_path=self.cache_path, cache_size=self.cache_size,
+                       hierarchical_index=self.hierarchical_index,
+                       index_fanout=self.index_fanout,
+                       split_threshold=self.context.split_threshold,
+                       labels=self.context.labels,
+                       anchor_length=self.context.anchor_length)
+        except Exception as error:
+            # e.g. a schema saved while being edited is not valid yet
+            print('ERROR: {}'.format(error))
+            self._build_failed = True
+        self._snapshot = snapshot
+        self.manifest = Manifest.load(self.output_path, self.excluded_key,
+                                      options=self.context.output_options())
+        self._anchors = anchors_map(self.manifest, self.context.anchor_length)
+
+    def poll(self):
+        """
+        Convert the schemas that changed since the previous poll.
+
+        Returns:
+            bool: True if some schema changed.
+        """
+        snapshot = self.snapshot()
+        if snapshot == self._snapshot:
+            return False
+
+        start = default_timer()
+
+        if set(snapshot) != set(self._snapshot) or self._build_failed or \
+                self.context.labels == REFERENCED_LABELS:
+            self.build()
+        else:
+            modified = set(name for name in snapshot
+                           if snapshot[name] != self._snapshot[name])
+            self._snapshot = snapshot
+            self.update(modified)
+
+        print('Updated in {:.0f} ms.\n'.format(
+            (default_timer() - start) * 1000))
+        return True
+
+    def update(self, modified):
+        """
+        Convert the ``modified`` schemas whose content changed, and the ones
+        referencing them. If a modified schema was not converted by the last
+        ``build``, ``build`` is run again instead.
+
+        Args:
+            modified(set<string>): the modified schemas, relative to the
+                input folder.
+        """
+        entries = self.manifest.entries
+        hashes = {}
+        changed = set()
+
+        # e.g. a schema skipped by run_parser, or one having the same name
+        # as a converted one, which run_parser tells apart
+        if any(name not in entries for name in modified):
+            self.build()
+            return
+
+        for name in modified:
+            hashes[name] = file_hash(os.path.join(self.input_path, name))
+            if not self.manifest.is_up_to_date(name, hashes[name],
+                                               entries[name]['output']):
+                changed.add(name)
+
+        for name in sorted(changed | dependents(entries, changed)):
+            if name not in hashes:
+                hashes[name] = file_hash(os.path.join(self.input_path, name))
+            self._convert(name, hashes[name])
+
+        self.manifest.save()
+        write_anchors(self.output_path, self._anchors)
+
+    def _convert(self, name, input_hash):
+        output_name = self.manifest.entries[name]['output']
+        previous_pages = self.manifest.entries[name].get('pages', ())
+        previous_anchors = self.manifest.entries[name].get('anchors', ())
+        key = (os.path.basename(name), input_hash)
+
+        rendered = self._rendered.pop(key, None)
+        if rendered is None:
+            try:
+                rendered = self._render(name)
+            except Exception as error:
+                # keep the previous output until the schema is valid again
+                print(change_extension(os.path.basename(name), '').ljust(40) +
+                      'ERROR: {}'.format(error))
+                return
+
+        self._rendered[key] = rendered
+        if len(self._rendered) > _RENDERED_CACHE_SIZE:
+            self._rendered.popitem(last=False)
+
+        page_contents, output_hash, refs, anchors = rendered
+        output_folder = os.path.dirname(output_name)
+        pages = []
+        for index, (page, page_content) in enumerate(page_contents):
+            if index:
+                page = os.path.join(output_folder, page + RST_EXTENSION)
+                pages.append(page)
+            else:
+                page = output_name
+            write_if_changed(os.path.join(self.output_path, page),
+                             page_content)
+
+        for page in set(previous_pages) - set(pages):
+            if os.path.exists(os.path.join(self.output_path, page)):
+                os.remove(os.path.join(self.output_path, page))
+
+        self.manifest.add(name, input_hash, output_name, output_hash,
+                          resolve_refs(refs, name), pages, anchors=anchors)
+        if self._anchors is not None:
+            for pointer in previous_anchors:
+                self._anchors.pop(pointer, None)
+            for pointer in anchors:
+                self._anchors[pointer] = short_anchor(
+                    pointer, self.context.anchor_length)
+        print(change_extension(os.path.basename(name), '').ljust(40) + 'OK')
+
+    def _render(self, name):
+        with open(os.path.join(self.input_path, name)) as schema:
+            tree = schema2tree(schema, self.excluded_key,
+                               context=self.context)
+        refs = schema_refs(tree)
+        anchors = {}
+        page_contents = [(page, ''.join(chunks).encode('utf-8'))
+                         for page, chunks in tree2rst_pages(
+                             tree, self.context, anchors=anchors)]
+        return (page_contents, hashlib.sha1(page_contents[0][1]).hexdigest(),
+                refs, anchor_pointers(self.context, anchors))
+
+    def run(self):
+        """
+        Convert the schemas, then keep polling the input folder until
+        interrupted.
+        """
+        self.build()
+        print('Watching {} for changes, press Ctrl+C to stop.'.format(
+            self.input_path))
+        try:
+            while True:
+                time.sleep(self.interval)
+                self.poll()
+        except KeyboardInterrupt:
+            pass
@@ -71,7 +71,9 @@ setup(
     include_package_data=True,
     entry_points={
           'console_scripts': [
-              'jsonschema2rst = jsonschema2rst.parser_runner:cli'
+              'jsonschema2rst = jsonschema2rst.parser_runner:cli',
+              'jsonschema2rst-impact = '
+              'jsonschema2rst.parser_runner:impact_cli'
           ]
       },
 )
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+
+import pytest
+
+
+@pytest.fixture
+def write_schemas(request):
+    """
+    Return a function writing ``schemas``, mapping file names to contents,
+    in a folder. By default, the ``SCHEMAS`` of the test module are written.
+    """
+    def write(folder, schemas=None):
+        if schemas is None:
+            schemas = request.module.SCHEMAS
+        for name, content in schemas.items():
+            path = os.path.join(folder, name)
+            if not os.path.exists(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as schema:
+                schema.write(content)
+
+    return write
+
+
+@pytest.fixture
+def read_tree():
+    """
+    Return a function reading the content of every file of a folder, by
+    path relative to it.
+    """
+    def read(folder):
+        contents = {}
+        for root, dirs, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name)
+                with open(path, 'rb') as content:
+                    contents[os.path.relpath(path, folder)] = content.read()
+        return contents
+
+    return read
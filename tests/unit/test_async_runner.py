@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import sys
+import threading
+import time
+
+import pytest
+
+from jsonschema2rst.parser_runner import cli, run_parser
+
+if sys.version_info < (3, 5):
+    pytest.skip('asyncio needs Python 3.5', allow_module_level=True)
+
+from jsonschema2rst import async_runner  # noqa: E402 isort:skip
+
+SCHEMAS = dict(('schema{}.yml'.format(index),
+                'title: Schema {}\ntype: object\nproperties:\n'
+                '  id:\n    $ref: elements/id.json\n'.format(index))
+               for index in range(8))
+SCHEMAS['elements/id.json'] = '{"title": "Id", "type": "string"}'
+
+
+def test_run_async_same_output(tmpdir, write_schemas, read_tree):
+    src = str(tmpdir.mkdir('schemas'))
+    write_schemas(src)
+
+    run_parser(src, str(tmpdir.join('sync')))
+    async_runner.run_async(src, str(tmpdir.join('async')))
+    async_runner.run_async(src, str(tmpdir.join('jobs')), jobs=2, max_io=2)
+
+    expected = read_tree(str(tmpdir.join('sync')))
+    assert read_tree(str(tmpdir.join('async'))) == expected
+    assert read_tree(str(tmpdir.join('jobs'))) == expected
+
+
+def test_run_async_reports_in_scan_order(tmpdir, capsys, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    run_parser(src, out)
+    capsys.readouterr()
+    run_parser(src, out, force=True)
+    expected = capsys.readouterr()[0]
+    async_runner.run_async(src, out, force=True, jobs=3, threads=True)
+
+    assert capsys.readouterr()[0] == expected
+
+
+def test_run_async_bounds_io(tmpdir, monkeypatch, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    write_schemas(src)
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, maximum
+    read = async_runner._read
+
+    def slow_read(file_name):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return read(file_name)
+
+    monkeypatch.setattr(async_runner, '_read', slow_read)
+    async_runner.run_async(src, str(tmpdir.join('rst')), max_io=2)
+
+    assert in_flight[1] == 2
+
+
+def test_run_async_single_io_slot(tmpdir, write_schemas, read_tree):
+    src = str(tmpdir.mkdir('schemas'))
+    write_schemas(src)
+
+    run_parser(src, str(tmpdir.join('sync')))
+    async_runner.run_async(src, str(tmpdir.join('async')), max_io=1)
+
+    assert read_tree(str(tmpdir.join('async'))) == \
+        read_tree(str(tmpdir.join('sync')))
+
+
+def test_run_async_invalid_max_io(tmpdir):
+    src = str(tmpdir.mkdir('schemas'))
+
+    with pytest.raises(ValueError):
+        async_runner.run_async(src, str(tmpdir.join('rst')), max_io=0)
+
+
+def test_run_async_hashes_in_io_pool(tmpdir, monkeypatch, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    write_schemas(src)
+    io_threads = set()
+    file_hash = async_runner.file_hash
+
+    def hash_in_io_pool(file_name):
+        io_threads.add(threading.current_thread().name)
+        return file_hash(file_name)
+
+    def hash_serially(file_names):
+        raise AssertionError('the schemas are hashed one after the other')
+
+    monkeypatch.setattr(async_runner, 'file_hash', hash_in_io_pool)
+    monkeypatch.setattr('jsonschema2rst.conversion_run._hash_files',
+                        hash_serially)
+    async_runner.run_async(src, str(tmpdir.join('rst')))
+
+    assert io_threads
+
+
+def test_cli_async(tmpdir, write_schemas, read_tree):
+    src = str(tmpdir.mkdir('schemas'))
+    write_schemas(src)
+
+    run_parser(src, str(tmpdir.join('sync')))
+    cli(['--async', '--max-io', '4', src, str(tmpdir.join('async'))])
+
+    assert read_tree(str(tmpdir.join('async'))) == \
+        read_tree(str(tmpdir.join('sync')))
+
+
+def test_cli_async_invalid_max_io(tmpdir):
+    src = str(tmpdir.mkdir('schemas'))
+
+    with pytest.raises(SystemExit):
+        cli(['--async', '--max-io', '0', src, str(tmpdir.join('rst'))])
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import pickle
+
+from jsonschema2rst.context import (REFERENCED_LABELS, SORTING_ORDER,
+                                    ConversionContext)
+from jsonschema2rst.loaders import AUTO_LOADER
+
+
+def test_context_defaults():
+    context = ConversionContext()
+
+    assert context.excluded_keys == frozenset([''])
+    assert context.sorting_order == tuple(SORTING_ORDER)
+    assert context.loader == AUTO_LOADER
+    assert context.cache is None
+
+
+def test_context_excluded_keys():
+    context = ConversionContext('uniqueItems, $schema')
+
+    assert context.excluded_keys == frozenset(['uniqueItems', '$schema'])
+
+
+def test_context_pickle():
+    context = ConversionContext('$schema', sorting_order=['type'])
+
+    result = pickle.loads(pickle.dumps(context))
+
+    assert result.excluded_keys == context.excluded_keys
+    assert result.sorting_order == ('type',)
+
+
+def test_output_options():
+    assert ConversionContext('$schema').output_options() == {}
+    assert ConversionContext(sorting_order=['type'], split_threshold=10,
+                             labels=REFERENCED_LABELS,
+                             anchor_length=8).output_options() == {
+        'sorting_order': ['type'],
+        'split_threshold': 10,
+        'labels': 'referenced',
+        'anchor_length': 8,
+    }
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+
+import pytest
+
+from jsonschema2rst.conversion_run import (check_run_options, finish_run,
+                                           plan_run)
+
+SCHEMAS = {
+    'record.yml': 'title: record.yml\n',
+    'elements/title.yml': 'title: elements/title.yml\n',
+}
+
+
+def _plan_run(src, out, **kwargs):
+    return plan_run(src, out, excluded_key='uniqueItems', **kwargs)
+
+
+def test_plan_run_hash_files(tmpdir, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+    hashed = []
+
+    def hash_files(file_names):
+        hashed.extend(os.path.relpath(name, src) for name in file_names)
+        return ['hash-{}'.format(index) for index in range(len(file_names))]
+
+    plan = _plan_run(src, out, hash_files=hash_files)
+
+    assert sorted(hashed) == ['elements/title.yml', 'record.yml']
+    assert sorted(input_hash for _, input_hash, _ in plan.pending.values()) \
+        == ['hash-0', 'hash-1']
+
+
+def test_finish_run_writes_indexes_of_converted_schemas(tmpdir, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    plan = _plan_run(src, out)
+
+    assert not os.path.exists(os.path.join(out, 'elements', 'index.rst'))
+    finish_run(plan, [])
+    with open(os.path.join(out, 'elements', 'index.rst')) as index_page:
+        assert not index_page.read().endswith('\ttitle\n')
+    with open(os.path.join(out, 'index.rst')) as index_page:
+        assert not index_page.read().endswith('\t./record\n')
+
+
+@pytest.mark.parametrize('options', [
+    (1, 'all', None),
+    (None, 'some', None),
+    (None, 'all', 3),
+    (None, 'all', 41),
+])
+def test_check_run_options_invalid(options):
+    with pytest.raises(ValueError):
+        check_run_options(*options)
+
+
+def test_check_run_options():
+    check_run_options(None, 'all', None)
+    check_run_options(2, 'referenced', 8)
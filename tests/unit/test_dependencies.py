@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+
+from jsonschema2rst.dependencies import (dependents, resolve_ref, resolve_refs,
+                                         schema_refs)
+from jsonschema2rst.tree_node import TreeNode
+
+
+def test_schema_refs():
+    schema = {
+        'properties': {
+            'title': {'$ref': 'elements/title.json'},
+            'ids': {'items': {'$ref': 'elements/id.json'}},
+        },
+    }
+    tree = TreeNode.dict2tree(schema, TreeNode('hep.json'))
+
+    expected = ['elements/title.json', 'elements/id.json']
+    result = schema_refs(tree)
+
+    assert result == expected
+
+
+def test_resolve_ref():
+    expected = os.path.join('records', 'elements', 'title')
+    result = resolve_ref('elements/title.json', os.path.join('records',
+                                                             'hep.yml'))
+
+    assert result == expected
+
+
+def test_resolve_ref_parent_folder():
+    expected = os.path.join('elements', 'title')
+    result = resolve_ref('../elements/title.json#/properties',
+                         os.path.join('records', 'hep.yml'))
+
+    assert result == expected
+
+
+def test_resolve_ref_local():
+    assert resolve_ref('#/definitions/foo', 'hep.yml') is None
+
+
+def test_resolve_ref_url():
+    assert resolve_ref('http://json-schema.org/schema#', 'hep.yml') is None
+
+
+def test_resolve_refs():
+    expected = [os.path.join('elements', 'title')]
+    result = resolve_refs(
+        ['elements/title.json', 'elements/title.json', '#/foo'], 'hep.yml')
+
+    assert result == expected
+
+
+def test_dependents():
+    entries = {
+        'hep.yml': {'refs': ['elements/title', 'elements/id']},
+        'authors.yml': {'refs': ['elements/id']},
+        'elements/title.yml': {'refs': []},
+        'elements/id.yml': {},
+    }
+
+    expected = {'hep.yml'}
+    result = dependents(entries, ['elements/title.yml'])
+
+    assert result == expected
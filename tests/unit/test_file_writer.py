@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+
+import pytest
+
+from jsonschema2rst.file_writer import ComparingWriter, write_if_changed
+
+
+def _write(path, chunks):
+    with ComparingWriter(path) as out:
+        for chunk in chunks:
+            out.write(chunk)
+    return out.changed
+
+
+def _read(path):
+    with open(path, 'rb') as content:
+        return content.read()
+
+
+def test_write_if_changed(tmpdir):
+    path = str(tmpdir.join('page.rst'))
+
+    assert write_if_changed(path, b'content')
+    os.utime(path, (0, 0))
+    assert not write_if_changed(path, b'content')
+    assert os.path.getmtime(path) == 0
+    assert write_if_changed(path, b'other!!')
+    assert _read(path) == b'other!!'
+    assert os.listdir(str(tmpdir)) == ['page.rst']
+
+
+def test_comparing_writer_new_file(tmpdir):
+    path = str(tmpdir.join('page.rst'))
+
+    assert _write(path, [b'a', b'bc'])
+    assert _read(path) == b'abc'
+
+
+@pytest.mark.parametrize('chunks,changed', [
+    ([b'abc', b'def'], False),
+    ([b'a', b'bcde', b'f'], False),
+    ([b'abc', b'dxf'], True),
+    ([b'abc', b'de'], True),
+    ([b'abc', b'defg'], True),
+    ([b'abc', b'def', b'g'], True),
+    ([], True),
+])
+def test_comparing_writer(tmpdir, chunks, changed):
+    path = str(tmpdir.join('page.rst'))
+    with open(path, 'wb') as page:
+        page.write(b'abcdef')
+    os.utime(path, (0, 0))
+
+    assert _write(path, chunks) == changed
+    assert _read(path) == b''.join(chunks)
+    assert (os.path.getmtime(path) != 0) == changed
+    assert os.listdir(str(tmpdir)) == ['page.rst']
+
+
+def test_comparing_writer_error_keeps_file(tmpdir):
+    path = str(tmpdir.join('page.rst'))
+    with open(path, 'wb') as page:
+        page.write(b'abcdef')
+
+    with pytest.raises(ValueError):
+        with ComparingWriter(path) as out:
+            out.write(b'abx')
+            raise ValueError()
+
+    assert _read(path) == b'abcdef'
+    assert os.listdir(str(tmpdir)) == ['page.rst']
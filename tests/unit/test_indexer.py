@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+
+from jsonschema2rst.indexer import (create_master_index, folder_index,
+                                    folder_index_pages, index, master_index,
+                                    master_index_pages)
+
+
+def test_folder_index():
+    expected = (
+        'elements\n========\n'
+        '.. toctree::\n\t:titlesonly:\n'
+        '\n\ta-b\n\ta'
+    )
+
+    result = folder_index('elements', ['a.yml', 'a.json', 'README.md',
+                                       'a-b.json'])
+
+    assert result == expected
+
+
+def test_index(tmpdir):
+    folder = tmpdir.mkdir('elements')
+    for name in ['a.yml', 'a.json', 'a-b.json']:
+        folder.join(name).write('{}')
+
+    assert index(str(folder)) == folder_index('elements', ['a.json', 'a.yml',
+                                                           'a-b.json'])
+
+
+def test_master_index():
+    expected = (
+        'Schemas Documentation\n=====================\n'
+        '.. toctree::\n\t:titlesonly:\n\n'
+        '\t./record\n\n'
+        '\ta/index\n\n'
+        '\t' + os.path.join('a', 'b', 'index') + '\n\n'
+        '\ta-b/index\n\n'
+    )
+
+    result = master_index(
+        ['record.rst', 'index.rst', '.manifest.json'],
+        ['a-b', os.path.join('a', 'b'), 'a', '__pycache__'])
+
+    assert result == expected
+
+
+def test_create_master_index(tmpdir):
+    tmpdir.join('record.rst').write('')
+    tmpdir.join('.manifest.json').write('')
+    for folder in ['a-b', os.path.join('a', 'b'), 'a']:
+        tmpdir.join(folder).ensure('index.rst')
+    tmpdir.mkdir('empty')
+
+    create_master_index(str(tmpdir))
+
+    assert tmpdir.join('index.rst').read() == master_index(
+        ['record.rst'], ['a', os.path.join('a', 'b'), 'a-b'])
+
+
+def test_folder_index_with_folders():
+    expected = (
+        'elements\n========\n'
+        '.. toctree::\n\t:titlesonly:\n'
+        '\n\ta\n\t' + os.path.join('b', 'index') +
+        '\n\t' + os.path.join('c', 'index')
+    )
+
+    result = folder_index('elements', ['a.yml'], ['c', '__pycache__', 'b'])
+
+    assert result == expected
+
+
+def test_folder_index_pages_not_split():
+    result = folder_index_pages('elements', ['a.yml', 'b.yml'], fanout=2)
+
+    assert result == [('index.rst', folder_index('elements',
+                                                 ['a.yml', 'b.yml']))]
+
+
+def test_folder_index_pages_split():
+    file_names = ['s{}.json'.format(index) for index in range(10)]
+
+    result = folder_index_pages('elements', file_names, fanout=3)
+
+    assert [name for name, _ in result] == [
+        'index.rst',
+        'index-1.rst', 'index-1-1.rst', 'index-1-2.rst', 'index-1-3.rst',
+        'index-2.rst',
+    ]
+    pages = dict(result)
+    assert pages['index.rst'] == folder_index('elements', []) + \
+        '\n\tindex-1\n\tindex-2'
+    assert pages['index-1.rst'].startswith('elements (1)\n')
+    assert pages['index-1-2.rst'].startswith('elements (1.2)\n')
+    assert pages['index-1-2.rst'].endswith('\n\ts3\n\ts4\n\ts5')
+    assert pages['index-2.rst'].endswith('\n\ts9')
+
+
+def test_master_index_pages_split():
+    result = master_index_pages(['a.rst', 'b.rst', 'c.rst'], [], fanout=2)
+
+    assert [name for name, _ in result] == ['index.rst', 'index-1.rst',
+                                            'index-2.rst']
+    assert result[0][1] == master_index([], []) + \
+        '\tindex-1\n\n\tindex-2\n\n'
+    assert result[2][1].endswith('\n\t' + os.path.join('.', 'c'))
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import pytest
+
+from jsonschema2rst.json_pointer_util import (get_json_pointer,
+                                              ref2json_pointer, short_anchor,
+                                              split_key_val)
+from jsonschema2rst.tree_node import TreeNode, improve_parent
+
+
+def test_get_json_pointer_root():
+    expected = 'hep.json#/'
+    result = get_json_pointer(TreeNode('hep.json'))
+
+    assert result == expected
+
+
+def test_get_json_pointer_root_child():
+    expected = 'hep.json#/properties'
+    root = TreeNode('hep.json')
+    result = get_json_pointer(TreeNode('properties', root))
+
+    assert result == expected
+
+
+def test_get_json_pointer_nested():
+    expected = 'hep.json#/properties/titles/items'
+    root = TreeNode('hep.json')
+    properties = TreeNode('properties', root)
+    titles = TreeNode('titles', properties)
+    result = get_json_pointer(TreeNode('items', titles))
+
+    assert result == expected
+
+
+def test_get_json_pointer_renamed_root():
+    expected = 'Great Title!#/title'
+    root = TreeNode(0)
+    child = TreeNode('title', root)
+
+    get_json_pointer(child)
+    improve_parent('Great Title!', child)
+    result = get_json_pointer(child)
+
+    assert result == expected
+
+
+def test_split_key_val_first_separator():
+    expected = ('description', 'See: :ref:`ids`: here')
+    result = split_key_val('description: See: :ref:`ids`: here')
+
+    assert result == expected
+
+
+def test_split_key_val_without_separator():
+    with pytest.raises(ValueError):
+        split_key_val('description')
+
+
+def test_ref2json_pointer():
+    expected = ':ref:`title.json#/`'
+    result = ref2json_pointer('$ref: elements/title.json')
+
+    assert result == expected
+
+
+def test_ref2json_pointer_not_a_ref():
+    with pytest.raises(ValueError):
+        ref2json_pointer('type: string')
+
+
+def test_short_anchor():
+    assert short_anchor('record.json#/properties/titles') == \
+        'record-8bd2ad2b'
+    assert short_anchor('record.json#/properties/titles', 4) == 'record-8bd2'
+    assert short_anchor('record.json#/') != short_anchor('title.json#/')
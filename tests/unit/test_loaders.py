@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+
+import pytest
+import yaml
+
+from jsonschema2rst.loaders import (AUTO_LOADER, FULL_LOADER, JSON_LOADER,
+                                    LOADERS, SAFE_LOADER, load_schema,
+                                    loads_schema)
+
+YAML_SCHEMA = '''\
+title: Record
+type: object
+definitions:
+  id: &id
+    type: string
+    pattern: ^[0-9]+$
+properties:
+  control_number: *id
+  year:
+    type: integer
+    minimum: 1000
+  score:
+    type: number
+    default: 0.5
+  deleted:
+    type: boolean
+    default: false
+  date:
+    type: string
+    example: 2017-01-01
+'''
+
+JSON_SCHEMA = '''{
+  "title": "Record",
+  "type": "object",
+  "properties": {
+    "year": {"type": "integer", "minimum": 1000},
+    "score": {"type": "number", "default": 0.5, "maximum": 1e3},
+    "ratio": {"type": "number", "example": 1.5e-3},
+    "deleted": {"type": "boolean", "default": false},
+    "note": {"type": ["string", "null"], "default": null},
+    "limits": [1, 2.0, -3]
+  },
+  "required": ["year", "score"]
+}'''
+
+
+def _file(content, name):
+    schema_file = io.StringIO(content)
+    schema_file.name = name
+    return schema_file
+
+
+@pytest.mark.parametrize('loader', LOADERS)
+def test_load_schema_json_as_full_load(loader):
+    expected = yaml.full_load(_file(JSON_SCHEMA, 'record.json'))
+
+    result = load_schema(_file(JSON_SCHEMA, 'record.json'), loader)
+
+    assert result == expected
+    assert list(result['properties']) == list(expected['properties'])
+    assert result['properties']['score']['maximum'] == '1e3'
+    assert type(result['properties']['limits'][1]) is float
+
+
+@pytest.mark.parametrize('loader', [AUTO_LOADER, FULL_LOADER, SAFE_LOADER])
+def test_load_schema_yaml_as_full_load(loader):
+    expected = yaml.full_load(_file(YAML_SCHEMA, 'record.yml'))
+
+    result = load_schema(_file(YAML_SCHEMA, 'record.yml'), loader)
+
+    assert result == expected
+    assert list(result['properties']) == list(expected['properties'])
+    assert (result['properties']['control_number'] ==
+            result['definitions']['id'])
+
+
+def test_load_schema_auto_falls_back_to_yaml_for_json_files():
+    result = load_schema(_file(YAML_SCHEMA, 'record.json'), AUTO_LOADER)
+
+    assert result == yaml.full_load(_file(YAML_SCHEMA, 'record.yml'))
+
+
+def test_load_schema_auto_falls_back_to_yaml_for_deep_json_files():
+    depth = 3000
+    content = '{"items": ' * depth + '{}' + '}' * depth
+
+    result = load_schema(_file(content, 'record.json'), AUTO_LOADER)
+
+    for _ in range(depth):
+        result = result['items']
+    assert result == {}
+
+
+def test_load_schema_json_loader_rejects_yaml():
+    with pytest.raises(ValueError):
+        load_schema(_file(YAML_SCHEMA, 'record.yml'), JSON_LOADER)
+
+
+def test_load_schema_unknown_loader():
+    with pytest.raises(ValueError):
+        load_schema(_file(JSON_SCHEMA, 'record.json'), 'pickle')
+
+
+def test_loads_schema():
+    expected = load_schema(_file(JSON_SCHEMA, 'record.json'))
+
+    assert loads_schema(JSON_SCHEMA, 'record.json') == expected
+    assert loads_schema(JSON_SCHEMA.encode('utf-8'), 'record.json') == \
+        expected
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+
+from jsonschema2rst.manifest import MANIFEST_FILE_NAME, Manifest, file_hash
+
+
+def _manifest_with_entry(output_path, excluded_key='uniqueItems'):
+    with open(os.path.join(output_path, 'foo.rst'), 'w') as output:
+        output.write('foo')
+
+    manifest = Manifest(output_path, excluded_key, '1.0.0')
+    manifest.add('foo.yml', 'abc', 'foo.rst',
+                 file_hash(os.path.join(output_path, 'foo.rst')))
+    manifest.save()
+    return manifest
+
+
+def test_save_and_load(tmpdir):
+    out = str(tmpdir)
+    _manifest_with_entry(out)
+
+    manifest = Manifest.load(out, 'uniqueItems', '1.0.0')
+
+    assert os.path.exists(os.path.join(out, MANIFEST_FILE_NAME))
+    assert manifest.is_up_to_date('foo.yml', 'abc', 'foo.rst')
+    assert manifest.outputs() == {'foo.rst'}
+
+
+def test_load_without_manifest(tmpdir):
+    manifest = Manifest.load(str(tmpdir), 'uniqueItems', '1.0.0')
+
+    assert manifest.entries == {}
+
+
+def test_load_different_version(tmpdir):
+    out = str(tmpdir)
+    _manifest_with_entry(out)
+
+    manifest = Manifest.load(out, 'uniqueItems', '2.0.0')
+
+    assert not manifest.is_up_to_date('foo.yml', 'abc', 'foo.rst')
+
+
+def test_load_same_excluded_key_set(tmpdir):
+    out = str(tmpdir)
+    _manifest_with_entry(out, 'uniqueItems,$schema')
+
+    manifest = Manifest.load(out, '$schema, uniqueItems', '1.0.0')
+
+    assert manifest.is_up_to_date('foo.yml', 'abc', 'foo.rst')
+
+
+def test_load_different_excluded_key(tmpdir):
+    out = str(tmpdir)
+    _manifest_with_entry(out)
+
+    manifest = Manifest.load(out, 'uniqueItems,$schema', '1.0.0')
+
+    assert not manifest.is_up_to_date('foo.yml', 'abc', 'foo.rst')
+
+
+def test_is_up_to_date_changed_input(tmpdir):
+    out = str(tmpdir)
+    manifest = _manifest_with_entry(out)
+
+    assert not manifest.is_up_to_date('foo.yml', 'def', 'foo.rst')
+
+
+def test_is_up_to_date_changed_output(tmpdir):
+    out = str(tmpdir)
+    manifest = _manifest_with_entry(out)
+
+    with open(os.path.join(out, 'foo.rst'), 'w') as output:
+        output.write('bar')
+
+    assert not manifest.is_up_to_date('foo.yml', 'abc', 'foo.rst')
+
+
+def test_load_different_options(tmpdir):
+    out = str(tmpdir)
+    manifest = Manifest(out, 'uniqueItems', '1.0.0',
+                        options={'split_threshold': 10})
+    manifest.add('foo.yml', 'abc', 'foo.rst', 'def',
+                 pages=['foo.bar.rst'])
+    manifest.save()
+
+    same = Manifest.load(out, 'uniqueItems', '1.0.0',
+                         options={'split_threshold': 10})
+    different = Manifest.load(out, 'uniqueItems', '1.0.0')
+
+    assert same.outputs() == {'foo.rst', 'foo.bar.rst'}
+    assert same.stale_outputs == set()
+    assert different.entries == {}
+    assert different.stale_outputs == {'foo.rst', 'foo.bar.rst'}
+
+
+def test_is_up_to_date_missing_page(tmpdir):
+    out = str(tmpdir)
+    manifest = _manifest_with_entry(out)
+    manifest.add('foo.yml', 'abc', 'foo.rst',
+                 file_hash(os.path.join(out, 'foo.rst')), pages=['foo.x.rst'])
+
+    assert not manifest.is_up_to_date('foo.yml', 'abc', 'foo.rst')
+
+    with open(os.path.join(out, 'foo.x.rst'), 'w') as page:
+        page.write('x')
+
+    assert manifest.is_up_to_date('foo.yml', 'abc', 'foo.rst')
+
+
+def test_add_links_and_labels(tmpdir):
+    manifest = Manifest(str(tmpdir), 'uniqueItems', '1.0.0')
+    manifest.add('foo.yml', 'abc', 'foo.rst', 'def')
+    manifest.add('bar.yml', 'abc', 'bar.rst', 'def',
+                 links=['foo.json#/', 'bar.json#/a'], labels='123',
+                 anchors=['bar.json#/a', 'bar.json#/'])
+
+    assert 'links' not in manifest.entries['foo.yml']
+    assert 'labels' not in manifest.entries['foo.yml']
+    assert 'anchors' not in manifest.entries['foo.yml']
+    assert manifest.entries['bar.yml']['links'] == ['bar.json#/a',
+                                                    'foo.json#/']
+    assert manifest.entries['bar.yml']['labels'] == '123'
+    assert manifest.entries['bar.yml']['anchors'] == ['bar.json#/',
+                                                      'bar.json#/a']
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from collections import OrderedDict
+
+import pytest
+
+from jsonschema2rst.memory import (MB, MemoryBudgetExceeded, MemoryTracer,
+                                   format_peaks, tracemalloc)
+
+needs_tracemalloc = pytest.mark.skipif(tracemalloc is None,
+                                       reason='tracemalloc needs Python 3')
+
+
+@needs_tracemalloc
+def test_tracer_peaks():
+    tracer = MemoryTracer()
+    tracer.start()
+    try:
+        data = [object() for _ in range(10000)]
+        tracer.end_stage('build')
+        del data
+        tracer.end_stage('render')
+    finally:
+        tracer.stop()
+
+    assert list(tracer.peaks) == ['build', 'render']
+    assert tracer.peaks['build'] > 10000 * 16
+    assert tracer.peak() == max(tracer.peaks.values())
+    assert not tracemalloc.is_tracing()
+
+
+@needs_tracemalloc
+def test_tracer_budget_exceeded():
+    tracer = MemoryTracer(budget=MB)
+    tracer.start()
+    try:
+        data = [object() for _ in range(10000)]
+        tracer.check('render')
+        data = bytearray(2 * MB)
+        with pytest.raises(MemoryBudgetExceeded) as error:
+            tracer.check('render')
+    finally:
+        tracer.stop()
+
+    assert error.value.stage == 'render'
+    assert error.value.size > MB
+    assert 'render' in str(error.value)
+    del data
+
+
+@needs_tracemalloc
+def test_tracer_keeps_tracing_started_elsewhere():
+    tracemalloc.start()
+    try:
+        tracer = MemoryTracer()
+        tracer.start()
+        tracer.stop()
+
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_format_peaks():
+    peaks = OrderedDict([('load', 2 * MB), ('render', 3 * MB)])
+
+    assert format_peaks(peaks) == 'peak 3.0 MB (load 2.0, render 3.0)'
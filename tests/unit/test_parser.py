@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+from multiprocessing.pool import ThreadPool
+
+import pytest
+import yaml
+
+from jsonschema2rst.context import ConversionContext
+from jsonschema2rst.parser import (referenced_pointers, schema2rst,
+                                   schema2rst_to, schema2tree, schemas2rst,
+                                   split_properties, tree2rst, tree2rst_chunks,
+                                   tree2rst_pages)
+from jsonschema2rst.tree_node import TreeNode
+
+SCHEMA = '''
+title: Record
+description: A record, see :ref:`titles`.
+type: object
+properties:
+  titles:
+    type: array
+    items:
+      $ref: elements/title.json
+  document_type:
+    enum: [article, book]
+  control_number:
+    type: integer
+    minimum: 1
+required:
+- control_number
+'''
+
+EXPECTED = (
+    ' \n\n.. _record.json#/:\n\nrecord\n======\n\n'
+    'A record, see :ref:`titles`.\n\n'
+    ':type: ``object``\n\n'
+    '.. container:: title\n\n Record\n\n'
+    ':Required: :ref:`record.json#/properties/control_number`\n\n'
+    '**Properties:** :ref:`record.json#/properties/control_number`, '
+    ':ref:`record.json#/properties/document_type`, '
+    ':ref:`record.json#/properties/titles`\n\n\n'
+    '.. _record.json#/properties/control_number:\n\n'
+    'control_number\n++++++++++++++\n\n'
+    ':type: ``integer``\n\n:minimum: ``1``\n\n\n'
+    '.. _record.json#/properties/document_type:\n\n'
+    'document_type\n+++++++++++++\n\n'
+    '**Allowed values:** \n\n- article\n- book\n\n\n'
+    '.. _record.json#/properties/titles:\n\n'
+    'titles\n++++++\n\n:type: ``array``\n\n'
+    '.. container:: sub-title\n\n Every element of **titles**  is:\n\n'
+    ':Reference: :ref:`title.json#/`\n'
+)
+
+
+def _schema_file(tmpdir, content=SCHEMA):
+    schema = tmpdir.join('record.yml')
+    schema.write(content)
+    return str(schema)
+
+
+def test_schema2rst(tmpdir):
+    path = _schema_file(tmpdir)
+
+    with open(path) as schema:
+        result = schema2rst(schema, '$schema')
+
+    assert result == EXPECTED
+
+
+def test_schema2rst_to_same_as_schema2rst(tmpdir):
+    path = _schema_file(tmpdir)
+
+    with open(path) as schema:
+        expected = schema2rst(schema, '$schema')
+
+    stream = io.StringIO()
+    with open(path) as schema:
+        schema2rst_to(stream, schema, '$schema')
+    result = stream.getvalue()
+
+    assert result == expected
+
+
+def test_tree2rst_chunks(tmpdir):
+    path = _schema_file(tmpdir)
+
+    with open(path) as schema:
+        expected = schema2rst(schema, '$schema')
+
+    with open(path) as schema:
+        chunks = list(tree2rst_chunks(schema2tree(schema, '$schema')))
+
+    assert len(chunks) > 1
+    assert ''.join(chunks) == expected
+
+
+def test_schemas2rst_text_and_mapping():
+    schemas = [
+        ('record.yml', SCHEMA),
+        ('record.yml', SCHEMA.encode('utf-8')),
+        ('record', yaml.safe_load(SCHEMA)),
+    ]
+
+    result = list(schemas2rst(schemas, '$schema'))
+
+    assert result == [
+        ('record.yml', EXPECTED),
+        ('record.yml', EXPECTED),
+        ('record', EXPECTED),
+    ]
+
+
+def test_schemas2rst_is_lazy():
+    def schemas():
+        yield 'record.yml', SCHEMA
+        raise AssertionError('read ahead')
+
+    result = schemas2rst(schemas(), '$schema')
+
+    assert next(result) == ('record.yml', EXPECTED)
+
+
+def test_schemas2rst_jobs_same_order():
+    schemas = [('schema{}.json'.format(index),
+                '{{"title": "Schema {}", "type": "string"}}'.format(index))
+               for index in range(6)]
+
+    expected = list(schemas2rst(schemas, '$schema'))
+    result = list(schemas2rst(iter(schemas), '$schema', jobs=2))
+
+    assert result == expected
+    assert [name for name, _ in result] == [name for name, _ in schemas]
+
+
+def test_schemas2rst_threads():
+    schemas = [('schema{}.json'.format(index),
+                '{{"title": "Schema {}", "type": "string"}}'.format(index))
+               for index in range(6)]
+
+    expected = list(schemas2rst(schemas, '$schema'))
+    result = list(schemas2rst(iter(schemas), '$schema', jobs=3,
+                              threads=True))
+
+    assert result == expected
+
+
+def test_schemas2rst_concurrent_contexts():
+    def convert(excluded_key):
+        context = ConversionContext(excluded_key)
+        return list(schemas2rst([('record.yml', SCHEMA)] * 20, None,
+                                jobs=2, threads=True, context=context))
+
+    pool = ThreadPool(2)
+    try:
+        with_schema, with_title = pool.map(convert, ['$schema', 'title'])
+    finally:
+        pool.close()
+
+    assert with_schema == list(schemas2rst([('record.yml', SCHEMA)] * 20,
+                                           '$schema'))
+    assert with_title == list(schemas2rst([('record.yml', SCHEMA)] * 20,
+                                          'title'))
+    assert with_schema != with_title
+
+
+def test_schemas2rst_context_sorting_order():
+    context = ConversionContext('$schema',
+                                sorting_order=['type', 'description'])
+
+    result = list(schemas2rst([('record.yml', SCHEMA)], None,
+                              context=context))[0][1]
+
+    assert result.index(':type:') < result.index('A record')
+    assert EXPECTED.index('A record') < EXPECTED.index(':type:')
+
+
+def test_split_properties(tmpdir):
+    with open(_schema_file(tmpdir)) as schema:
+        tree = schema2tree(schema, '$schema')
+
+    result = split_properties(tree, 3)
+
+    assert [node.value for node in result] == ['document_type', 'titles']
+
+
+def test_tree2rst_pages_not_split(tmpdir):
+    with open(_schema_file(tmpdir)) as schema:
+        tree = schema2tree(schema, '$schema')
+
+    result = [(name, ''.join(chunks)) for name, chunks in tree2rst_pages(
+        tree, ConversionContext('$schema', split_threshold=100))]
+
+    assert result == [('record', EXPECTED)]
+
+
+def test_tree2rst_pages_split(tmpdir):
+    context = ConversionContext('$schema', split_threshold=3)
+    with open(_schema_file(tmpdir)) as schema:
+        tree = schema2tree(schema, None, context=context)
+
+    result = [(name, ''.join(chunks))
+              for name, chunks in tree2rst_pages(tree, context)]
+
+    assert [name for name, _ in result] == [
+        'record', 'record.document_type', 'record.titles']
+    main, document_type, titles = [content for _, content in result]
+    assert main.endswith(
+        '.. toctree::\n\t:titlesonly:\n\n'
+        '\trecord.document_type\n\trecord.titles\n')
+    assert '.. _record.json#/properties/control_number:' in main
+    assert '.. _record.json#/properties/titles:' not in main
+    assert document_type.startswith(
+        ' \n\n.. _record.json#/properties/document_type:\n')
+    assert titles.startswith(' \n\n.. _record.json#/properties/titles:\n')
+    labels = [line for line in EXPECTED.split('\n') if line.startswith('.. _')]
+    assert sorted(line for page in (main, document_type, titles)
+                  for line in page.split('\n')
+                  if line.startswith('.. _')) == sorted(labels)
+
+
+def test_referenced_pointers(tmpdir):
+    with open(_schema_file(tmpdir)) as schema:
+        tree = schema2tree(schema, '$schema')
+
+    result = referenced_pointers(tree)
+
+    assert result == {
+        'titles',
+        'record.json#/properties/control_number',
+        'record.json#/properties/document_type',
+        'record.json#/properties/titles',
+        'title.json#/',
+    }
+
+
+def test_tree2rst_pages_labels(tmpdir):
+    with open(_schema_file(tmpdir)) as schema:
+        tree = schema2tree(schema, '$schema')
+    labels = {'record.json#/properties/titles'}
+
+    [(name, chunks)] = tree2rst_pages(tree, labels=labels)
+    result = ''.join(chunks)
+
+    assert result == EXPECTED.replace(
+        '\n.. _record.json#/:\n\n', '\n').replace(
+        '\n.. _record.json#/properties/control_number:\n\n', '\n').replace(
+        '\n.. _record.json#/properties/document_type:\n\n', '\n')
+    assert '.. _record.json#/properties/titles:' in result
+
+
+def test_tree2rst_pages_short_anchors(tmpdir):
+    context = ConversionContext('$schema', anchor_length=8)
+    with open(_schema_file(tmpdir)) as schema:
+        tree = schema2tree(schema, None, context=context)
+    anchors = {}
+
+    [(name, chunks)] = tree2rst_pages(tree, context, anchors=anchors)
+    result = ''.join(chunks)
+
+    assert 'record.json#' not in result
+    assert '.. _record-8bd2ad2b:\n' in result
+    assert ':ref:`record-8bd2ad2b`' in result
+    # references not pointing in a schema are left as they are
+    assert ':ref:`titles`' in result
+    assert anchors['record-8bd2ad2b'] == 'record.json#/properties/titles'
+    assert sorted(anchors.values()) == [
+        'record.json#/',
+        'record.json#/properties/control_number',
+        'record.json#/properties/document_type',
+        'record.json#/properties/titles',
+    ]
+
+
+def test_tree2rst_pages_short_anchors_collision(tmpdir):
+    # the short anchors of both properties are record-0e19
+    content = 'properties:\n  p116:\n    type: string\n' \
+        '  p183:\n    type: string\n'
+    context = ConversionContext('$schema', anchor_length=4)
+    with open(_schema_file(tmpdir, content)) as schema:
+        tree = schema2tree(schema, None, context=context)
+
+    [(name, chunks)] = tree2rst_pages(tree, context)
+    with pytest.raises(ValueError):
+        ''.join(chunks)
+
+
+def test_tree2rst_deeply_nested():
+    depth = 3000
+    schema = {}
+    nested = schema
+    for _ in range(depth):
+        nested['items'] = {'type': 'array'}
+        nested = nested['items']
+
+    tree = TreeNode.dict2tree(schema, TreeNode('deep.json'))
+    result = tree2rst(tree)
+
+    assert result.count('Every element of **items**  is:') == depth - 1
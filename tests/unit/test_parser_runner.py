@@ -0,0 +1,539 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import json
+import os
+import pstats
+
+import pytest
+
+from jsonschema2rst import conversion_run
+from jsonschema2rst.memory import MB, MemoryBudgetExceeded, tracemalloc
+from jsonschema2rst.parser_runner import cli, impact, impact_cli, run_parser
+
+SCHEMAS = {
+    'record.yml': '''
+title: Record
+type: object
+properties:
+  titles:
+    type: array
+    items:
+      $ref: elements/title.json
+  control_number:
+    type: integer
+required:
+- control_number
+''',
+    'elements/title.yml': '''
+title: Title
+type: object
+properties:
+  source:
+    type: string
+    enum: [arXiv, publisher]
+  title:
+    type: string
+''',
+    'elements/id.json': '''
+{"title": "Identifier", "type": "string", "pattern": "^[0-9]+$"}
+''',
+}
+
+
+def test_run_parser(tmpdir, write_schemas, read_tree):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    run_parser(src, out)
+
+    result = sorted(read_tree(out))
+    expected = [
+        '.jsonschema2rst-manifest.json',
+        'elements/id.rst',
+        'elements/index.rst',
+        'elements/title.rst',
+        'index.rst',
+        'record.rst',
+    ]
+    assert result == expected
+
+
+def test_run_parser_jobs_same_output(tmpdir, write_schemas, read_tree):
+    src = str(tmpdir.mkdir('schemas'))
+    serial_out = str(tmpdir.join('serial'))
+    parallel_out = str(tmpdir.join('parallel'))
+    write_schemas(src)
+
+    run_parser(src, serial_out)
+    run_parser(src, parallel_out, jobs=2)
+
+    assert read_tree(serial_out) == read_tree(parallel_out)
+
+
+def test_run_parser_threads_same_output(tmpdir, write_schemas, read_tree):
+    src = str(tmpdir.mkdir('schemas'))
+    serial_out = str(tmpdir.join('serial'))
+    threads_out = str(tmpdir.join('threads'))
+    write_schemas(src)
+
+    run_parser(src, serial_out)
+    run_parser(src, threads_out, jobs=3, threads=True,
+               cache_path=str(tmpdir.join('cache')))
+
+    assert read_tree(serial_out) == read_tree(threads_out)
+
+
+def test_run_parser_threads_memory_tracing(tmpdir, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    write_schemas(src)
+
+    with pytest.raises(ValueError):
+        run_parser(src, str(tmpdir.join('rst')), jobs=2, threads=True,
+                   trace_memory=True)
+
+
+def test_run_parser_cache_same_output(tmpdir, write_schemas, read_tree):
+    src = str(tmpdir.mkdir('schemas'))
+    cache = str(tmpdir.join('cache'))
+    write_schemas(src)
+
+    run_parser(src, str(tmpdir.join('plain')))
+    run_parser(src, str(tmpdir.join('cold')), cache_path=cache)
+    run_parser(src, str(tmpdir.join('warm')), cache_path=cache)
+
+    expected = read_tree(str(tmpdir.join('plain')))
+    assert len(os.listdir(cache)) == 3
+    assert read_tree(str(tmpdir.join('cold'))) == expected
+    assert read_tree(str(tmpdir.join('warm'))) == expected
+
+
+def test_run_parser_profile(tmpdir, capsys, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    report_path = str(tmpdir.join('profile.json'))
+    write_schemas(src)
+
+    run_parser(src, str(tmpdir.join('rst')), profile=report_path,
+               profile_slowest=1)
+
+    with open(report_path) as report_file:
+        report = json.load(report_file)
+    files = report['files']
+    assert sorted(entry['file'] for entry in files) == [
+        'elements/id.json', 'elements/title.yml', 'record.yml']
+    assert set(files[0]['stages']) == {'load', 'build', 'refs', 'render',
+                                       'write'}
+    assert os.path.exists(files[0]['pstats'])
+    assert 'pstats' not in files[1]
+    assert list(report['run_stages']) == ['scan', 'convert', 'manifest',
+                                          'index']
+    assert 'Profile report written' in capsys.readouterr()[0]
+
+
+def test_run_parser_profile_slowest_without_cache(tmpdir, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    report_path = str(tmpdir.join('profile.json'))
+    write_schemas(src)
+
+    run_parser(src, str(tmpdir.join('rst')), profile=report_path,
+               profile_slowest=1, cache_path=str(tmpdir.join('cache')))
+
+    with open(report_path) as report_file:
+        stats_path = json.load(report_file)['files'][0]['pstats']
+    functions = set(function for _, _, function
+                    in pstats.Stats(stats_path).stats)
+    assert 'dict2tree' in functions
+    assert 'load_tree' not in functions
+
+
+def test_run_parser_profile_slowest_writes_nothing(tmpdir, monkeypatch,
+                                                   write_schemas, read_tree):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+    run_parser(src, out)
+    before = read_tree(out)
+    # a regular file standing for os.devnull, which must not be written
+    devnull = tmpdir.join('devnull')
+    devnull.write('')
+    monkeypatch.setattr(os, 'devnull', str(devnull))
+
+    run_parser(src, out, force=True, profile=str(tmpdir.join('profile.json')),
+               profile_slowest=3)
+
+    assert devnull.read() == ''
+    assert read_tree(out) == before
+
+
+@pytest.mark.skipif(tracemalloc is None, reason='tracemalloc needs Python 3')
+def test_run_parser_memory_budget(tmpdir, capsys, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    schemas = dict(SCHEMAS)
+    schemas['big.yml'] = 'title: Big\nenum:\n' + ''.join(
+        '  - value{}\n'.format(index) for index in range(20000))
+    write_schemas(src, schemas)
+
+    run_parser(src, out, trace_memory=True, memory_budget=2 * 1024 * 1024)
+
+    result = capsys.readouterr()[0]
+    assert 'big' + ' ' * 37 + 'SKIPPED: memory budget exceeded' in result
+    assert result.count(' OK  peak ') == 3
+    assert not os.path.exists(os.path.join(out, 'big.rst'))
+    assert os.path.exists(os.path.join(out, 'record.rst'))
+
+
+@pytest.mark.skipif(tracemalloc is None, reason='tracemalloc needs Python 3')
+def test_run_parser_memory_budget_removes_split_pages(tmpdir, capsys,
+                                                      monkeypatch,
+                                                      write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src, {'record.yml': '''
+title: Record
+type: object
+properties:
+  first:
+    properties:
+      a: {type: string}
+      b: {type: string}
+  second:
+    properties:
+      a: {type: string}
+      b: {type: string}
+'''})
+    writer = conversion_run.ComparingWriter
+
+    def failing_writer(path):
+        if path.endswith('second.rst'):
+            raise MemoryBudgetExceeded('render', 2, 1)
+        return writer(path)
+
+    monkeypatch.setattr(conversion_run, 'ComparingWriter', failing_writer)
+    run_parser(src, out, split_threshold=3, memory_budget=1024 * MB)
+
+    assert 'SKIPPED' in capsys.readouterr()[0]
+    assert [name for name in os.listdir(out)
+            if name.startswith('record')] == []
+
+
+@pytest.mark.skipif(tracemalloc is None, reason='tracemalloc needs Python 3')
+def test_run_parser_memory_budget_unlisted(tmpdir, monkeypatch, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+    writer = conversion_run.ComparingWriter
+
+    def failing_writer(path):
+        if path.endswith('title.rst'):
+            raise MemoryBudgetExceeded('render', 2, 1)
+        return writer(path)
+
+    monkeypatch.setattr(conversion_run, 'ComparingWriter', failing_writer)
+    run_parser(src, out, memory_budget=1024 * MB)
+
+    with open(os.path.join(out, 'elements', 'index.rst')) as index_page:
+        assert index_page.read().endswith('\n\n\tid')
+
+
+def test_run_parser_skips_unchanged_schemas(tmpdir, capsys, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    run_parser(src, out)
+    capsys.readouterr()
+    run_parser(src, out)
+
+    result = capsys.readouterr()[0]
+    assert 'OK' not in result
+    assert '3 schemas up to date.' in result
+
+
+def test_run_parser_converts_changed_schemas(tmpdir, capsys, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    run_parser(src, out)
+    capsys.readouterr()
+    write_schemas(src, {'elements/id.json': '{"title": "Id"}'})
+    run_parser(src, out)
+
+    result = capsys.readouterr()[0].splitlines()
+    assert 'id'.ljust(40) + 'OK' in result
+    assert '2 schemas up to date.' in result
+
+
+def test_run_parser_keeps_unchanged_files(tmpdir, capsys, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+    run_parser(src, out)
+    assert '5 files changed.' in capsys.readouterr()[0]
+
+    outputs = [os.path.join(root, name)
+               for root, dirs, files in os.walk(out) for name in files
+               if name.endswith('.rst')]
+    for output in outputs:
+        os.utime(output, (0, 0))
+    run_parser(src, out, force=True)
+
+    assert '0 files changed.' in capsys.readouterr()[0]
+    assert all(os.path.getmtime(output) == 0 for output in outputs)
+
+
+def test_run_parser_hierarchical_index(tmpdir, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    schemas = dict(SCHEMAS)
+    schemas['elements/nested/extra.yml'] = 'title: Extra\n'
+    schemas['elements/other.yml'] = 'title: Other\n'
+    write_schemas(src, schemas)
+
+    run_parser(src, out, hierarchical_index=True, index_fanout=2)
+
+    with open(os.path.join(out, 'index.rst')) as index_page:
+        assert '\telements/index\n' in index_page.read()
+    with open(os.path.join(out, 'elements', 'index.rst')) as index_page:
+        assert index_page.read().endswith('\n\tindex-1\n\tindex-2')
+    with open(os.path.join(out, 'elements', 'index-2.rst')) as index_page:
+        assert index_page.read().endswith('\n\tnested/index')
+    assert os.path.exists(os.path.join(out, 'elements', 'nested',
+                                       'index.rst'))
+
+    run_parser(src, out)
+
+    with open(os.path.join(out, 'index.rst')) as index_page:
+        assert '\telements/nested/index\n' in index_page.read()
+    assert not os.path.exists(os.path.join(out, 'elements', 'index-2.rst'))
+
+
+def test_run_parser_index_fanout_too_small(tmpdir):
+    src = str(tmpdir.mkdir('schemas'))
+
+    with pytest.raises(ValueError):
+        run_parser(src, str(tmpdir.join('rst')), index_fanout=1)
+
+
+def test_run_parser_split_threshold(tmpdir, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    run_parser(src, out, split_threshold=3)
+
+    with open(os.path.join(out, 'record.rst')) as record:
+        assert record.read().endswith('\n\trecord.titles\n')
+    with open(os.path.join(out, 'record.titles.rst')) as titles:
+        assert '.. _record.json#/properties/titles:' in titles.read()
+    assert not os.path.exists(os.path.join(out, 'record.control_number.rst'))
+    with open(os.path.join(out, 'index.rst')) as index_page:
+        assert 'record.titles' not in index_page.read()
+
+    run_parser(src, out)
+
+    assert not os.path.exists(os.path.join(out, 'record.titles.rst'))
+
+
+def test_run_parser_referenced_labels(tmpdir, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    run_parser(src, out, labels='referenced')
+
+    with open(os.path.join(out, 'record.rst')) as record:
+        content = record.read()
+    assert '.. _record.json#/:' not in content
+    assert '.. _record.json#/properties/titles:' in content
+    with open(os.path.join(out, 'elements', 'title.rst')) as title:
+        assert '.. _title.json#/:' in title.read()
+    with open(os.path.join(out, 'elements', 'id.rst')) as identifier:
+        assert '.. _' not in identifier.read()
+
+
+def test_run_parser_referenced_labels_new_reference(tmpdir, capsys,
+                                                    write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    run_parser(src, out, labels='referenced')
+    schemas = dict(SCHEMAS)
+    schemas['record.yml'] = 'description: See :ref:`id.json#/`.\n' + \
+        SCHEMAS['record.yml']
+    write_schemas(src, schemas)
+    capsys.readouterr()
+    run_parser(src, out, labels='referenced')
+
+    result = capsys.readouterr()[0]
+    assert result.count('OK') == 2
+    assert '1 schemas up to date.' in result
+    with open(os.path.join(out, 'elements', 'id.rst')) as identifier:
+        assert '.. _id.json#/:' in identifier.read()
+
+
+def test_run_parser_unknown_labels(tmpdir):
+    src = str(tmpdir.mkdir('schemas'))
+
+    with pytest.raises(ValueError):
+        run_parser(src, str(tmpdir.join('rst')), labels='none')
+
+
+def test_run_parser_short_anchors(tmpdir, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    run_parser(src, out, anchor_length=8)
+
+    with open(os.path.join(out, 'jsonschema2rst-anchors.json')) as map_file:
+        anchors = json.load(map_file)
+    assert anchors['record.json#/properties/titles'] == 'record-8bd2ad2b'
+    assert anchors['title.json#/'].startswith('title-')
+    with open(os.path.join(out, 'record.rst')) as record:
+        content = record.read()
+    assert '.. _record-8bd2ad2b:' in content
+    assert ':ref:`{}`'.format(anchors['title.json#/']) in content
+
+    run_parser(src, out)
+
+    assert not os.path.exists(os.path.join(out,
+                                           'jsonschema2rst-anchors.json'))
+
+
+def test_run_parser_anchor_length_out_of_range(tmpdir):
+    src = str(tmpdir.mkdir('schemas'))
+
+    with pytest.raises(ValueError):
+        run_parser(src, str(tmpdir.join('rst')), anchor_length=2)
+
+
+def test_run_parser_force(tmpdir, capsys, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    run_parser(src, out)
+    capsys.readouterr()
+    run_parser(src, out, force=True)
+
+    result = capsys.readouterr()[0]
+    assert 'up to date' not in result
+    assert result.count('OK') == 3
+
+
+def test_run_parser_removes_deleted_schemas_output(tmpdir, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    run_parser(src, out)
+    os.remove(os.path.join(src, 'elements', 'id.json'))
+    run_parser(src, out)
+
+    assert not os.path.exists(os.path.join(out, 'elements', 'id.rst'))
+    assert os.path.exists(os.path.join(out, 'elements', 'title.rst'))
+
+
+def test_run_parser_converts_dependents(tmpdir, capsys, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+
+    run_parser(src, out)
+    capsys.readouterr()
+    write_schemas(src, {'elements/title.yml': 'title: New title'})
+    run_parser(src, out)
+
+    result = capsys.readouterr()[0].splitlines()
+    assert 'title'.ljust(40) + 'OK' in result
+    assert 'record'.ljust(40) + 'OK' in result
+    assert '1 schemas up to date.' in result
+
+
+def test_impact(tmpdir, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+    run_parser(src, out)
+
+    expected = [os.path.join('elements', 'title.yml'), 'record.yml']
+    result = impact(out, [os.path.join(src, 'elements', 'title.yml')])
+
+    assert result == expected
+
+
+def test_impact_cli_pages(tmpdir, capsys, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+    run_parser(src, out)
+    capsys.readouterr()
+
+    impact_cli(['--pages', out, os.path.join('elements', 'id.json')])
+
+    expected = [os.path.join('elements', 'id.rst')]
+    result = capsys.readouterr()[0].splitlines()
+    assert result == expected
+
+
+def test_impact_cli_pages_other_extension(tmpdir, capsys, write_schemas):
+    src = str(tmpdir.mkdir('schemas'))
+    out = str(tmpdir.join('rst'))
+    write_schemas(src)
+    run_parser(src, out)
+    capsys.readouterr()
+
+    impact_cli(['--pages', out, os.path.join('elements', 'title.json')])
+
+    expected = [os.path.join('elements', 'title.rst'), 'record.rst']
+    result = capsys.readouterr()[0].splitlines()
+    assert result == expected
+
+
+def test_cli_schemas_folder_named_impact(tmpdir, monkeypatch, write_schemas):
+    write_schemas(str(tmpdir.mkdir('impact')))
+    monkeypatch.chdir(str(tmpdir))
+
+    cli(['impact', 'rst'])
+
+    assert tmpdir.join('rst', 'record.rst').check()
+
+
+@pytest.mark.parametrize('option', [
+    ['--threads'], ['--async'], ['--force'], ['--profile', 'profile.json'],
+    ['--trace-memory'], ['--memory-budget', '100'],
+])
+def test_cli_watch_unsupported_option(tmpdir, option):
+    src = str(tmpdir.mkdir('schemas'))
+
+    with pytest.raises(SystemExit):
+        cli(['--watch', src, str(tmpdir.join('rst'))] + option)
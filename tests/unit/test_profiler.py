@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+
+from jsonschema2rst.profiler import (ConversionProfile, StageTimer,
+                                     profile_call, stats_file_name,
+                                     top_functions)
+
+
+def _profile():
+    profile = ConversionProfile()
+    profile.add_file('fast.yml', {'load': 0.1, 'render': 0.1})
+    profile.add_file('slow.yml', {'load': 0.5, 'render': 1.0})
+    profile.add_file('medium.yml', {'load': 0.2, 'render': 0.3})
+    profile.run_stages['convert'] = 2.2
+    return profile
+
+
+def test_stage_timer():
+    timer = StageTimer()
+    timer.lap('load')
+    timer.lap('render')
+    timer.lap('load')
+
+    assert list(timer.stages) == ['load', 'render']
+    assert all(seconds >= 0 for seconds in timer.stages.values())
+
+
+def test_slowest():
+    assert _profile().slowest(2) == ['slow.yml', 'medium.yml']
+
+
+def test_report():
+    report = _profile().report()
+
+    assert [entry['file'] for entry in report['files']] == [
+        'slow.yml', 'medium.yml', 'fast.yml']
+    assert report['files'][0]['total'] == 1.5
+    assert round(report['file_stages']['render'], 6) == 1.4
+    assert report['run_stages'] == {'convert': 2.2}
+
+
+def test_summary():
+    lines = _profile().summary(1).splitlines()
+
+    assert lines[0].split() == ['schema', 'total', 'load', 'render']
+    assert lines[1].split() == ['slow.yml', '1.5000', '0.5000', '1.0000']
+    assert lines[-1] == 'convert 2.2000s'
+
+
+def test_stats_file_name():
+    assert stats_file_name('elements/title.yml') == 'elements_title.yml.pstats'
+
+
+def test_profile_call(tmpdir):
+    stats_path = str(tmpdir.join('sorted.pstats'))
+
+    result = profile_call(stats_path, sorted, [3, 1, 2])
+
+    assert result == [1, 2, 3]
+    assert os.path.exists(stats_path)
+    assert top_functions(stats_path)
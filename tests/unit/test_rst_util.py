@@ -29,7 +29,8 @@ import pytest
 
 from jsonschema2rst.rst_utils import (bold, bullet, container, emphasize,
                                       explicit_link, kv_field, line, literal,
-                                      make_title)
+                                      make_title, section_link)
+from jsonschema2rst.tree_node import TreeNode
 
 
 def test_emphasize_string():
@@ -232,3 +233,13 @@ def test_make_title():
     expected = 'foo\n==='
     result = make_title('foo', 0)
     assert result == expected
+
+
+def test_section_link():
+    node = TreeNode('titles', TreeNode('properties', TreeNode('record.json')))
+
+    assert section_link(node) == \
+        '\n.. _record.json#/properties/titles:\n\n'
+    assert section_link(node, {'record.json#/properties/titles'}) == \
+        '\n.. _record.json#/properties/titles:\n\n'
+    assert section_link(node, {'record.json#/'}) == '\n'
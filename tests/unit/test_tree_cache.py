@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import marshal
+import os
+from array import array
+
+import pytest
+
+from jsonschema2rst.parser import tree2rst
+from jsonschema2rst.tree_cache import (_ARRAY_TYPE, IR_FORMAT, TreeCache,
+                                       dump_tree, load_tree)
+from jsonschema2rst.tree_node import TreeNode
+
+SCHEMA = {
+    'title': 'Record',
+    'type': 'object',
+    'properties': {
+        'titles': {
+            'type': 'array',
+            'items': {'title': 'Title', 'type': 'string'},
+        },
+        'year': {'type': 'integer', 'minimum': 1000},
+    },
+    'required': ['titles'],
+}
+
+
+def _tree(name='record.json'):
+    return TreeNode.dict2tree(SCHEMA, TreeNode(name), 'uniqueItems')
+
+
+def _assert_same_tree(tree, other):
+    nodes = [(tree, other)]
+    while nodes:
+        node, other_node = nodes.pop()
+        assert node.value == other_node.value
+        assert node.id == other_node.id
+        assert node.lvl == other_node.lvl
+        assert node.root() is tree
+        assert other_node.root() is other
+        assert len(node.children) == len(other_node.children)
+        for child, other_child in zip(node.children, other_node.children):
+            assert child.parent is node
+            assert other_child.parent is other_node
+            nodes.append((child, other_child))
+
+
+def test_dump_and_load_tree():
+    tree = _tree()
+    tree.children[0].id = 'changed_id'
+
+    _assert_same_tree(tree, load_tree(dump_tree(tree)))
+
+
+def test_loaded_tree_renders_the_same():
+    expected = tree2rst(_tree())
+
+    assert tree2rst(load_tree(dump_tree(_tree()))) == expected
+
+
+def test_load_tree_invalid_data():
+    data = dump_tree(_tree())
+
+    with pytest.raises(ValueError):
+        load_tree(data[:len(data) // 2])
+
+
+@pytest.mark.parametrize('content', [
+    (IR_FORMAT, ['record.json'], array(_ARRAY_TYPE, [0, 1, 0])),
+    (IR_FORMAT, [1], array(_ARRAY_TYPE, [0, 0, 0])),
+    (IR_FORMAT, ['record.json'], 1),
+])
+def test_load_tree_corrupted_data(content):
+    content = content[:2] + (_to_bytes(content[2]),)
+
+    with pytest.raises(ValueError):
+        load_tree(marshal.dumps(content))
+
+
+def _to_bytes(fields):
+    if not isinstance(fields, array):
+        return fields
+    if hasattr(fields, 'tobytes'):
+        return fields.tobytes()
+    return fields.tostring()  # Python 2
+
+
+def test_cache_get_corrupted_entry(tmpdir):
+    cache = TreeCache(str(tmpdir.join('cache')), version='1.0.0')
+    key = cache.key('record.json', 'abc', 'uniqueItems')
+    cache.put(key, _tree())
+    with open(cache._entry_path(key), 'wb') as entry:
+        entry.write(marshal.dumps((IR_FORMAT, ['record.json'], _to_bytes(
+            array(_ARRAY_TYPE, [0, 1, 0])))))
+
+    assert cache.get(key) is None
+
+
+def test_cache_get_and_put(tmpdir):
+    cache = TreeCache(str(tmpdir.join('cache')), version='1.0.0')
+    key = cache.key('record.json', 'abc', 'uniqueItems')
+
+    assert cache.get(key) is None
+
+    cache.put(key, _tree())
+
+    _assert_same_tree(_tree(), cache.get(key))
+
+
+def test_cache_key():
+    cache = TreeCache('cache', version='1.0.0')
+    key = cache.key('record.json', 'abc', 'uniqueItems,$schema')
+
+    assert key == cache.key('record.json', 'abc', '$schema, uniqueItems')
+    assert key != cache.key('record.json', 'abd', 'uniqueItems,$schema')
+    assert key != cache.key('other.json', 'abc', 'uniqueItems,$schema')
+    assert key != cache.key('record.json', 'abc', 'uniqueItems')
+    assert key != TreeCache('cache', version='2.0.0').key(
+        'record.json', 'abc', 'uniqueItems,$schema')
+
+
+def test_cache_evict_least_recently_used(tmpdir):
+    path = str(tmpdir)
+    cache = TreeCache(path, version='1.0.0')
+    keys = [cache.key('record.json', str(index), '') for index in range(3)]
+
+    for age, key in enumerate(keys):
+        cache.put(key, _tree())
+        entry_time = 1000000 + age
+        os.utime(os.path.join(path, key + '.ir'), (entry_time, entry_time))
+
+    # reading the oldest entry makes it the most recently used
+    assert cache.get(keys[0]) is not None
+
+    cache.max_size = 2 * os.path.getsize(os.path.join(path, keys[0] + '.ir'))
+
+    assert cache.evict() == 1
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
@@ -25,7 +25,10 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
-from jsonschema2rst.tree_node import TreeNode, improve_parent
+import pytest
+
+from jsonschema2rst.context import ConversionContext
+from jsonschema2rst.tree_node import TreeNode, improve_parent, intern_value
 
 
 def test_init_with_string():
@@ -67,6 +70,29 @@ def test_init_without_val():
     assert result == expected
 
 
+def test_init_has_no_instance_dict():
+    node = TreeNode('foo')
+
+    with pytest.raises(AttributeError):
+        node.foo = 'bar'
+
+
+def test_init_interns_values():
+    parent_1 = TreeNode('foo')
+    parent_2 = TreeNode('bar')
+
+    node_1 = TreeNode(''.join(['type: ', 'string']), parent_1)
+    node_2 = TreeNode(''.join(['type: ', 'string']), parent_2)
+
+    assert node_1.value is node_2.value
+
+
+def test_intern_value_long_value():
+    value = 'x' * 1000
+
+    assert intern_value(value) is value
+
+
 def test_is_leaf_true():
     leaf = TreeNode('leaf')
 
@@ -128,17 +154,6 @@ def test_ancestors():
     assert result == expected
 
 
-def test_next_id():
-    expected = [1, 2, 3]
-
-    TreeNode._ID = 0    # reset the id counter
-    result = []
-    for i in range(3):
-        result.append(TreeNode._next_id())
-
-    assert result == expected
-
-
 def test_dict2tree_none_dict_gives_just_a_node():
     expected = TreeNode('Root')
     result = TreeNode.dict2tree(None, None)
@@ -199,6 +214,21 @@ def test_dict2tree_simple_dict():
     assert result == expected
 
 
+def test_dict2tree_with_context():
+    expected = TreeNode('Root')
+    TreeNode('value2: bar', expected)
+
+    dictionary = {
+        'value1': 'foo',
+        'value2': 'bar'
+    }
+
+    context = ConversionContext('value1')
+    result = TreeNode.dict2tree(dictionary, None, 'value2', context)
+
+    assert result == expected
+
+
 def test_dict2tree_simple_dict_with_integers():
     expected = TreeNode('Root')
     child_1 = TreeNode('value1: 1', expected)
@@ -263,6 +293,66 @@ def test_dict2tree_dict_with_dict():
     assert result == expected
 
 
+def test_dict2tree_keeps_siblings_order():
+    expected = TreeNode('Root')
+    child_1 = TreeNode('a', expected)
+    child_1_1 = TreeNode('z: 1', child_1)
+    child_2 = TreeNode('b: foo', expected)
+    child_3 = TreeNode('c', expected)
+    child_3_1 = TreeNode('0', child_3)
+    child_3_2 = TreeNode('bar', child_3)
+    child_4 = TreeNode('d: True', expected)
+
+    dictionary = {
+        'a': {'z': 1},
+        'b': 'foo',
+        'c': [{}, 'bar'],
+        'd': True,
+    }
+
+    result = TreeNode.dict2tree(dictionary, None)
+
+    assert result == expected
+
+
+def test_dict2tree_list_item_titles_improve_parent():
+    expected = TreeNode('Root')
+    child_1 = TreeNode('anyOf', expected)
+    child_1_1 = TreeNode('first', child_1)
+    child_1_1_1 = TreeNode('', child_1_1)
+    child_1_1_2 = TreeNode('type: string', child_1_1)
+    child_1_2 = TreeNode('1', child_1)
+    child_1_2_1 = TreeNode('type: integer', child_1_2)
+
+    dictionary = {
+        'anyOf': [
+            {'title': 'first', 'type': 'string'},
+            {'type': 'integer'},
+        ]
+    }
+
+    result = TreeNode.dict2tree(dictionary, None)
+
+    assert result == expected
+
+
+def test_dict2tree_deeply_nested():
+    depth = 5000
+    dictionary = {}
+    nested = dictionary
+    for _ in range(depth):
+        nested['items'] = {}
+        nested = nested['items']
+    nested['type'] = 'string'
+
+    result = TreeNode.dict2tree(dictionary, None)
+
+    for _ in range(depth):
+        assert [child.value for child in result.children] == ['items']
+        result = result.children[0]
+    assert [child.value for child in result.children] == ['type: string']
+
+
 def test_improve_parent_node_title():
     expected = "Great Title!"
 
@@ -311,3 +401,112 @@ def test_search_in_parents_siblings_subtrees_returns_none():
     result = searching_leaf.search_in_parents_siblings_subtrees('Not there')
 
     assert result == expected
+
+
+def test_root():
+    root = TreeNode('Root')
+    child = TreeNode('child', root)
+    grandchild = TreeNode('grandchild', child)
+
+    assert grandchild.root() is root
+    assert root.root() is root
+
+
+def test_pointer_path():
+    root = TreeNode('Root')
+    child = TreeNode('properties', root)
+    grandchild = TreeNode('title', child)
+
+    assert root.pointer_path() == ''
+    assert child.pointer_path() == '/properties'
+    assert grandchild.pointer_path() == '/properties/title'
+
+
+def test_pointer_path_uses_ids_after_improve_parent():
+    root = TreeNode('Root')
+    intermediate = TreeNode(0, root)
+    child = TreeNode('title', intermediate)
+
+    assert child.pointer_path() == '/0/title'
+
+    improve_parent('Great Title!', child)
+
+    assert intermediate.value == 'Great Title!'
+    assert child.pointer_path() == '/0/title'
+
+
+def test_pointer_path_id_change_invalidates_sub_tree():
+    root = TreeNode('Root')
+    child = TreeNode('foo', root)
+    grandchild = TreeNode('bar', child)
+
+    assert grandchild.pointer_path() == '/foo/bar'
+
+    child.id = 'baz'
+
+    assert child.pointer_path() == '/baz'
+    assert grandchild.pointer_path() == '/baz/bar'
+
+
+def test_search_in_parents_siblings_subtrees_closest_match():
+    root = TreeNode('Root')
+    sibling_1 = TreeNode('Sibling 1', root)
+    searching_leaf = TreeNode('Searching', sibling_1)
+    sibling_2 = TreeNode('Sibling 2', root)
+    deep = TreeNode('Searched', TreeNode('Inner', sibling_2))
+    sibling_3 = TreeNode('Sibling 3', root)
+    close = TreeNode('Searched', sibling_3)
+
+    result = searching_leaf.search_in_parents_siblings_subtrees('Searched')
+
+    assert result is close
+
+
+def test_search_in_parents_siblings_subtrees_last_sibling_first():
+    root = TreeNode('Root')
+    first = TreeNode('Searched', TreeNode('Sibling 1', root))
+    searching_leaf = TreeNode('Searching', TreeNode('Sibling 2', root))
+    last = TreeNode('Searched', TreeNode('Sibling 3', root))
+
+    result = searching_leaf.search_in_parents_siblings_subtrees('Searched')
+
+    assert result is last
+
+
+def test_search_in_parents_siblings_subtrees_skips_parent():
+    root = TreeNode('Root')
+    sibling_1 = TreeNode('Sibling 1', root)
+    searching_leaf = TreeNode('Searching', sibling_1)
+    TreeNode('Searched', sibling_1)
+
+    result = searching_leaf.search_in_parents_siblings_subtrees('Searched')
+
+    assert result is None
+
+
+def test_search_in_parents_siblings_subtrees_after_clear_children():
+    root = TreeNode('Root')
+    searching_leaf = TreeNode('Searching', TreeNode('Sibling 1', root))
+    sibling_2 = TreeNode('Sibling 2', root)
+    TreeNode('Searched', sibling_2)
+
+    assert searching_leaf.search_in_parents_siblings_subtrees('Searched')
+
+    sibling_2.clear_children()
+
+    assert searching_leaf.search_in_parents_siblings_subtrees(
+        'Searched') is None
+
+
+def test_search_in_parents_siblings_subtrees_after_adding_nodes():
+    root = TreeNode('Root')
+    searching_leaf = TreeNode('Searching', TreeNode('Sibling 1', root))
+    sibling_2 = TreeNode('Sibling 2', root)
+
+    assert searching_leaf.search_in_parents_siblings_subtrees(
+        'Searched') is None
+
+    searched = TreeNode('Searched', sibling_2)
+
+    assert searching_leaf.search_in_parents_siblings_subtrees(
+        'Searched') is searched
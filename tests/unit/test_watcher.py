@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of INSPIRE-SCHEMAS.
+# Copyright (C) 2017 CERN.
+#
+# INSPIRE-SCHEMAS is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# INSPIRE-SCHEMAS is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with INSPIRE-SCHEMAS; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+
+from jsonschema2rst.conversion_run import ANCHORS_FILE_NAME
+from jsonschema2rst.parser_runner import run_parser
+from jsonschema2rst.watcher import Watcher
+
+SCHEMAS = {
+    'record.yml': '''
+title: Record
+type: object
+properties:
+  titles:
+    type: array
+    items:
+      $ref: elements/title.json
+''',
+    'elements/title.yml': '''
+title: Title
+type: object
+properties:
+  title:
+    type: string
+''',
+    'elements/id.yml': '''
+title: Identifier
+type: string
+''',
+}
+
+
+def _write(path, content):
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    mtime = os.stat(path).st_mtime + 10 if os.path.exists(path) else None
+    with open(path, 'w') as schema:
+        schema.write(content)
+    if mtime is not None:  # the change is seen even within the same second
+        os.utime(path, (mtime, mtime))
+
+
+def _watcher(tmpdir, **kwargs):
+    src = str(tmpdir.join('schemas'))
+    for name, content in SCHEMAS.items():
+        _write(os.path.join(src, name), content)
+
+    watcher = Watcher(src, str(tmpdir.join('rst')), **kwargs)
+    watcher.build()
+    return watcher
+
+
+def _read(watcher, name):
+    with open(os.path.join(watcher.output_path, name)) as output:
+        return output.read()
+
+
+def test_poll_without_changes(tmpdir, capsys):
+    watcher = _watcher(tmpdir)
+    capsys.readouterr()
+
+    assert not watcher.poll()
+    assert capsys.readouterr()[0] == ''
+
+
+def test_poll_modified_schema(tmpdir, capsys):
+    watcher = _watcher(tmpdir)
+    capsys.readouterr()
+
+    _write(os.path.join(watcher.input_path, 'elements/id.yml'),
+           'title: Identifier\ntype: integer\n')
+
+    assert watcher.poll()
+    assert 'integer' in _read(watcher, 'elements/id.rst')
+    result = capsys.readouterr()[0]
+    assert result.startswith('id' + ' ' * 38 + 'OK\n')
+    assert 'record' not in result
+    assert 'Index created.' not in result
+
+
+def test_poll_converts_dependents(tmpdir, capsys):
+    watcher = _watcher(tmpdir)
+    capsys.readouterr()
+
+    _write(os.path.join(watcher.input_path, 'elements/title.yml'),
+           SCHEMAS['elements/title.yml'] + '  subtitle:\n    type: string\n')
+    watcher.poll()
+
+    result = capsys.readouterr()[0]
+    assert 'record' + ' ' * 34 + 'OK' in result
+    assert 'subtitle' in _read(watcher, 'elements/title.rst')
+    assert watcher.manifest.is_up_to_date(
+        'record.yml', watcher.manifest.entries['record.yml']['input_hash'],
+        'record.rst')
+
+
+def test_poll_reuses_rendered_pages(tmpdir, monkeypatch):
+    watcher = _watcher(tmpdir)
+    path = os.path.join(watcher.input_path, 'elements/id.yml')
+    _write(path, 'title: Identifier\ntype: integer\n')
+    watcher.poll()
+    _write(path, SCHEMAS['elements/id.yml'])
+    watcher.poll()
+
+    def fail(name):
+        raise AssertionError('{} rendered again'.format(name))
+
+    monkeypatch.setattr(watcher, '_render', fail)
+    _write(path, 'title: Identifier\ntype: integer\n')
+    watcher.poll()
+
+    assert 'integer' in _read(watcher, 'elements/id.rst')
+
+
+def test_poll_invalid_schema(tmpdir, capsys):
+    watcher = _watcher(tmpdir)
+    previous = _read(watcher, 'elements/id.rst')
+    capsys.readouterr()
+
+    _write(os.path.join(watcher.input_path, 'elements/id.yml'), '{bad')
+    watcher.poll()
+
+    assert 'ERROR' in capsys.readouterr()[0]
+    assert _read(watcher, 'elements/id.rst') == previous
+
+
+def test_poll_fixed_schema_after_failed_build(tmpdir, capsys):
+    src = str(tmpdir.join('schemas'))
+    for name, content in SCHEMAS.items():
+        _write(os.path.join(src, name), content)
+    _write(os.path.join(src, 'broken.yml'), 'title: [Broken\n')
+    watcher = Watcher(src, str(tmpdir.join('rst')))
+    watcher.build()
+    assert 'ERROR' in capsys.readouterr()[0]
+
+    _write(os.path.join(src, 'broken.yml'), 'title: Fixed\n')
+
+    assert watcher.poll()
+    assert 'Fixed' in _read(watcher, 'broken.rst')
+    assert 'record' in _read(watcher, 'index.rst')
+
+
+def test_poll_added_schema(tmpdir):
+    watcher = _watcher(tmpdir)
+
+    _write(os.path.join(watcher.input_path, 'elements/date.yml'),
+           'title: Date\ntype: string\n')
+    watcher.poll()
+
+    assert 'Date' in _read(watcher, 'elements/date.rst')
+    assert 'date' in _read(watcher, 'elements/index.rst')
+    assert 'elements/date.yml' in watcher.manifest.entries
+
+
+def test_poll_short_anchors_without_build(tmpdir, monkeypatch):
+    watcher = _watcher(tmpdir, anchor_length=8)
+
+    def fail():
+        raise AssertionError('all the schemas converted again')
+
+    monkeypatch.setattr(watcher, 'build', fail)
+    _write(os.path.join(watcher.input_path, 'elements/title.yml'),
+           SCHEMAS['elements/title.yml'] + '  subtitle:\n    type: string\n')
+    watcher.poll()
+
+    expected = str(tmpdir.join('expected'))
+    run_parser(watcher.input_path, expected, anchor_length=8)
+    with open(os.path.join(expected, ANCHORS_FILE_NAME)) as anchors:
+        assert _read(watcher, ANCHORS_FILE_NAME) == anchors.read()
+    assert 'subtitle' in _read(watcher, ANCHORS_FILE_NAME)